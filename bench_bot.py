@@ -0,0 +1,377 @@
+"""Benchmark the bot offline against a stubbed Discord gateway and REST layer.
+
+Synthetic gateway dispatches are fed straight into discord.py's event parsers, so
+slash commands, attendance buttons and the audit/message handlers run the same
+code paths as they do live. Every REST call and interaction callback is answered
+locally after a simulated round trip, so no token or network is needed.
+
+Usage:
+    python bench_bot.py                          # 10s at 50 interactions/s and 100 events/s
+    python bench_bot.py --duration 30 --interactions 200 --events 0
+    python bench_bot.py --http-latency 0.1       # slower simulated Discord
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+import discord
+from discord.http import Route
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+
+import main
+from main import (AUDIT_LOG_CHANNEL_ID, COMMAND_LOG_CHANNEL_ID, HOST_ROLE_ID_1, HOST_ROLE_ID_2, INFRACTION_ROLE_ID,
+                  INFRACTIONS_CHANNEL_ID, PROMOTE_ROLE_ID, PROMOTIONS_CHANNEL_ID, LatencyHistogram, bot_metrics)
+
+GUILD_ID = 1_000_000_000_000_000_000
+BOT_USER_ID = GUILD_ID + 1
+STAFF_USER_ID = GUILD_ID + 2
+FIRST_MEMBER_ID = GUILD_ID + 1_000
+RANK_ROLE_ID = GUILD_ID + 3
+EVENT_CHANNEL_ID = GUILD_ID + 4
+STAFF_ROLE_IDS = (PROMOTE_ROLE_ID, INFRACTION_ROLE_ID, HOST_ROLE_ID_1, HOST_ROLE_ID_2)
+CHANNEL_IDS = (PROMOTIONS_CHANNEL_ID, INFRACTIONS_CHANNEL_ID, COMMAND_LOG_CHANNEL_ID, AUDIT_LOG_CHANNEL_ID,
+               EVENT_CHANNEL_ID)
+LIVE_TRYOUTS = 5
+LOOP_LAG_INTERVAL = 0.01
+DRAIN_TIMEOUT = 30.0
+TIMING_ROWS = 12
+
+# Relative frequency of each synthetic interaction and gateway event.
+INTERACTION_MIX = {"promote": 1, "infraction_issue": 3, "infraction_list": 3, "tryout_attend": 5}
+EVENT_MIX = {"message_create": 6, "message_update": 2, "message_delete": 2, "audit_entry": 1}
+AUDIT_ACTIONS = (discord.AuditLogAction.kick, discord.AuditLogAction.ban, discord.AuditLogAction.member_role_update)
+
+_snowflakes = itertools.count(GUILD_ID + 1_000_000)
+
+
+def snowflake() -> str:
+    """Return a fresh id."""
+    return str(next(_snowflakes))
+
+
+def timestamp() -> str:
+    """Return the current time in Discord's ISO format."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def user_payload(user_id: int, is_bot: bool = False) -> dict[str, Any]:
+    """Build a user object."""
+    return {"id": str(user_id), "username": f"user{user_id % 100_000}", "discriminator": "0", "global_name": None,
+            "avatar": None, "bot": is_bot}
+
+
+def member_payload(user_id: int, roles: tuple[int, ...] = (), with_user: bool = True) -> dict[str, Any]:
+    """Build a guild member object."""
+    payload = {"roles": [str(role_id) for role_id in roles], "joined_at": timestamp(), "deaf": False, "mute": False,
+               "flags": 0, "nick": None, "avatar": None, "pending": False}
+    if with_user:
+        payload["user"] = user_payload(user_id, is_bot=user_id == BOT_USER_ID)
+    return payload
+
+
+def role_payload(role_id: int, name: str, position: int) -> dict[str, Any]:
+    """Build a role object."""
+    return {"id": str(role_id), "name": name, "color": 0, "hoist": False, "position": position, "permissions": "0",
+            "managed": False, "mentionable": True}
+
+
+def channel_payload(channel_id: int) -> dict[str, Any]:
+    """Build a guild text channel object."""
+    return {"id": str(channel_id), "type": 0, "guild_id": str(GUILD_ID), "name": f"channel-{channel_id % 10_000}",
+            "position": 0, "permission_overwrites": [], "nsfw": False, "parent_id": None, "topic": None,
+            "last_message_id": None, "rate_limit_per_user": 0}
+
+
+def message_payload(channel_id: int, message_id: Optional[str] = None, content: str = "",
+                    embeds: Optional[list[dict[str, Any]]] = None, author_id: int = BOT_USER_ID) -> dict[str, Any]:
+    """Build a message object."""
+    return {"id": message_id or snowflake(), "channel_id": str(channel_id),
+            "author": user_payload(author_id, is_bot=author_id == BOT_USER_ID), "content": content,
+            "timestamp": timestamp(), "edited_timestamp": None, "tts": False, "mention_everyone": False,
+            "mentions": [], "mention_roles": [], "attachments": [], "embeds": embeds or [], "pinned": False,
+            "type": 0, "components": []}
+
+
+def guild_payload(member_count: int) -> dict[str, Any]:
+    """Build the GUILD_CREATE payload for the synthetic guild."""
+    roles = [role_payload(GUILD_ID, "@everyone", 0), role_payload(RANK_ROLE_ID, "Rank", 1)]
+    roles += [role_payload(role_id, f"Staff {index}", index + 2) for index, role_id in enumerate(STAFF_ROLE_IDS)]
+    members = [member_payload(BOT_USER_ID), member_payload(STAFF_USER_ID, STAFF_ROLE_IDS)]
+    members += [member_payload(FIRST_MEMBER_ID + index) for index in range(member_count)]
+    return {"id": str(GUILD_ID), "name": "Benchmark Guild", "icon": None, "owner_id": str(STAFF_USER_ID),
+            "roles": roles, "channels": [channel_payload(channel_id) for channel_id in CHANNEL_IDS],
+            "members": members, "member_count": len(members), "large": False, "features": [], "emojis": [],
+            "stickers": [], "voice_states": [], "presences": [], "threads": [], "stage_instances": [],
+            "guild_scheduled_events": [], "premium_tier": 0, "verification_level": 0,
+            "default_message_notifications": 0, "explicit_content_filter": 0, "mfa_level": 0,
+            "system_channel_flags": 0, "afk_timeout": 300, "unavailable": False, "joined_at": timestamp(),
+            "preferred_locale": "en-US", "nsfw_level": 0}
+
+
+class FakeRest:
+    """Stand-in for discord.py's HTTPClient.request that answers locally."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def request(self, route: Route, *, files: Any = None, form: Any = None, **kwargs: Any) -> Any:
+        """Return a plausible payload for route after the simulated latency."""
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        parts = route.url[len(Route.BASE):].strip("/").split("/")
+        body = kwargs.get("json") or {}
+        if parts[0] == "channels":
+            channel_id = int(parts[1])
+            if len(parts) == 2:
+                return channel_payload(channel_id)
+            if parts[2] == "messages" and route.method != "DELETE":
+                return message_payload(channel_id, parts[3] if len(parts) > 3 else None, body.get("content") or "",
+                                       body.get("embeds"))
+        if parts[:3] == ["users", "@me", "channels"]:
+            return {"id": snowflake(), "type": 1, "recipients": [user_payload(int(body["recipient_id"]))]}
+        if parts[0] == "guilds" and len(parts) == 4 and parts[2] == "members" and route.method == "GET":
+            return member_payload(int(parts[3]))
+        if parts[0] == "users" and route.method == "GET":
+            return user_payload(int(parts[1]))
+        return None
+
+
+class FakeWebhookAdapter(AsyncWebhookAdapter):
+    """Stand-in for the adapter that sends interaction responses and follow-ups."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    async def request(self, route: Route, session: Any, **kwargs: Any) -> Any:
+        """Acknowledge callbacks and echo messages after the simulated latency."""
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if route.path.endswith("/callback"):
+            return {"interaction": {"id": str(route.webhook_id), "type": 2}}
+        if route.method == "DELETE":
+            return None
+        payload = kwargs.get("payload") or {}
+        return message_payload(EVENT_CHANNEL_ID, content=payload.get("content") or "",
+                               embeds=payload.get("embeds"))
+
+
+class Workload:
+    """Generates synthetic interactions and gateway events for the benchmark guild."""
+
+    def __init__(self, state: Any, member_count: int, tryout_messages: list[int], seed: int = 1234):
+        self.state = state
+        self.member_ids = [FIRST_MEMBER_ID + index for index in range(member_count)]
+        self.tryout_messages = tryout_messages
+        self.rng = random.Random(seed)
+        self.recent_messages: list[tuple[str, int]] = []
+
+    def _pick(self, mix: dict[str, int]) -> str:
+        """Choose a workload kind by weight."""
+        return self.rng.choices(list(mix), weights=list(mix.values()))[0]
+
+    def _interaction(self, interaction_type: int, data: dict[str, Any], user_id: int,
+                     roles: tuple[int, ...] = (), message: Optional[dict[str, Any]] = None) -> None:
+        """Dispatch an INTERACTION_CREATE."""
+        payload = {"id": snowflake(), "application_id": str(BOT_USER_ID), "type": interaction_type,
+                   "token": "benchmark", "version": 1, "guild_id": str(GUILD_ID),
+                   "channel_id": str(EVENT_CHANNEL_ID), "channel": channel_payload(EVENT_CHANNEL_ID),
+                   "member": {**member_payload(user_id, roles), "permissions": "8"}, "data": data,
+                   "locale": "en-US", "guild_locale": "en-US", "app_permissions": "8", "entitlements": [],
+                   "authorizing_integration_owners": {}, "context": 0,
+                   "attachment_size_limit": 10 * 1024 * 1024}
+        if message is not None:
+            payload["message"] = message
+        self.state.parsers["INTERACTION_CREATE"](payload)
+
+    def _command(self, name: str, options: list[dict[str, Any]], target_id: int) -> None:
+        """Dispatch a slash command from the staff member about target_id."""
+        resolved = {"users": {str(target_id): user_payload(target_id)},
+                    "members": {str(target_id): member_payload(target_id, with_user=False)},
+                    "roles": {str(RANK_ROLE_ID): role_payload(RANK_ROLE_ID, "Rank", 1)}}
+        data = {"id": snowflake(), "name": name, "type": 1, "options": options, "resolved": resolved}
+        self._interaction(2, data, STAFF_USER_ID, STAFF_ROLE_IDS)
+
+    def interaction(self) -> None:
+        """Dispatch one interaction from the interaction mix."""
+        kind = self._pick(INTERACTION_MIX)
+        target_id = self.rng.choice(self.member_ids)
+        if kind == "promote":
+            self._command("promote", [{"name": "user", "type": 6, "value": str(target_id)},
+                                      {"name": "new_role", "type": 8, "value": str(RANK_ROLE_ID)},
+                                      {"name": "reason", "type": 3, "value": "Benchmark"}], target_id)
+        elif kind == "infraction_issue":
+            self._command("infraction", [{"name": "issue", "type": 1, "options": [
+                {"name": "user", "type": 6, "value": str(target_id)},
+                {"name": "infraction_type", "type": 3, "value": "Warning"},
+                {"name": "reason", "type": 3, "value": "Benchmark"},
+                {"name": "severity", "type": 3, "value": self.rng.choice(("minor", "medium", "major"))}]}], target_id)
+        elif kind == "infraction_list":
+            self._command("infraction", [{"name": "list", "type": 1, "options": [
+                {"name": "user", "type": 6, "value": str(target_id)}]}], target_id)
+        else:
+            index = self.rng.randrange(len(self.tryout_messages))
+            embed = {"type": "rich", "title": "Tryout",
+                     "fields": [{"name": "**Current Attendees:**", "value": "None", "inline": False}]}
+            message = message_payload(EVENT_CHANNEL_ID, str(self.tryout_messages[index]), embeds=[embed])
+            self._interaction(3, {"custom_id": f"tryout:{index + 1}:attend", "component_type": 2}, target_id,
+                              message=message)
+
+    def event(self) -> None:
+        """Dispatch one gateway event from the event mix."""
+        kind = self._pick(EVENT_MIX)
+        author_id = self.rng.choice(self.member_ids)
+        if kind == "message_create" or not self.recent_messages:
+            message = message_payload(EVENT_CHANNEL_ID, content=f"Synthetic message {self.rng.random()}",
+                                      author_id=author_id)
+            message["guild_id"] = str(GUILD_ID)
+            message["member"] = member_payload(author_id, with_user=False)
+            self.state.parsers["MESSAGE_CREATE"](message)
+            self.recent_messages.append((message["id"], author_id))
+            del self.recent_messages[:-1000]
+        elif kind == "message_update":
+            message_id, author_id = self.rng.choice(self.recent_messages)
+            message = message_payload(EVENT_CHANNEL_ID, message_id, content="Edited", author_id=author_id)
+            message["guild_id"] = str(GUILD_ID)
+            message["edited_timestamp"] = timestamp()
+            self.state.parsers["MESSAGE_UPDATE"](message)
+        elif kind == "message_delete":
+            message_id, _ = self.recent_messages.pop(self.rng.randrange(len(self.recent_messages)))
+            self.state.parsers["MESSAGE_DELETE"]({"id": message_id, "channel_id": str(EVENT_CHANNEL_ID),
+                                                   "guild_id": str(GUILD_ID)})
+        else:
+            action = self.rng.choice(AUDIT_ACTIONS)
+            self.state.parsers["GUILD_AUDIT_LOG_ENTRY_CREATE"]({
+                "id": snowflake(), "guild_id": str(GUILD_ID), "action_type": action.value,
+                "target_id": str(author_id), "user_id": str(STAFF_USER_ID), "reason": "Benchmark", "changes": []})
+
+
+async def start_bot(rest: FakeRest, member_count: int) -> list[int]:
+    """Bring the bot up against the fakes and return the live tryout message ids."""
+    bot = main.bot
+    bot.http.request = rest.request
+    await bot._async_setup_hook()
+    state = bot._connection
+    state._chunk_guilds = False
+    state.user = discord.ClientUser(state=state, data=user_payload(BOT_USER_ID, is_bot=True))
+    state.application_id = BOT_USER_ID
+    state.parsers["GUILD_CREATE"](guild_payload(member_count))
+
+    tryout_messages = [int(snowflake()) for _ in range(LIVE_TRYOUTS)]
+    for message_id in tryout_messages:
+        # noinspection SqlNoDataSourceInspection
+        await main.db.execute('''INSERT INTO tryouts (message_id, host_id, required_attendees, guild_id, channel_id)
+                                 VALUES (?, ?, ?, ?, ?)''',
+                              (message_id, STAFF_USER_ID, 10, GUILD_ID, EVENT_CHANNEL_ID))
+    await main.load_cogs(bot)
+    return tryout_messages
+
+
+async def drive(rate: float, duration: float, produce: Callable[[], None]) -> int:
+    """Call produce rate times per second for duration seconds and return the count."""
+    if rate <= 0:
+        return 0
+    sent = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < duration:
+        while sent < int(elapsed * rate):
+            produce()
+            sent += 1
+        await asyncio.sleep(min(1 / rate, LOOP_LAG_INTERVAL))
+    return sent
+
+
+async def monitor_loop_lag(histogram: LatencyHistogram, stop: asyncio.Event) -> None:
+    """Measure how late short sleeps wake up, which is how long the loop was blocked."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        histogram.observe(max(0.0, time.perf_counter() - start - LOOP_LAG_INTERVAL))
+
+
+def completed_interactions() -> int:
+    """Number of commands and view callbacks that have finished."""
+    return sum(hist.count for name, hist in bot_metrics.histograms.items()
+               if name.startswith(("command.", "view.")))
+
+
+def print_timings(title: str, prefix: str) -> None:
+    """Print the busiest histograms under prefix."""
+    rows = bot_metrics.summary(prefix)
+    if not rows:
+        return
+    total = sum(hist.total for _, hist in rows)
+    print(f"\n{title} ({sum(hist.count for _, hist in rows)} calls, {total:.2f}s total)")
+    print(f"  {'name':<40} {'n':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, hist in rows[:TIMING_ROWS]:
+        print(f"  {name[:40]:<40} {hist.count:>7} " +
+              " ".join(f"{hist.percentile(q) * 1000:>8.2f}" for q in (0.5, 0.95, 0.99)))
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Start the bot against the fakes, apply the load and print a report."""
+    rest = FakeRest(args.http_latency)
+    webhooks = FakeWebhookAdapter(args.http_latency)
+    async_context.set(webhooks)
+    tryout_messages = await start_bot(rest, args.members)
+    workload = Workload(main.bot._connection, args.members, tryout_messages)
+
+    lag = LatencyHistogram()
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lag, stop))
+    start = time.perf_counter()
+    sent, events = await asyncio.gather(drive(args.interactions, args.duration, workload.interaction),
+                                        drive(args.events, args.duration, workload.event))
+    deadline = time.perf_counter() + DRAIN_TIMEOUT
+    while completed_interactions() < sent and time.perf_counter() < deadline:
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    completed = completed_interactions()
+    errors = sum(count for name, count in bot_metrics.counters.items() if name.endswith(".errors"))
+    print(f"Ran {elapsed:.1f}s with {args.members} members, simulated REST latency {args.http_latency * 1000:.0f} ms")
+    print(f"  interactions  {sent} sent, {completed} completed, {completed / elapsed:.1f}/s, {errors} errors")
+    print(f"  events        {events} dispatched, {events / elapsed:.1f}/s")
+    print(f"  REST calls    {rest.calls} REST, {webhooks.calls} interaction callbacks")
+    print(f"  loop lag      p50 {lag.percentile(0.5) * 1000:.2f} ms | p95 {lag.percentile(0.95) * 1000:.2f} ms | "
+          f"p99 {lag.percentile(0.99) * 1000:.2f} ms | max {lag.max * 1000:.2f} ms")
+    print_timings("Commands", "command.")
+    print_timings("Views", "view.")
+    print_timings("Database", "db.")
+    print_timings("Embeds", "embed.")
+
+    await main.stop_workers()
+
+
+def main_cli() -> None:
+    """Parse arguments and run the benchmark in a throwaway database."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load to apply")
+    parser.add_argument("--interactions", type=float, default=50.0, help="interactions per second")
+    parser.add_argument("--events", type=float, default=100.0, help="message and audit events per second")
+    parser.add_argument("--members", type=int, default=500, help="members in the synthetic guild")
+    parser.add_argument("--http-latency", type=float, default=0.03, help="simulated REST round trip in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.DB_PATH = os.path.join(tmp, "bench.db")
+        main.db.path = main.DB_PATH
+        main.init_db()
+        try:
+            asyncio.run(run(args))
+        finally:
+            main.db.close()
+
+
+if __name__ == "__main__":
+    main_cli()
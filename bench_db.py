@@ -0,0 +1,136 @@
+"""Benchmark the infraction hot queries against synthetic databases.
+
+Usage:
+    python bench_db.py                      # 10k, 100k and 1M rows, with indexes
+    python bench_db.py --rows 10000 --no-indexes
+    python bench_db.py --explain            # print query plans only
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from main import (INFRACTION_CLEAR_SQL, INFRACTION_COUNT_SQL, INFRACTION_PAGE_SIZE, INFRACTION_PAGE_SQL,
+                  INFRACTION_PAGE_START, INFRACTION_SUMMARY_SQL, check_hot_query_plans, configure_connection,
+                  run_migrations)
+
+INDEX_MIGRATION = 3
+# Per-member lookup indexes dropped again for --no-indexes runs.
+LOOKUP_INDEXES = ("idx_infractions_guild_user_ts", "idx_infractions_guild_user_voided")
+GUILD_COUNT = 5
+ROWS_PER_USER = 20
+SEVERITIES = ("minor", "medium", "major")
+
+
+def build_database(path: str, rows: int, with_indexes: bool) -> sqlite3.Connection:
+    """Create a database at path holding rows synthetic infractions."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    configure_connection(conn)
+    run_migrations(conn, target=INDEX_MIGRATION - 1)
+
+    users = max(1, rows // ROWS_PER_USER)
+    rng = random.Random(1234)
+    batch = []
+    conn.execute("BEGIN")
+    for i in range(rows):
+        batch.append((rng.randrange(users), 1, "Warning", f"Synthetic reason {i}", rng.choice(SEVERITIES),
+                      i % 2, None, f"2024-01-01 00:00:{i % 60:02d}", 1 if i % 7 == 0 else 0,
+                      rng.randrange(GUILD_COUNT)))
+        if len(batch) >= 50_000:
+            _insert(conn, batch)
+            batch.clear()
+    _insert(conn, batch)
+    conn.execute("COMMIT")
+
+    run_migrations(conn)
+    if not with_indexes:
+        for index in LOOKUP_INDEXES:
+            # noinspection SqlNoDataSourceInspection
+            conn.execute(f"DROP INDEX {index}")
+    return conn
+
+
+def _insert(conn: sqlite3.Connection, batch: list[tuple]) -> None:
+    """Insert a batch of synthetic infraction rows."""
+    # noinspection SqlNoDataSourceInspection
+    conn.executemany('''INSERT INTO infractions
+                        (user_id, issued_by, infraction_type, reason, severity, appealable, note, timestamp, voided,
+                         guild_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', batch)
+
+
+def time_query(conn: sqlite3.Connection, sql: str, keys: list[tuple], write: bool = False) -> list[float]:
+    """Run sql once per parameter tuple and return the latencies in milliseconds."""
+    timings = []
+    for key in keys:
+        start = time.perf_counter()
+        conn.execute(sql, key).fetchall()
+        if write:
+            conn.commit()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def describe(timings: list[float]) -> str:
+    """Format median and p95 latency."""
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50 {statistics.median(ordered):8.3f} ms | p95 {p95:8.3f} ms"
+
+
+def run(rows: int, with_indexes: bool, samples: int) -> None:
+    """Benchmark list, summary, count and clear at one table size."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        conn = build_database(path, rows, with_indexes)
+        conn.isolation_level = ""
+        print(f"\n{rows:,} rows ({'indexed' if with_indexes else 'no indexes'}), "
+              f"built in {time.perf_counter() - start:.1f}s")
+
+        users = max(1, rows // ROWS_PER_USER)
+        rng = random.Random(99)
+        keys = [(rng.randrange(GUILD_COUNT), rng.randrange(users)) for _ in range(samples * 2)]
+        first_pages = [(*key, *INFRACTION_PAGE_START, INFRACTION_PAGE_SIZE) for key in keys[:samples]]
+        print(f"  list    {describe(time_query(conn, INFRACTION_PAGE_SQL, first_pages))}")
+        print(f"  summary {describe(time_query(conn, INFRACTION_SUMMARY_SQL, keys[:samples]))}")
+        print(f"  count   {describe(time_query(conn, INFRACTION_COUNT_SQL, keys[:samples]))}")
+        clears = [(0, "Benchmark", *key) for key in keys[samples:]]
+        print(f"  clear   {describe(time_query(conn, INFRACTION_CLEAR_SQL, clears, write=True))}")
+        conn.close()
+
+
+def explain() -> None:
+    """Print the query plan of every hot query on an empty, fully migrated database."""
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    run_migrations(conn)
+    for name, plan in check_hot_query_plans(conn).items():
+        print(f"{name}:")
+        for line in plan:
+            print(f"  {line}")
+    conn.close()
+
+
+def main() -> None:
+    """Parse arguments and run the requested benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, action="append",
+                        help="table size to benchmark (repeatable, default 10k/100k/1M)")
+    parser.add_argument("--samples", type=int, default=200, help="queries per measurement")
+    parser.add_argument("--no-indexes", action="store_true", help="skip the index migration for comparison")
+    parser.add_argument("--explain", action="store_true", help="print query plans and exit")
+    args = parser.parse_args()
+
+    if args.explain:
+        explain()
+        return
+    for rows in args.rows or [10_000, 100_000, 1_000_000]:
+        run(rows, not args.no_indexes, args.samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,355 @@
+import aiohttp
 import discord
+from aiohttp import web
 from discord.ext import commands
 from discord import app_commands
 from discord import AuditLogAction
+import argparse
+import asyncio
+import csv
+import functools
+import gzip
+import hashlib
+import heapq
+import io
+import json
 import logging
+import logging.handlers
+import math
+import queue
+import re
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
 import sqlite3
-from datetime import datetime
-from typing import Optional, Any, Iterable, cast
+import tempfile
+from datetime import datetime, timedelta
+from typing import Optional, Any, Awaitable, Callable, Iterable, Iterator, TypeVar, cast
 
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
 
-handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
-logging.basicConfig(handlers=[handler], level=logging.INFO, format='%(asctime)s - %(message)s')
+T = TypeVar("T")
+
+LOG_PATH = os.getenv('LOG_PATH', 'discord.log')
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# Extra record attributes copied into the JSON output when a call site supplies them.
+LOG_CONTEXT_FIELDS = ("command", "guild_id", "user_id", "duration_ms", "status")
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Render a record and any context fields as JSON"""
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in LOG_CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Queue log records to rotating JSON file and stderr handlers; stop the returned listener on exit"""
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    file_handler = logging.handlers.RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES,
+                                                        backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    file_handler.setFormatter(JsonLogFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    listener.start()
+    return listener
+
+
+command_logger = logging.getLogger("srrd.commands")
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+
+def parse_shard_ids(value: Optional[str]) -> Optional[list[int]]:
+    """Parse a shard list such as "0,1,4-7"."""
+    if not value:
+        return None
+    shard_ids: list[int] = []
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        elif part:
+            shard_ids.append(int(part))
+    return sorted(set(shard_ids))
+
+
+# Sharding is opt-in. BOT_SHARDED=1 lets discord.py pick the shard count and run
+# every shard in this process. SHARD_COUNT with SHARD_IDS runs an explicit range,
+# so shards can be split across several processes.
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None
+SHARD_IDS = parse_shard_ids(os.getenv('SHARD_IDS'))
+SHARDED = os.getenv('BOT_SHARDED', '').lower() in ('1', 'true', 'yes') or SHARD_COUNT is not None
+
+# Fraction of all shards handled by this process; shared per-channel budgets are
+# divided by it so that several processes together stay under Discord's limits.
+PROCESS_SHARE = len(SHARD_IDS) / SHARD_COUNT if SHARD_IDS and SHARD_COUNT else 1.0
+
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration."""
+        index = 0
+        while index < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a percentile by interpolating inside the bucket that holds it."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                # No sample exceeds max, so the bucket holding it only spans up to max.
+                upper = min(LATENCY_BUCKETS[index], self.max) if index < len(LATENCY_BUCKETS) else self.max
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+
+class BotMetrics:
+    """In-memory latency histograms and counters for the bot's hot paths."""
+
+    def __init__(self):
+        self.histograms: defaultdict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.counters: defaultdict[str, int] = defaultdict(int)
+        self.commands: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self.started = time.monotonic()
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration under name."""
+        self.histograms[name].observe(seconds)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """Increase a counter."""
+        self.counters[name] += amount
+
+    def count_command(self, command_name: str, status: str) -> None:
+        """Count a logged command by name and outcome ("Success", "Denied", "Failed", ...)."""
+        # Statuses carry details after the colon ("Failed: <error>"); only the outcome is kept.
+        self.commands[(command_name, status.split(":", 1)[0].strip())] += 1
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        """Time the enclosed block, counting it as an error if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.counters[f"{name}.errors"] += 1
+            raise
+        finally:
+            self.histograms[name].observe(time.perf_counter() - start)
+
+    def summary(self, prefix: str = "") -> list[tuple[str, LatencyHistogram]]:
+        """Return histograms whose name starts with prefix, busiest first."""
+        return sorted(((name, hist) for name, hist in self.histograms.items() if name.startswith(prefix)),
+                      key=lambda item: item[1].count, reverse=True)
+
+
+bot_metrics = BotMetrics()
+
+
+def timed(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Record the duration of a view or modal callback under view.<qualified name>."""
+    name = f"view.{func.__qualname__}"
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        interaction = next((arg for arg in args if isinstance(arg, discord.Interaction)), None)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with bot_metrics.time(name):
+                result = await func(*args, **kwargs)
+            status = "ok"
+            return result
+        finally:
+            if interaction is not None:
+                command_logger.info(f"{func.__qualname__} {'completed' if status == 'ok' else 'failed'}",
+                                    extra={"command": func.__qualname__, "guild_id": interaction.guild_id,
+                                           "user_id": interaction.user.id, "status": status,
+                                           "duration_ms": round((time.perf_counter() - start) * 1000, 2)})
+    return wrapper
+
+
+class TimedCommandTree(app_commands.CommandTree):
+    """Command tree that times every application command."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Stamp the interaction so completion and error handlers can time it."""
+        interaction.extras["started"] = time.perf_counter()
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        """Count the failed command, then fall back to the default error handling."""
+        observe_command(interaction, interaction.command, failed=True)
+        await super().on_error(interaction, error)
+
+
+def observe_command(interaction: discord.Interaction, command: Optional[Any], failed: bool = False) -> None:
+    """Record how long an application command ran."""
+    started = interaction.extras.pop("started", None)
+    if started is None:
+        return
+    command_name = command.qualified_name if command else "unknown"
+    name = f"command.{command_name}"
+    duration = time.perf_counter() - started
+    bot_metrics.observe(name, duration)
+    if failed:
+        bot_metrics.incr(f"{name}.errors")
+    command_logger.info(f"/{command_name} {'failed' if failed else 'completed'}",
+                        extra={"command": command_name, "guild_id": interaction.guild_id,
+                               "user_id": interaction.user.id, "duration_ms": round(duration * 1000, 2),
+                               "status": "error" if failed else "ok"})
+
+
+def build_bot() -> commands.Bot:
+    """Create the bot, sharded when configured."""
+    if not SHARDED:
+        return commands.Bot(command_prefix='!', intents=intents, tree_cls=TimedCommandTree)
+    if SHARD_IDS and not SHARD_COUNT:
+        raise RuntimeError("SHARD_IDS requires SHARD_COUNT")
+    return commands.AutoShardedBot(command_prefix='!', intents=intents, tree_cls=TimedCommandTree,
+                                   shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+
+
+bot = build_bot()
+
+
+def instrument_http(bot_instance: commands.Bot) -> None:
+    """Time every Discord REST call as http.<method> <route>."""
+    request = bot_instance.http.request
+
+    @functools.wraps(request)
+    async def timed_request(route: discord.http.Route, *args: Any, **kwargs: Any) -> Any:
+        with bot_metrics.time(f"http.{route.method} {route.path}"):
+            return await request(route, *args, **kwargs)
+    bot_instance.http.request = timed_request
+
+
+def shard_for_guild(guild_id: Optional[int]) -> int:
+    """Return the shard that receives events for a guild."""
+    shard_count = SHARD_COUNT or bot.shard_count or 1
+    return (guild_id >> 22) % shard_count if guild_id else 0
+
+
+def owns_guild(guild_id: int) -> bool:
+    """Whether this process runs the shard that serves a guild."""
+    return SHARD_IDS is None or shard_for_guild(guild_id) in SHARD_IDS
+
+
+SHARD_RATE_WINDOW = 60
+
+
+class ShardMetrics:
+    """Per-shard gateway event counters with a rolling events-per-second rate."""
+
+    def __init__(self, window: int = SHARD_RATE_WINDOW):
+        self.window = window
+        self.totals: defaultdict[int, int] = defaultdict(int)
+        self.by_type: defaultdict[int, defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.connects: defaultdict[int, int] = defaultdict(int)
+        self.disconnects: defaultdict[int, int] = defaultdict(int)
+        self.resumes: defaultdict[int, int] = defaultdict(int)
+        # Per shard: [second, count] buckets covering the last `window` seconds.
+        self._seconds: defaultdict[int, deque[list[int]]] = defaultdict(deque)
+
+    def record(self, shard_id: int, event: str) -> None:
+        """Count one gateway event received on a shard."""
+        self.totals[shard_id] += 1
+        self.by_type[shard_id][event] += 1
+        now = int(time.monotonic())
+        seconds = self._seconds[shard_id]
+        if seconds and seconds[-1][0] == now:
+            seconds[-1][1] += 1
+        else:
+            seconds.append([now, 1])
+            self._prune(seconds, now)
+
+    def _prune(self, seconds: deque[list[int]], now: int) -> None:
+        """Drop buckets older than the rate window."""
+        while seconds and seconds[0][0] <= now - self.window:
+            seconds.popleft()
+
+    def rate(self, shard_id: int) -> float:
+        """Events per second on a shard over the rate window."""
+        seconds = self._seconds[shard_id]
+        self._prune(seconds, int(time.monotonic()))
+        return sum(count for _, count in seconds) / self.window
+
+    def snapshot(self, bot_instance: commands.Bot) -> dict[int, dict[str, Any]]:
+        """Return latency, event totals and rates for every shard known to this process."""
+        latencies = dict(getattr(bot_instance, "latencies", None) or [(bot_instance.shard_id or 0,
+                                                                         bot_instance.latency)])
+        snapshot = {}
+        for shard_id in sorted(set(latencies) | set(self.totals)):
+            latency = latencies.get(shard_id)
+            snapshot[shard_id] = {
+                "latency_ms": latency * 1000 if latency is not None and latency == latency else None,
+                "events": self.totals[shard_id],
+                "events_per_sec": self.rate(shard_id),
+                "connects": self.connects[shard_id],
+                "disconnects": self.disconnects[shard_id],
+                "resumes": self.resumes[shard_id],
+            }
+        return snapshot
+
+
+shard_metrics = ShardMetrics()
+
+
+def record_gateway_event(event: str, guild_id: Optional[int]) -> None:
+    """Count a gateway event against the shard serving its guild."""
+    shard_metrics.record(shard_for_guild(guild_id), event)
 
 PROMOTE_ROLE_ID = 1444700142434517123
 INFRACTION_ROLE_ID = 1436251065963118716
@@ -32,23 +362,245 @@ REQUIREMENTS_CHANNEL_ID = 1436573068481794068
 COMMAND_LOG_CHANNEL_ID = 1444937836095737957
 AUDIT_LOG_CHANNEL_ID = 1444940684787454096
 
+DB_PATH = 'bot_data.db'
+DB_POOL_SIZE = 3
+
+# Per-connection tuning applied to every pooled connection; WAL itself is
+# persistent and is switched on once by init_db().
+DB_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16384",
+    "PRAGMA mmap_size=134217728",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=30000",
+)
+
+
+def configure_connection(conn: sqlite3.Connection) -> None:
+    """Apply the startup PRAGMA profile to a connection."""
+    for pragma in DB_CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+@functools.lru_cache(maxsize=256)
+def sql_label(sql: str) -> str:
+    """Name a statement for timing by its verb and table, e.g. "select infractions"."""
+    words = sql.split()
+    verb = words[0].lower() if words else "sql"
+    for keyword in ("FROM", "INTO", "UPDATE"):
+        if keyword in words[:-1]:
+            return f"{verb} {words[words.index(keyword) + 1].split('(')[0].lower()}"
+    return verb
+
+
+class Database:
+    """Small pool of long-lived SQLite connections served from a dedicated executor.
+
+    Every query runs on one of the pool's worker threads so the event loop never
+    blocks on disk I/O. Each worker borrows a connection for the duration of a
+    call and hands it back afterwards.
+    """
+
+    def __init__(self, path: str = DB_PATH, pool_size: int = DB_POOL_SIZE):
+        self.path = path
+        self.pool_size = pool_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._connections: list[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for use from pool threads."""
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        configure_connection(conn)
+        return conn
+
+    def _ensure_started(self) -> ThreadPoolExecutor:
+        """Create the executor and connections on first use."""
+        if self._executor is None:
+            for _ in range(self.pool_size):
+                conn = self._connect()
+                self._connections.append(conn)
+                self._pool.put(conn)
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="db")
+        return self._executor
+
+    def _call(self, func: Callable[..., T], *args: Any) -> T:
+        """Run func with a pooled connection on the current worker thread."""
+        conn = self._pool.get()
+        try:
+            return func(conn, *args)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    async def run(self, func: Callable[..., T], *args: Any, label: Optional[str] = None) -> T:
+        """Run func(conn, *args) on the pool and await its result, timed as db.<label>."""
+        executor = self._ensure_started()
+        loop = asyncio.get_running_loop()
+        with bot_metrics.time(f"db.{label or func.__name__}"):
+            return await loop.run_in_executor(executor, self._call, func, *args)
+
+    async def execute(self, sql: str, params: Iterable[Any] = ()) -> int:
+        """Run a write statement, commit it and return the last inserted row id."""
+        def _execute(conn: sqlite3.Connection) -> int:
+            cursor = conn.execute(sql, tuple(params))
+            conn.commit()
+            return cursor.lastrowid
+        return await self.run(_execute, label=sql_label(sql))
+
+    async def fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[sqlite3.Row]:
+        """Return the first row of a query, or None."""
+        return await self.run(lambda conn: conn.execute(sql, tuple(params)).fetchone(), label=sql_label(sql))
+
+    async def fetchall(self, sql: str, params: Iterable[Any] = ()) -> list[sqlite3.Row]:
+        """Return every row of a query."""
+        return await self.run(lambda conn: conn.execute(sql, tuple(params)).fetchall(), label=sql_label(sql))
+
+    async def transaction(self, func: Callable[..., T], *args: Any) -> T:
+        """Run func(conn, *args) and commit once it returns; roll back on error."""
+        def _transaction(conn: sqlite3.Connection) -> T:
+            result = func(conn, *args)
+            conn.commit()
+            return result
+        return await self.run(_transaction, label=func.__name__)
+
+    def close(self) -> None:
+        """Shut down the executor and close every pooled connection."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+        self._pool = queue.Queue()
+
+
+db = Database()
+
 
 def _get_timestamp_label() -> str:
     """Return formatted timestamp for logging."""
     return datetime.utcnow().strftime("%B %d, %Y • %I:%M %p UTC")
 
 
+RESOLVER_TTL = 300.0
+RESOLVER_NEGATIVE_TTL = 60.0
+RESOLVER_CAPACITY = 4096
+
+
+class Resolver:
+    """Resolves channels, users and members, preferring the gateway cache over REST.
+
+    REST results are kept in an LRU for RESOLVER_TTL seconds. NotFound and
+    Forbidden are cached as None for RESOLVER_NEGATIVE_TTL so an inaccessible id
+    is not re-fetched on every call. Concurrent lookups of the same id share a
+    single request. Other HTTP errors are raised and not cached.
+    """
+
+    def __init__(self, ttl: float = RESOLVER_TTL, negative_ttl: float = RESOLVER_NEGATIVE_TTL,
+                 capacity: int = RESOLVER_CAPACITY):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.shared = 0
+        self._entries: OrderedDict[tuple[str, int, int], tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[tuple[str, int, int], asyncio.Task] = {}
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit/miss counters for diagnostics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "shared": self.shared,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def invalidate(self, kind: str, object_id: int, scope_id: int = 0) -> None:
+        """Forget a cached lookup."""
+        self._entries.pop((kind, scope_id, object_id), None)
+
+    async def _resolve(self, key: tuple[str, int, int], fetch: Callable[[], Awaitable[T]]) -> Optional[T]:
+        """Return the cached value for key, or fetch it once for every concurrent caller."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._fetch_done, key))
+        else:
+            self.shared += 1
+        # Shield so a cancelled caller does not cancel the request the others are waiting on.
+        return await asyncio.shield(task)
+
+    def _fetch_done(self, key: tuple[str, int, int], task: asyncio.Task) -> None:
+        """Clear the in-flight entry and retrieve the error, in case every waiter was cancelled."""
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, key: tuple[str, int, int], fetch: Callable[[], Awaitable[T]]) -> Optional[T]:
+        """Run fetch and cache its result, or None for missing and forbidden objects."""
+        self.fetches += 1
+        try:
+            value: Optional[T] = await fetch()
+            ttl = self.ttl
+        except (discord.NotFound, discord.Forbidden):
+            value = None
+            ttl = self.negative_ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return value
+
+    async def channel(self, bot_instance: commands.Bot, channel_id: int) -> Optional[Any]:
+        """Return a channel from the gateway cache or REST, or None if it is inaccessible."""
+        channel = bot_instance.get_channel(channel_id)
+        if channel is not None:
+            return channel
+        return await self._resolve(("channel", 0, channel_id), lambda: bot_instance.fetch_channel(channel_id))
+
+    async def user(self, bot_instance: commands.Bot, user_id: int) -> Optional[discord.User]:
+        """Return a user from the gateway cache or REST, or None if it does not exist."""
+        user = bot_instance.get_user(user_id)
+        if user is not None:
+            return user
+        return await self._resolve(("user", 0, user_id), lambda: bot_instance.fetch_user(user_id))
+
+    async def member(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        """Return a guild member from the gateway cache or REST, or None if they are not in the guild."""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        return await self._resolve(("member", guild.id, user_id), lambda: guild.fetch_member(user_id))
+
+
+resolver = Resolver()
+
+
 async def fetch_text_channel(bot_instance: commands.Bot, channel_id: int) -> Optional[discord.TextChannel]:
     """Fetch a text channel safely."""
-    channel = bot_instance.get_channel(channel_id)
+    channel = await resolver.channel(bot_instance, channel_id)
     if channel is None:
-        try:
-            fetched = await bot_instance.fetch_channel(channel_id)
-            if isinstance(fetched, discord.TextChannel):
-                channel = fetched
-        except (discord.NotFound, discord.Forbidden):
-            logging.error(f"Channel {channel_id} not accessible.")
-            return None
+        logging.error(f"Channel {channel_id} not accessible.")
     return channel if isinstance(channel, discord.TextChannel) else None
 
 
@@ -57,50 +609,300 @@ def interaction_response(interaction: discord.Interaction) -> discord.Interactio
     return cast(discord.InteractionResponse, interaction.response)
 
 
+# Discord allows roughly five messages per five seconds in a channel.
+CHANNEL_RATE_LIMIT = (5, 5.0 / PROCESS_SHARE)
+
+COMMAND_LOG_FLUSH_INTERVAL = 2.0
+COMMAND_LOG_BATCH_SIZE = 10
+COMMAND_LOG_MAX_PENDING = 500
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+class RateLimitBucket:
+    """Client-side token bucket mirroring a Discord route's rate limit.
+
+    Waiting here keeps the bot under the limit instead of discovering it
+    through 429 responses.
+    """
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.period = period
+        self.waits = 0
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last check."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.capacity / self.period)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent, then consume one token."""
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                self.waits += 1
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            self.waits += 1
+            await asyncio.sleep((1 - self._tokens) * self.period / self.capacity)
+
+    def penalize(self, retry_after: float) -> None:
+        """Hold all requests for retry_after seconds after a 429."""
+        self._tokens = 0.0
+        self._blocked_until = time.monotonic() + retry_after
+
+
+# discord.py sleeps through 429s itself and only reports them through this warning.
+DISCORD_RATE_LIMIT_WARNING = "We are being rate limited."
+CHANNEL_ROUTE_PATTERN = re.compile(r"/channels/(\d+)/")
+
+
+class RateLimitCounter(logging.Filter):
+    """Counts the 429s discord.py handles internally, read from its "discord.http" warnings.
+
+    Each hit is attributed to the outbound queue whose channel the request
+    targeted, or to "other".
+    """
+
+    def __init__(self, channels: dict[int, str]):
+        super().__init__()
+        self.channels = channels
+        self.hits: defaultdict[str, int] = defaultdict(int)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Count rate-limit warnings; never suppresses the record."""
+        if isinstance(record.msg, str) and record.msg.startswith(DISCORD_RATE_LIMIT_WARNING):
+            url = str(record.args[1]) if isinstance(record.args, tuple) and len(record.args) > 1 else ""
+            match = CHANNEL_ROUTE_PATTERN.search(url)
+            self.hits[self.channels.get(int(match.group(1)), "other") if match else "other"] += 1
+        return True
+
+
+rate_limit_counter = RateLimitCounter({COMMAND_LOG_CHANNEL_ID: "command_log", AUDIT_LOG_CHANNEL_ID: "audit"})
+logging.getLogger("discord.http").addFilter(rate_limit_counter)
+
+
+def retry_after_seconds(err: discord.HTTPException, default: float = 1.0) -> float:
+    """Return the Retry-After delay carried by a 429 response."""
+    headers = getattr(getattr(err, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", default))
+    except (TypeError, ValueError):
+        return default
+
+
+class CommandLogRecord:
+    """One slash command execution, captured when the command runs and rendered when shipped."""
+
+    __slots__ = ("user_mention", "user_id", "channel_mention", "command_name", "command_line", "status",
+                 "extra_info", "timestamp_label")
+
+    def __init__(self, user_mention: str, user_id: int, channel_mention: str, command_name: str,
+                 command_line: str, status: str, extra_info: Optional[str], timestamp_label: str):
+        self.user_mention = user_mention
+        self.user_id = user_id
+        self.channel_mention = channel_mention
+        self.command_name = command_name
+        self.command_line = command_line
+        self.status = status
+        self.extra_info = extra_info
+        self.timestamp_label = timestamp_label
+
+    def render(self) -> str:
+        """Return the human-readable log entry."""
+        log_lines = [
+            "1. Command Execution Log",
+            "",
+            "User",
+            f"{self.user_mention} (`{self.user_id}`)",
+            "",
+            "Channel",
+            self.channel_mention,
+            "",
+            "Command",
+            "```",
+            f"/{self.command_name}",
+            "```",
+            "",
+            "Message Content",
+            "```",
+            self.command_line,
+            "```",
+            "",
+            "Status",
+            self.status,
+        ]
+
+        if self.extra_info:
+            log_lines.extend(["", "Details", self.extra_info])
+
+        log_lines.extend(["", self.timestamp_label])
+        return truncate_text("\n".join(log_lines), DISCORD_MESSAGE_LIMIT)
+
+
+class LogShipper:
+    """Background queue that packs log records into as few channel messages as possible.
+
+    Records are flushed when COMMAND_LOG_BATCH_SIZE are waiting or every
+    flush_interval seconds. At most max_pending records are held; beyond that
+    the oldest are dropped and a notice is shipped with the next batch. A batch
+    that fails with a 429 or 5xx goes back on the queue; other failures count
+    as drops.
+    """
+
+    def __init__(self, channel_id: int, flush_interval: float = COMMAND_LOG_FLUSH_INTERVAL,
+                 batch_size: int = COMMAND_LOG_BATCH_SIZE, max_pending: int = COMMAND_LOG_MAX_PENDING):
+        self.channel_id = channel_id
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.messages_sent = 0
+        self._pending: deque[CommandLogRecord] = deque()
+        self._unreported_drops = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._bot: Optional[commands.Bot] = None
+        self.bucket = RateLimitBucket(*CHANNEL_RATE_LIMIT)
+
+    @property
+    def depth(self) -> int:
+        """Number of records waiting to be shipped."""
+        return len(self._pending)
+
+    def submit(self, record: CommandLogRecord) -> None:
+        """Queue a record without waiting for it to be sent."""
+        if len(self._pending) >= self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+            self._unreported_drops += 1
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self, bot_instance: commands.Bot) -> None:
+        """Start the background flush loop."""
+        self._bot = bot_instance
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flush loop and ship whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Flush on a size or time trigger, whichever comes first."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as err:
+                logging.error(f"Command log flush failed: {err}")
+
+    def _take_message(self) -> tuple[str, list[CommandLogRecord], int]:
+        """Pop queued records into one message body that fits Discord's length limit.
+
+        Returns the body, the records it holds and the drop count it reports so
+        a failed send can hand them back via _restore.
+        """
+        parts: list[str] = []
+        records: list[CommandLogRecord] = []
+        length = 0
+        notice = self._unreported_drops
+        if notice:
+            parts.append(f"⚠️ {notice} command log entries were dropped (queue full or send failed).")
+            length = len(parts[0])
+            self._unreported_drops = 0
+        while self._pending:
+            text = self._pending[0].render()
+            added = len(text) + (2 if parts else 0)
+            if parts and length + added > DISCORD_MESSAGE_LIMIT:
+                break
+            records.append(self._pending.popleft())
+            parts.append(text)
+            length += added
+        return "\n\n".join(parts), records, notice
+
+    def _restore(self, records: list[CommandLogRecord], notice: int) -> None:
+        """Put an unsent batch back at the front of the queue, oldest first."""
+        self._unreported_drops += notice
+        self._pending.extendleft(reversed(records))
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+            self._unreported_drops += 1
+
+    async def flush(self) -> None:
+        """Send every queued record, packed into as few messages as possible."""
+        if not self._pending and not self._unreported_drops:
+            return
+        if self._bot is None:
+            return
+        channel = await fetch_text_channel(self._bot, self.channel_id)
+        if not channel:
+            return
+        while self._pending or self._unreported_drops:
+            await self.bucket.acquire()
+            content, records, notice = self._take_message()
+            try:
+                await channel.send(content)
+                self.messages_sent += 1
+            except discord.HTTPException as err:
+                if err.status == 429:
+                    self.bucket.penalize(retry_after_seconds(err))
+                if err.status == 429 or err.status >= 500:
+                    self._restore(records, notice)
+                else:
+                    self.dropped += len(records)
+                    self._unreported_drops += len(records)
+                logging.error(f"Failed to ship command log batch: {err}")
+                return
+
+
+command_log_shipper = LogShipper(COMMAND_LOG_CHANNEL_ID)
+
+
 async def log_command_usage(bot_instance: commands.Bot,
                             interaction: discord.Interaction,
                             command_name: str,
                             parameters_text: str = "",
                             status: str = "Success",
                             extra_info: Optional[str] = None) -> None:
-    """Send a human-readable log entry for slash command usage."""
-    channel = await fetch_text_channel(bot_instance, COMMAND_LOG_CHANNEL_ID)
-    if not channel:
-        return
-
+    """Queue a human-readable log entry for slash command usage."""
+    bot_metrics.count_command(command_name, status)
     command_line = f"/{command_name}".strip()
     if parameters_text:
         command_line = f"{command_line} {parameters_text}".strip()
 
-    log_lines = [
-        "1. Command Execution Log",
-        "",
-        "User",
-        f"{interaction.user.mention} (`{interaction.user.id}`)",
-        "",
-        "Channel",
-        getattr(interaction.channel, 'mention', 'N/A'),
-        "",
-        "Command",
-        "```",
-        f"/{command_name}",
-        "```",
-        "",
-        "Message Content",
-        "```",
-        command_line,
-        "```",
-        "",
-        "Status",
-        status,
-    ]
-
-    if extra_info:
-        log_lines.extend(["", "Details", extra_info])
-
-    log_lines.extend(["", _get_timestamp_label()])
-
-    await channel.send("\n".join(log_lines))
+    command_log_shipper.submit(CommandLogRecord(
+        user_mention=interaction.user.mention,
+        user_id=interaction.user.id,
+        channel_mention=getattr(interaction.channel, 'mention', 'N/A'),
+        command_name=command_name,
+        command_line=command_line,
+        status=status,
+        extra_info=extra_info,
+        timestamp_label=_get_timestamp_label(),
+    ))
 
 
 def render_value_for_logs(value: Any) -> str:
@@ -115,26 +917,785 @@ def render_value_for_logs(value: Any) -> str:
     return str(value)
 
 
+AUDIT_PRIORITY_CRITICAL = 0
+AUDIT_PRIORITY_ROUTINE = 1
+AUDIT_MAX_PENDING = 1000
+AUDIT_BACKLOG_WARNING = 200
+AUDIT_RETRY_DELAY = 5.0
+AUDIT_CLOSE_ATTEMPTS = 3
+DISCORD_EMBEDS_PER_MESSAGE = 10
+DISCORD_EMBED_TOTAL_LIMIT = 6000
+DISCORD_EMBED_DESCRIPTION_LIMIT = 4096
+
+# An embed plus an optional (filename, bytes) attachment.
+AuditItem = tuple[discord.Embed, Optional[tuple[str, bytes]]]
+
+
+class AuditRelay:
+    """Prioritized, rate-limited outbound queue for the audit log channel.
+
+    Embeds wait in one queue per priority. Each send packs up to ten embeds,
+    critical ones first, and waits on a client-side bucket so bursts stay
+    under the channel's rate limit. When max_pending is reached the oldest
+    routine embed is dropped first. A batch that hits a 429, a 5xx or a
+    missing channel goes back on its queues; other failures count as drops.
+    """
+
+    def __init__(self, channel_id: int, max_pending: int = AUDIT_MAX_PENDING):
+        self.channel_id = channel_id
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.messages_sent = 0
+        self.embeds_sent = 0
+        self.bucket = RateLimitBucket(*CHANNEL_RATE_LIMIT)
+        self._queues: tuple[deque[AuditItem], deque[AuditItem]] = (deque(), deque())
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._bot: Optional[commands.Bot] = None
+        self._backlog_warned = False
+
+    @property
+    def depth(self) -> int:
+        """Number of embeds waiting to be sent."""
+        return sum(len(q) for q in self._queues)
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth and delivery counters for diagnostics."""
+        return {
+            "critical": len(self._queues[AUDIT_PRIORITY_CRITICAL]),
+            "routine": len(self._queues[AUDIT_PRIORITY_ROUTINE]),
+            "dropped": self.dropped,
+            "messages_sent": self.messages_sent,
+            "embeds_sent": self.embeds_sent,
+            "rate_limit_waits": self.bucket.waits,
+            "rate_limit_hits": rate_limit_counter.hits["audit"],
+        }
+
+    def submit(self, embed: discord.Embed, priority: int = AUDIT_PRIORITY_ROUTINE,
+               attachment: Optional[tuple[str, bytes]] = None) -> None:
+        """Queue an embed, and optionally a file to attach with it, for delivery."""
+        if self.depth >= self.max_pending:
+            self._drop_oldest()
+        self._queues[priority].append((embed, attachment))
+        self._ready.set()
+
+        if self.depth >= AUDIT_BACKLOG_WARNING and not self._backlog_warned:
+            self._backlog_warned = True
+            logging.warning(f"Audit relay backlog at {self.depth} embeds")
+        elif self.depth < AUDIT_BACKLOG_WARNING // 2:
+            self._backlog_warned = False
+
+    def _drop_oldest(self) -> None:
+        """Discard the oldest routine embed, or the oldest critical one if none are routine."""
+        routine = self._queues[AUDIT_PRIORITY_ROUTINE]
+        (routine or self._queues[AUDIT_PRIORITY_CRITICAL]).popleft()
+        self.dropped += 1
+
+    def _requeue(self, batch: list[tuple[int, AuditItem]]) -> None:
+        """Put an unsent batch back at the front of its queues."""
+        for priority, item in reversed(batch):
+            self._queues[priority].appendleft(item)
+        while self.depth > self.max_pending:
+            self._drop_oldest()
+
+    def start(self, bot_instance: commands.Bot) -> None:
+        """Start the background delivery loop."""
+        self._bot = bot_instance
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the delivery loop and send whatever is still queued.
+
+        Gives up after AUDIT_CLOSE_ATTEMPTS failed sends in a row and counts
+        the embeds still queued as dropped.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        failures = 0
+        while self.depth and failures < AUDIT_CLOSE_ATTEMPTS:
+            await self.bucket.acquire()
+            failures = 0 if await self._send(self._take_batch()) else failures + 1
+        if self.depth:
+            logging.error(f"Audit relay closed with {self.depth} embeds unsent")
+            self.dropped += self.depth
+            for pending in self._queues:
+                pending.clear()
+
+    async def _run(self) -> None:
+        """Send batches as fast as the bucket allows while embeds are queued."""
+        while True:
+            await self._ready.wait()
+            if not self.depth:
+                self._ready.clear()
+                continue
+            # Embeds that arrive while waiting for a token join this batch.
+            await self.bucket.acquire()
+            batch = self._take_batch()
+            try:
+                sent = await self._send(batch)
+            except Exception as err:
+                logging.error(f"Audit relay send failed: {err}")
+                self.dropped += len(batch)
+                sent = False
+            if not sent and self.depth:
+                await asyncio.sleep(AUDIT_RETRY_DELAY)
+
+    def _take_batch(self) -> list[tuple[int, AuditItem]]:
+        """Pop up to ten embeds, critical first, within the per-message size limit."""
+        batch: list[tuple[int, AuditItem]] = []
+        length = 0
+        for priority, pending in enumerate(self._queues):
+            while pending and len(batch) < DISCORD_EMBEDS_PER_MESSAGE:
+                size = len(pending[0][0])
+                if batch and length + size > DISCORD_EMBED_TOTAL_LIMIT:
+                    return batch
+                batch.append((priority, pending.popleft()))
+                length += size
+        return batch
+
+    async def _send(self, batch: list[tuple[int, AuditItem]]) -> bool:
+        """Deliver one batch; if it can be retried put it back at the front of its queues."""
+        if not batch:
+            return False
+        if self._bot is None:
+            self._requeue(batch)
+            return False
+        channel = await fetch_text_channel(self._bot, self.channel_id)
+        if not channel:
+            logging.error(f"Audit log channel {self.channel_id} unavailable; {len(batch)} embeds requeued")
+            self._requeue(batch)
+            return False
+        kwargs: dict[str, Any] = {"embeds": [embed for _, (embed, _) in batch]}
+        files = []
+        for _, (_, attachment) in batch:
+            if attachment:
+                name, data = attachment
+                files.append(discord.File(io.BytesIO(data), filename=name))
+        if files:
+            kwargs["files"] = files
+        try:
+            await channel.send(**kwargs)
+        except discord.HTTPException as err:
+            if err.status == 429:
+                self.bucket.penalize(retry_after_seconds(err))
+                self._requeue(batch)
+            elif err.status >= 500:
+                logging.error(f"Failed to relay audit batch, will retry: {err}")
+                self._requeue(batch)
+            else:
+                logging.error(f"Failed to relay audit batch: {err}")
+                self.dropped += len(batch)
+            return False
+        self.messages_sent += 1
+        self.embeds_sent += len(batch)
+        return True
+
+
+audit_relay = AuditRelay(AUDIT_LOG_CHANNEL_ID)
+
+
 async def send_audit_log_entry(title: str,
                                lines: list[str],
                                footer: Optional[str] = None,
-                               color: Optional[discord.Color] = None) -> None:
-    """Send an audit log embed to the configured channel."""
-    channel = await fetch_text_channel(bot, AUDIT_LOG_CHANNEL_ID)
-    if not channel:
-        return
+                               color: Optional[discord.Color] = None,
+                               priority: int = AUDIT_PRIORITY_ROUTINE) -> None:
+    """Queue an audit log embed for the configured channel."""
+    with bot_metrics.time("embed.audit"):
+        description = truncate_text("\n".join(lines), DISCORD_EMBED_DESCRIPTION_LIMIT)
+        embed = discord.Embed(
+            title=title,
+            description=description,
+            color=color or discord.Color.blurple(),
+            timestamp=datetime.utcnow()
+        )
+        footer_text = footer or ""
+        timestamp_text = _get_timestamp_label()
+        embed.set_footer(text=f"{footer_text} • {timestamp_text}".strip(" •"))
+    audit_relay.submit(embed, priority)
+
+
+DM_CONCURRENCY = 4
+DM_MAX_PENDING = 1000
+DM_MAX_ATTEMPTS = 4
+DM_RETRY_BASE = 2.0
+DM_CLOSED_TTL = 6 * 3600
+DM_CLOSE_GRACE = 5.0
+# Tables whose rows carry a dm_status column for the notice sent about them.
+DM_STATUS_TABLES = ("promotions", "infractions")
+
+
+class DMJob:
+    """One direct message waiting to be delivered"""
+
+    __slots__ = ("user", "embed", "table", "row_id", "attempts")
+
+    def __init__(self, user: discord.abc.User, embed: discord.Embed, table: Optional[str] = None,
+                 row_id: Optional[int] = None):
+        self.user = user
+        self.embed = embed
+        self.table = table
+        self.row_id = row_id
+        self.attempts = 0
+
+
+class DMDispatcher:
+    """Delivers DMs in the background so commands never wait on a user's DM channel.
+
+    DM_CONCURRENCY workers drain the queue. Rate limits, server errors and
+    network failures are retried with exponential backoff up to max_attempts.
+    A 403 means the user's DMs are closed: that is remembered for closed_ttl so
+    later notices to them are skipped without a request. The outcome (sent,
+    closed, failed or dropped) is written to the dm_status column of the row the
+    notice is about; notices still undelivered at shutdown are recorded as failed.
+    """
+
+    def __init__(self, concurrency: int = DM_CONCURRENCY, max_pending: int = DM_MAX_PENDING,
+                 max_attempts: int = DM_MAX_ATTEMPTS, retry_base: float = DM_RETRY_BASE,
+                 closed_ttl: float = DM_CLOSED_TTL):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.closed_ttl = closed_ttl
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.retried = 0
+        self.dropped = 0
+        self._queue: asyncio.Queue[DMJob] = asyncio.Queue()
+        self._closed: dict[int, float] = {}
+        self._workers: list[asyncio.Task] = []
+        self._background: set[asyncio.Task] = set()
+        self._status_writes: set[asyncio.Task] = set()
+        self._active: set[DMJob] = set()
+        self._retrying: set[DMJob] = set()
+
+    @property
+    def depth(self) -> int:
+        """Number of DMs waiting for a worker."""
+        return self._queue.qsize()
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth and delivery counters for diagnostics."""
+        return {
+            "pending": self.depth,
+            "retrying": len(self._background),
+            "sent": self.sent,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "closed_cached": len(self._closed),
+        }
+
+    def submit(self, user: discord.abc.User, embed: discord.Embed, table: Optional[str] = None,
+               row_id: Optional[int] = None) -> None:
+        """Queue a DM to user, recording the outcome on table/row_id when given."""
+        job = DMJob(user, embed, table, row_id)
+        if self.depth >= self.max_pending:
+            self.dropped += 1
+            logging.warning(f"DM queue full, dropping notice to {user.id}")
+            self._record(job, "dropped")
+            return
+        self._queue.put_nowait(job)
+
+    def start(self) -> None:
+        """Start the delivery workers."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self, grace: float = DM_CLOSE_GRACE) -> None:
+        """Give queued DMs a short grace period, then stop the workers.
+
+        DMs still queued, sending or waiting to retry are marked failed, and
+        every status write is awaited before returning.
+        """
+        if self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=grace)
+            except asyncio.TimeoutError:
+                logging.warning(f"{self.depth} DMs still queued at shutdown")
+        abandoned = [*self._active, *self._retrying]
+        while not self._queue.empty():
+            abandoned.append(self._queue.get_nowait())
+            self._queue.task_done()
+        tasks = [*self._workers, *self._background]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._background.clear()
+        self._active.clear()
+        self._retrying.clear()
+        for job in abandoned:
+            self.failed += 1
+            self._record(job, "failed")
+        await asyncio.gather(*self._status_writes, return_exceptions=True)
+
+    def _dms_closed(self, user_id: int) -> bool:
+        """Whether user_id recently refused a DM."""
+        closed_at = self._closed.get(user_id)
+        if closed_at is None:
+            return False
+        if time.monotonic() - closed_at > self.closed_ttl:
+            del self._closed[user_id]
+            return False
+        return True
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        """Run coro in the background, keeping a reference until it finishes."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _record(self, job: DMJob, status: str) -> None:
+        """Write the job's outcome in the background; close() waits for these writes."""
+        task = asyncio.ensure_future(self._set_status(job, status))
+        self._status_writes.add(task)
+        task.add_done_callback(self._status_writes.discard)
+
+    async def _retry_later(self, job: DMJob, delay: float) -> None:
+        """Put job back on the queue after delay."""
+        await asyncio.sleep(delay)
+        self._retrying.discard(job)
+        self._queue.put_nowait(job)
+
+    async def _worker(self) -> None:
+        """Deliver queued DMs one at a time."""
+        while True:
+            job = await self._queue.get()
+            self._active.add(job)
+            try:
+                await self._deliver(job)
+            except Exception as err:
+                logging.error(f"DM delivery to {job.user.id} failed unexpectedly: {err}")
+            finally:
+                self._active.discard(job)
+                self._queue.task_done()
+
+    async def _deliver(self, job: DMJob) -> None:
+        """Send one DM, scheduling a retry or recording the outcome."""
+        if self._dms_closed(job.user.id):
+            self.skipped += 1
+            self._record(job, "closed")
+            return
+        job.attempts += 1
+        try:
+            await job.user.send(embed=job.embed)
+        except discord.Forbidden:
+            self._closed[job.user.id] = time.monotonic()
+            self.failed += 1
+            logging.warning(f"Could not DM {job.user.name}")
+            self._record(job, "closed")
+            return
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as err:
+            status = getattr(err, "status", None)
+            transient = status is None or status == 429 or status >= 500
+            if transient and job.attempts < self.max_attempts:
+                delay = (retry_after_seconds(err) if status == 429
+                         else self.retry_base * 2 ** (job.attempts - 1))
+                self.retried += 1
+                self._retrying.add(job)
+                self._spawn(self._retry_later(job, delay))
+                return
+            self.failed += 1
+            logging.error(f"Failed to DM {job.user.name} after {job.attempts} attempts: {err}")
+            self._record(job, "failed")
+            return
+        self.sent += 1
+        self._record(job, "sent")
+
+    @staticmethod
+    async def _set_status(job: DMJob, status: str) -> None:
+        """Record the delivery outcome on the job's row."""
+        if job.table not in DM_STATUS_TABLES or job.row_id is None:
+            return
+        try:
+            # noinspection SqlNoDataSourceInspection
+            await db.execute(f'UPDATE {job.table} SET dm_status = ? WHERE id = ?', (status, job.row_id))
+        except sqlite3.Error as err:
+            logging.error(f"Failed to record DM status for {job.table} #{job.row_id}: {err}")
+
+
+dm_dispatcher = DMDispatcher()
+
+
+DELETE_BURST_WINDOW = 3.0
+DELETE_BURST_MAX_AGE = 15.0
+DELETE_TRANSCRIPT_LIMIT = 512 * 1024
+
+
+# Rough per-entry cost of a StoredMessage beyond its strings, used for the byte budget.
+STORED_MESSAGE_OVERHEAD = 160
+
+
+class StoredMessage:
+    """The parts of a message needed for edit/delete logging; author_id is None when unknown."""
+
+    __slots__ = ("message_id", "channel_id", "author_id", "content", "attachments")
+
+    def __init__(self, message_id: int, channel_id: int, author_id: Optional[int] = None,
+                 content: Optional[str] = None, attachments: tuple[str, ...] = ()):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.content = content
+        self.attachments = attachments
+
+    @classmethod
+    def from_message(cls, message: discord.Message) -> "StoredMessage":
+        """Capture a gateway message."""
+        return cls(message.id, message.channel.id, message.author.id, message.content,
+                   tuple(attachment.url for attachment in message.attachments))
+
+    @property
+    def size(self) -> int:
+        """Approximate memory cost in bytes."""
+        return (STORED_MESSAGE_OVERHEAD + len(self.content or "")
+                + sum(len(url) + 56 for url in self.attachments))
+
+
+class DeleteBurst:
+    """Deletions in one channel that fall inside the same aggregation window."""
+
+    __slots__ = ("guild_id", "channel_id", "messages", "actor_ids", "audit_count", "bulk", "started", "last_seen")
+
+    def __init__(self, guild_id: int, channel_id: int):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.messages: list[StoredMessage] = []
+        self.actor_ids: set[int] = set()
+        self.audit_count = 0
+        self.bulk = False
+        self.started = time.monotonic()
+        self.last_seen = self.started
+
+
+class DeleteAggregator:
+    """Folds bursts of message deletions in a channel into a single audit record.
+
+    A burst closes once no deletion has arrived in the channel for `window`
+    seconds, or `max_age` seconds after it opened. Actors come from the
+    message_delete and message_bulk_delete audit log entries for that channel.
+    An isolated delete is still relayed as a normal "Message Deleted" embed.
+    Larger bursts become one summary embed with the full transcript attached.
+    """
+
+    def __init__(self, window: float = DELETE_BURST_WINDOW, max_age: float = DELETE_BURST_MAX_AGE):
+        self.window = window
+        self.max_age = max_age
+        self.bursts_emitted = 0
+        self.messages_folded = 0
+        self._bursts: dict[int, DeleteBurst] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _burst(self, guild_id: int, channel_id: int) -> DeleteBurst:
+        """Return the open burst for a channel, opening one if needed."""
+        burst = self._bursts.get(channel_id)
+        if burst is None:
+            burst = self._bursts[channel_id] = DeleteBurst(guild_id, channel_id)
+        burst.last_seen = time.monotonic()
+        return burst
+
+    def add(self, guild_id: int, channel_id: int, messages: Iterable[StoredMessage], bulk: bool = False) -> None:
+        """Record deleted messages for a channel."""
+        burst = self._burst(guild_id, channel_id)
+        burst.messages.extend(messages)
+        burst.bulk = burst.bulk or bulk
+
+    def note_actor(self, guild_id: int, channel_id: int, actor_id: Optional[int], count: int = 1) -> None:
+        """Attribute the channel's current burst to the moderator named in an audit entry."""
+        burst = self._burst(guild_id, channel_id)
+        if actor_id:
+            burst.actor_ids.add(actor_id)
+        burst.audit_count += count
+
+    def start(self) -> None:
+        """Start the background loop that closes expired bursts."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the loop and emit every open burst."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for channel_id in list(self._bursts):
+            self._emit(self._bursts.pop(channel_id))
+
+    async def _run(self) -> None:
+        """Emit bursts whose window has closed."""
+        while True:
+            await asyncio.sleep(self.window / 3)
+            now = time.monotonic()
+            for channel_id, burst in list(self._bursts.items()):
+                if now - burst.last_seen >= self.window or now - burst.started >= self.max_age:
+                    del self._bursts[channel_id]
+                    try:
+                        self._emit(burst)
+                    except Exception as err:
+                        logging.error(f"Failed to summarize deletions in {channel_id}: {err}")
+
+    def _emit(self, burst: DeleteBurst) -> None:
+        """Queue the audit record for a closed burst."""
+        self.bursts_emitted += 1
+        self.messages_folded += len(burst.messages)
+        actors = ", ".join(f"<@{actor_id}>" for actor_id in sorted(burst.actor_ids)) or "Author or unknown"
+
+        # An audit entry can arrive for a delete whose message was never cached, so a
+        # non-bulk window with at most one delete is still a single deletion.
+        if not burst.bulk and len(burst.messages) <= 1 and burst.audit_count <= 1:
+            message = burst.messages[0] if burst.messages else None
+            if message is not None and message.author_id is not None:
+                author = f"<@{message.author_id}> (`{message.author_id}`)"
+                content = message.content or "[embed/attachment]"
+            else:
+                author = "Unknown"
+                content = "[content unavailable]"
+            lines = [
+                f"**User:** {author}",
+                f"**Channel:** <#{burst.channel_id}>",
+                f"**Deleted by:** {actors}",
+                "",
+                "**Content:**",
+                truncate_text(content),
+                "",
+                "**Attachments:**",
+                truncate_text(", ".join(message.attachments if message else ()) or "None", 512),
+            ]
+            footer = f"Channel ID: {burst.channel_id}"
+            if message is not None:
+                footer = f"Message ID: {message.message_id} | {footer}"
+            self._submit("Message Deleted", lines, footer, discord.Color.red())
+            return
+
+        count = max(len(burst.messages), burst.audit_count)
+        cached = sum(1 for message in burst.messages if message.author_id is not None)
+        authors: dict[int, int] = {}
+        for message in burst.messages:
+            if message.author_id is not None:
+                authors[message.author_id] = authors.get(message.author_id, 0) + 1
+        top_authors = sorted(authors.items(), key=lambda item: item[1], reverse=True)[:10]
+        lines = [
+            f"**Channel:** <#{burst.channel_id}>",
+            f"**Deleted by:** {actors}",
+            f"**Messages:** {count} ({cached} with cached content)",
+        ]
+        if top_authors:
+            lines.extend(["", "**Authors:**"])
+            lines.extend(f"• <@{author_id}> × {total}" for author_id, total in top_authors)
+            if len(authors) > len(top_authors):
+                lines.append(f"• …and {len(authors) - len(top_authors)} more")
+        attachment = None
+        if burst.messages:
+            attachment = (f"deleted-{burst.channel_id}-{int(time.time())}.txt", self._transcript(burst))
+            lines.extend(["", "Full content is in the attached file."])
+        footer = f"Channel ID: {burst.channel_id}"
+        self._submit("Messages Purged", lines, footer, discord.Color.orange(), attachment)
+
+    @staticmethod
+    def _transcript(burst: DeleteBurst) -> bytes:
+        """Render the burst's messages as a plain-text transcript."""
+        out = io.StringIO()
+        for message in sorted(burst.messages, key=lambda m: m.message_id):
+            if message.author_id is None:
+                out.write(f"[{message.message_id}] (not cached)\n")
+                continue
+            out.write(f"[{message.message_id}] {message.author_id}: {message.content or ''}\n")
+            for url in message.attachments:
+                out.write(f"    attachment: {url}\n")
+        data = out.getvalue().encode("utf-8")
+        if len(data) > DELETE_TRANSCRIPT_LIMIT:
+            data = data[:DELETE_TRANSCRIPT_LIMIT] + "\n[truncated]\n".encode("utf-8")
+        return data
+
+    @staticmethod
+    def _submit(title: str, lines: list[str], footer: str, color: discord.Color,
+                attachment: Optional[tuple[str, bytes]] = None) -> None:
+        """Build the embed and hand it to the audit relay."""
+        embed = discord.Embed(title=title,
+                              description=truncate_text("\n".join(lines), DISCORD_EMBED_DESCRIPTION_LIMIT),
+                              color=color, timestamp=datetime.utcnow())
+        embed.set_footer(text=f"{footer} • {_get_timestamp_label()}")
+        audit_relay.submit(embed, AUDIT_PRIORITY_ROUTINE, attachment)
+
+
+delete_aggregator = DeleteAggregator()
+
+MESSAGE_STORE_BUDGET = 16 * 1024 * 1024
+MESSAGE_STORE_SPILL = True
+MESSAGE_STORE_TTL = 7 * 24 * 3600
+MESSAGE_STORE_FLUSH_INTERVAL = 10.0
+MESSAGE_STORE_PURGE_INTERVAL = 3600.0
+SQLITE_MAX_PARAMS = 500
+
+
+class MessageStore:
+    """Bounded store of recent message content for resolving raw edit/delete events.
+
+    Entries live in insertion order and the oldest are evicted once the
+    approximate byte budget is exceeded. With spill enabled, evicted entries
+    are written in batches to the message_cache table and kept for `ttl`
+    seconds, so deletes of older messages can still be described. Forgotten
+    messages are removed from the table in the same batches.
+    """
+
+    def __init__(self, budget: int = MESSAGE_STORE_BUDGET, spill: bool = MESSAGE_STORE_SPILL,
+                 ttl: int = MESSAGE_STORE_TTL):
+        self.budget = budget
+        self.spill = spill
+        self.ttl = ttl
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.spilled = 0
+        self._entries: OrderedDict[int, StoredMessage] = OrderedDict()
+        self._spill_pending: dict[int, StoredMessage] = {}
+        self._spill_deletes: set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def remember(self, entry: StoredMessage) -> None:
+        """Store or replace an entry, evicting the oldest ones beyond the budget."""
+        previous = self._entries.pop(entry.message_id, None)
+        if previous is not None:
+            self.bytes_used -= previous.size
+        self._entries[entry.message_id] = entry
+        self.bytes_used += entry.size
+        while self.bytes_used > self.budget and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_used -= evicted.size
+            if self.spill:
+                self._spill_pending[evicted.message_id] = evicted
+
+    def forget(self, message_id: int) -> None:
+        """Drop an entry after its message was deleted."""
+        entry = self._entries.pop(message_id, None)
+        if entry is not None:
+            self.bytes_used -= entry.size
+        self._spill_pending.pop(message_id, None)
+        if self.spill:
+            self._spill_deletes.add(message_id)
+
+    async def resolve_many(self, message_ids: Iterable[int]) -> dict[int, StoredMessage]:
+        """Look up entries in memory, then in the spill table for the rest."""
+        found: dict[int, StoredMessage] = {}
+        missing = []
+        requested = 0
+        for message_id in message_ids:
+            requested += 1
+            entry = self._entries.get(message_id) or self._spill_pending.get(message_id)
+            if entry is not None:
+                found[message_id] = entry
+            else:
+                missing.append(message_id)
+
+        if missing and self.spill:
+            cutoff = int(time.time()) - self.ttl
+            for start in range(0, len(missing), SQLITE_MAX_PARAMS):
+                chunk = missing[start:start + SQLITE_MAX_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                # noinspection SqlNoDataSourceInspection
+                rows = await db.fetchall(f'''SELECT message_id, channel_id, author_id, content, attachments
+                                             FROM message_cache
+                                             WHERE message_id IN ({placeholders}) AND stored_at >= ?''',
+                                         (*chunk, cutoff))
+                for row in rows:
+                    attachments = tuple(row["attachments"].split("\n")) if row["attachments"] else ()
+                    found[row["message_id"]] = StoredMessage(row["message_id"], row["channel_id"], row["author_id"],
+                                                             row["content"], attachments)
+
+        self.hits += len(found)
+        self.misses += requested - len(found)
+        return found
+
+    async def resolve(self, message_id: int) -> Optional[StoredMessage]:
+        """Look up a single entry."""
+        return (await self.resolve_many([message_id])).get(message_id)
+
+    def start(self) -> None:
+        """Start the background spill and TTL purge loop."""
+        if self.spill and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the loop and write out the pending spill and live entries younger than the TTL."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.spill:
+            # Keep recent messages resolvable across a restart.
+            cutoff = time.time() - self.ttl
+            self._spill_pending.update((message_id, entry) for message_id, entry in self._entries.items()
+                                       if discord.utils.snowflake_time(message_id).timestamp() >= cutoff)
+        await self.flush_spill()
+
+    async def _run(self) -> None:
+        """Flush evicted entries periodically and purge expired ones."""
+        last_purge = 0.0
+        while True:
+            await asyncio.sleep(MESSAGE_STORE_FLUSH_INTERVAL)
+            try:
+                await self.flush_spill()
+                if time.monotonic() - last_purge >= MESSAGE_STORE_PURGE_INTERVAL:
+                    last_purge = time.monotonic()
+                    # noinspection SqlNoDataSourceInspection
+                    await db.execute('DELETE FROM message_cache WHERE stored_at < ?', (int(time.time()) - self.ttl,))
+            except Exception as err:
+                logging.error(f"Message store maintenance failed: {err}")
+
+    async def flush_spill(self) -> None:
+        """Apply queued deletes and write evicted entries to the spill table in one transaction."""
+        if not self._spill_pending and not self._spill_deletes:
+            return
+        pending = list(self._spill_pending.values())
+        self._spill_pending.clear()
+        deletes = [(message_id,) for message_id in self._spill_deletes]
+        self._spill_deletes.clear()
+        now = int(time.time())
+        rows = [(entry.message_id, entry.channel_id, entry.author_id, entry.content,
+                 "\n".join(entry.attachments), now) for entry in pending]
+
+        def _write(conn: sqlite3.Connection) -> None:
+            # noinspection SqlNoDataSourceInspection
+            conn.executemany('DELETE FROM message_cache WHERE message_id = ?', deletes)
+            # noinspection SqlNoDataSourceInspection
+            conn.executemany('''INSERT OR REPLACE INTO message_cache
+                                (message_id, channel_id, author_id, content, attachments, stored_at)
+                                VALUES (?, ?, ?, ?, ?, ?)''', rows)
+
+        await db.transaction(_write)
+        self.spilled += len(rows)
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit/miss counters for diagnostics."""
+        return {
+            "entries": len(self._entries),
+            "bytes_used": self.bytes_used,
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "spilled": self.spilled,
+        }
+
 
-    description = "\n".join(lines)
-    embed = discord.Embed(
-        title=title,
-        description=description,
-        color=color or discord.Color.blurple(),
-        timestamp=datetime.utcnow()
-    )
-    footer_text = footer or ""
-    timestamp_text = _get_timestamp_label()
-    embed.set_footer(text=f"{footer_text} • {timestamp_text}".strip(" •"))
-    await channel.send(embed=embed)
+message_store = MessageStore()
 
 
 def build_audit_summary(entry: discord.AuditLogEntry, title: str) -> str:
@@ -146,9 +1707,9 @@ def build_audit_summary(entry: discord.AuditLogEntry, title: str) -> str:
         return f"{target_text}'s profile was updated."
     if action == AuditLogAction.member_role_update and target_text:
         return f"{target_text}'s roles changed."
-    if action == AuditLogAction.member_ban_add and target_text:
+    if action == AuditLogAction.ban and target_text:
         return f"{target_text} was banned."
-    if action == AuditLogAction.member_ban_remove and target_text:
+    if action == AuditLogAction.unban and target_text:
         return f"{target_text} was unbanned."
     if action == AuditLogAction.kick and target_text:
         return f"{target_text} was kicked."
@@ -159,14 +1720,14 @@ def build_audit_summary(entry: discord.AuditLogEntry, title: str) -> str:
 
 def build_change_sections(entry: discord.AuditLogEntry) -> list[str]:
     """Return formatted before/after sections for audit log changes."""
-    if not entry.changes:
-        return []
+    # AuditLogChanges is not iterable itself; its before/after diffs yield (attribute, value) pairs.
+    before_values = dict(entry.changes.before)
+    after_values = dict(entry.changes.after)
 
     sections: list[str] = []
-    for change in entry.changes:
-        attribute = getattr(change, "attribute", getattr(change, "key", "Value"))
-        before = truncate_text(format_audit_value(getattr(change, "before", None)))
-        after = truncate_text(format_audit_value(getattr(change, "after", None)))
+    for attribute in dict.fromkeys([*before_values, *after_values]):
+        before = truncate_text(format_audit_value(before_values.get(attribute)))
+        after = truncate_text(format_audit_value(after_values.get(attribute)))
         header = attribute.replace("_", " ").title()
         sections.extend([
             "",
@@ -178,14 +1739,15 @@ def build_change_sections(entry: discord.AuditLogEntry) -> list[str]:
 
 
 def ensure_column_exists(cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
-    """Ensure a specific column exists on a table."""
+    """Ensure a specific column exists on a table.
+
+    A failed ALTER TABLE raises, so the migration step calling this rolls back
+    and is not recorded as applied.
+    """
     cursor.execute(f"PRAGMA table_info({table})")
     columns = {row[1] for row in cursor.fetchall()}
     if column not in columns:
-        try:
-            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
-        except sqlite3.OperationalError as err:
-            logging.error(f"Failed adding column {column} to {table}: {err}")
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
 
 
 def format_option_details(options: Iterable[tuple[str, Any]]) -> str:
@@ -205,18 +1767,152 @@ def truncate_text(text: str, limit: int = 1024) -> str:
     return text if len(text) <= limit else f"{text[:limit - 3]}..."
 
 
+ATTENDANCE_EDIT_DELAY = 1.5
+ATTENDEE_PREVIEW_LIMIT = 30
+ROSTER_PAGE_SIZE = 50
+
+
+class AttendeeRoster:
+    """Attendees in join order, with the embed preview of the first few kept up to date incrementally.
+
+    Joining appends to the cached preview while it has room. Leaving only
+    rebuilds the preview when the member was part of it, and then only reads
+    the first `limit` attendees.
+    """
+
+    __slots__ = ("limit", "_members", "_preview_ids", "_rendered")
+
+    def __init__(self, user_ids: Iterable[int] = (), limit: int = ATTENDEE_PREVIEW_LIMIT):
+        self.limit = limit
+        self._members: dict[int, None] = dict.fromkeys(user_ids)
+        self._preview_ids: Optional[list[int]] = None
+        self._rendered: Optional[str] = None
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._members
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def add(self, user_id: int) -> None:
+        """Record a new attendee."""
+        if user_id in self._members:
+            return
+        self._members[user_id] = None
+        self._rendered = None
+        if self._preview_ids is not None and len(self._preview_ids) < self.limit:
+            self._preview_ids.append(user_id)
+
+    def remove(self, user_id: int) -> None:
+        """Remove an attendee."""
+        del self._members[user_id]
+        self._rendered = None
+        if self._preview_ids is not None and user_id in self._preview_ids:
+            self._preview_ids = None
+
+    def page(self, page: int, size: int = ROSTER_PAGE_SIZE) -> list[int]:
+        """Return the attendee ids on one roster page."""
+        return list(islice(self._members, page * size, (page + 1) * size))
+
+    def render(self) -> str:
+        """Return the Current Attendees field value: a count, the first mentions and the overflow."""
+        if self._rendered is None:
+            if self._preview_ids is None:
+                self._preview_ids = list(islice(self._members, self.limit))
+            if not self._members:
+                self._rendered = "No attendees yet"
+            else:
+                lines = [f"**{len(self._members)} attending**"]
+                lines.extend(f"<@{uid}>" for uid in self._preview_ids)
+                hidden = len(self._members) - len(self._preview_ids)
+                if hidden > 0:
+                    lines.append(f"…and {hidden} more (use **View All**)")
+                self._rendered = "\n".join(lines)
+        return self._rendered
+
+
+class EmbedUpdateCoalescer:
+    """Collapses bursts of edits to the same message into one edit carrying the latest state.
+
+    Callers pass a coroutine factory that renders from current state. One
+    worker per message waits `delay` seconds, runs the newest factory, and
+    repeats while more requests arrived meanwhile. Only one edit per message
+    is ever in flight, so the last toggle always wins.
+    """
+
+    def __init__(self, delay: float = ATTENDANCE_EDIT_DELAY):
+        self.delay = delay
+        self.requested = 0
+        self.applied = 0
+        self._renderers: dict[int, Callable[[], Awaitable[None]]] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of messages with an edit waiting to be applied."""
+        return len(self._renderers)
+
+    def request(self, key: int, render: Callable[[], Awaitable[None]]) -> None:
+        """Schedule render for the message identified by key, replacing any pending render."""
+        self.requested += 1
+        self._renderers[key] = render
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._worker(key))
+
+    async def _worker(self, key: int) -> None:
+        """Apply the newest render for key until no more requests are waiting."""
+        try:
+            while key in self._renderers:
+                await asyncio.sleep(self.delay)
+                await self._apply(key)
+        finally:
+            self._workers.pop(key, None)
+
+    async def _apply(self, key: int) -> None:
+        """Run the pending render for key, if any."""
+        render = self._renderers.pop(key, None)
+        if render is None:
+            return
+        try:
+            await render()
+            self.applied += 1
+        except discord.HTTPException as err:
+            logging.error(f"Failed to apply coalesced edit to {key}: {err}")
+
+    async def close(self) -> None:
+        """Cancel the delays and apply every pending render now."""
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        # Let an edit that was in flight settle before the final render replaces it.
+        await asyncio.gather(*workers, return_exceptions=True)
+        for key in list(self._renderers):
+            await self._apply(key)
+
+
+attendance_updates = EmbedUpdateCoalescer()
+
+
 async def toggle_attendance_state(view_obj: Any, interaction: discord.Interaction) -> None:
     """Reusable logic for toggling attendee membership."""
-    attendees: set[int] = getattr(view_obj, "attendees", set())
-    if interaction.user.id in attendees:
-        attendees.remove(interaction.user.id)
-    else:
+    attendees: AttendeeRoster = getattr(view_obj, "attendees", AttendeeRoster())
+    attending = interaction.user.id not in attendees
+    if attending:
         attendees.add(interaction.user.id)
+    else:
+        attendees.remove(interaction.user.id)
     setattr(view_obj, "attendees", attendees)
     await interaction_response(interaction).defer()
+    try:
+        await record_attendance(view_obj.event_type, view_obj.event_id, interaction.user.id, attending)
+    except sqlite3.Error as err:
+        logging.error(f"Failed to record attendance for {view_obj.event_type} {view_obj.event_id}: {err}")
     message_reference = getattr(view_obj, "message_reference", None)
     if message_reference:
-        await view_obj.update_embed(message_reference)
+        attendance_updates.request(message_reference.id, lambda: view_obj.update_embed(view_obj.message_reference))
 
 
 def format_audit_value(value: Any) -> str:
@@ -255,14 +1951,16 @@ def describe_audit_action(action: AuditLogAction) -> str:
     return mapping.get(action, action.name.replace("_", " ").title())
 
 
+CRITICAL_AUDIT_ACTIONS = {
+    AuditLogAction.ban,
+    AuditLogAction.unban,
+    AuditLogAction.integration_delete,
+    AuditLogAction.kick,
+}
+
+
 def audit_action_color(action: AuditLogAction) -> discord.Color:
     """Color coding for audit actions."""
-    critical = {
-        AuditLogAction.member_ban_add,
-        AuditLogAction.member_ban_remove,
-        AuditLogAction.integrations_delete,
-        AuditLogAction.kick,
-    }
     warning = {
         AuditLogAction.member_update,
         AuditLogAction.member_role_update,
@@ -270,18 +1968,15 @@ def audit_action_color(action: AuditLogAction) -> discord.Color:
         AuditLogAction.message_bulk_delete,
         AuditLogAction.guild_update,
     }
-    if action in critical:
+    if action in CRITICAL_AUDIT_ACTIONS:
         return discord.Color.red()
     if action in warning:
         return discord.Color.orange()
     return discord.Color.blurple()
 
 
-def init_db():
-    """Initialize database tables"""
-    conn = sqlite3.connect('bot_data.db')
-    c = conn.cursor()
-
+def _migrate_create_core_tables(c: sqlite3.Cursor) -> None:
+    """Schema v1: the original promotions, infractions, tryouts and trainings tables."""
     # noinspection SqlNoDataSourceInspection
     c.execute('''CREATE TABLE IF NOT EXISTS promotions
                  (
@@ -366,12 +2061,6 @@ def init_db():
                      NULL
                  )''')
 
-    ensure_column_exists(c, "promotions", "note", "TEXT")
-    ensure_column_exists(c, "infractions", "appealable", "INTEGER DEFAULT 0")
-    ensure_column_exists(c, "infractions", "note", "TEXT")
-    ensure_column_exists(c, "infractions", "log_channel_id", "INTEGER")
-    ensure_column_exists(c, "infractions", "log_message_id", "INTEGER")
-
     # noinspection SqlNoDataSourceInspection
     c.execute('''CREATE TABLE IF NOT EXISTS tryouts
                  (
@@ -448,8 +2137,927 @@ def init_db():
                      CURRENT_TIMESTAMP
                  )''')
 
-    conn.commit()
-    conn.close()
+
+def _migrate_add_late_columns(c: sqlite3.Cursor) -> None:
+    """Schema v2: columns added after the first release, backfilled on older databases."""
+    ensure_column_exists(c, "promotions", "note", "TEXT")
+    ensure_column_exists(c, "infractions", "appealable", "INTEGER DEFAULT 0")
+    ensure_column_exists(c, "infractions", "note", "TEXT")
+    ensure_column_exists(c, "infractions", "log_channel_id", "INTEGER")
+    ensure_column_exists(c, "infractions", "log_message_id", "INTEGER")
+
+
+def _migrate_add_lookup_indexes(c: sqlite3.Cursor) -> None:
+    """Schema v3: composite indexes for per-member infraction and promotion lookups."""
+    # Serves /infraction list ordering and the COUNT/DELETE in /infraction admin
+    # without touching the table for the count.
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_infractions_guild_user_ts
+                 ON infractions (guild_id, user_id, timestamp, id)''')
+    # Covering index for active/voided summaries.
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_infractions_guild_user_voided
+                 ON infractions (guild_id, user_id, voided)''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_promotions_guild_user_ts
+                 ON promotions (guild_id, user_id, timestamp, id)''')
+    c.execute("ANALYZE")
+
+
+def _migrate_add_message_cache(c: sqlite3.Cursor) -> None:
+    """Schema v4: spill table for message content evicted from the in-memory MessageStore."""
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TABLE IF NOT EXISTS message_cache
+                 (
+                     message_id INTEGER PRIMARY KEY,
+                     channel_id INTEGER NOT NULL,
+                     author_id INTEGER,
+                     content TEXT,
+                     attachments TEXT,
+                     stored_at INTEGER NOT NULL
+                 )''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('CREATE INDEX IF NOT EXISTS idx_message_cache_stored_at ON message_cache (stored_at)')
+
+
+def _migrate_add_event_attendance(c: sqlite3.Cursor) -> None:
+    """Schema v5: one row per attendee per tryout/training, replacing the unused JSON column."""
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TABLE IF NOT EXISTS event_attendance
+                 (
+                     event_type TEXT NOT NULL,
+                     event_id INTEGER NOT NULL,
+                     user_id INTEGER NOT NULL,
+                     joined_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                     PRIMARY KEY (event_type, event_id, user_id)
+                 ) WITHOUT ROWID''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('CREATE INDEX IF NOT EXISTS idx_tryouts_status ON tryouts (status)')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('CREATE INDEX IF NOT EXISTS idx_trainings_status ON trainings (status)')
+
+
+def _migrate_add_bot_state(c: sqlite3.Cursor) -> None:
+    """Schema v6: small key/value store for bot bookkeeping such as the synced command tree hash."""
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TABLE IF NOT EXISTS bot_state
+                 (
+                     key TEXT PRIMARY KEY,
+                     value TEXT NOT NULL,
+                     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                 )''')
+
+
+def _migrate_add_dm_status(c: sqlite3.Cursor) -> None:
+    """Schema v7: delivery status of the DM sent about each promotion and infraction."""
+    for table in DM_STATUS_TABLES:
+        ensure_column_exists(c, table, "dm_status", "TEXT")
+
+
+def _migrate_add_infraction_search(c: sqlite3.Cursor) -> None:
+    """Schema v8: FTS5 index over infraction text, kept in sync by triggers."""
+    # External-content table: the text lives only in infractions, the index stores tokens.
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS infractions_fts USING fts5
+                 (
+                     reason, note, voided_reason, infraction_type,
+                     content = 'infractions', content_rowid = 'id',
+                     tokenize = 'porter unicode61'
+                 )''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TRIGGER IF NOT EXISTS infractions_fts_insert
+                 AFTER INSERT ON infractions
+                 BEGIN
+                     INSERT INTO infractions_fts (rowid, reason, note, voided_reason, infraction_type)
+                     VALUES (new.id, new.reason, new.note, new.voided_reason, new.infraction_type);
+                 END''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TRIGGER IF NOT EXISTS infractions_fts_delete
+                 AFTER DELETE ON infractions
+                 BEGIN
+                     INSERT INTO infractions_fts (infractions_fts, rowid, reason, note, voided_reason, infraction_type)
+                     VALUES ('delete', old.id, old.reason, old.note, old.voided_reason, old.infraction_type);
+                 END''')
+    # Only re-index when indexed text changes, not on log message or status updates.
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TRIGGER IF NOT EXISTS infractions_fts_update
+                 AFTER UPDATE OF reason, note, voided_reason, infraction_type ON infractions
+                 BEGIN
+                     INSERT INTO infractions_fts (infractions_fts, rowid, reason, note, voided_reason, infraction_type)
+                     VALUES ('delete', old.id, old.reason, old.note, old.voided_reason, old.infraction_type);
+                     INSERT INTO infractions_fts (rowid, reason, note, voided_reason, infraction_type)
+                     VALUES (new.id, new.reason, new.note, new.voided_reason, new.infraction_type);
+                 END''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute("INSERT INTO infractions_fts (infractions_fts) VALUES ('rebuild')")
+
+
+def _migrate_add_infraction_revisions(c: sqlite3.Cursor) -> None:
+    """Schema v9: one row per field changed by an infraction edit."""
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TABLE IF NOT EXISTS infraction_revisions
+                 (
+                     id INTEGER PRIMARY KEY,
+                     infraction_id INTEGER NOT NULL,
+                     edited_by INTEGER NOT NULL,
+                     field TEXT NOT NULL,
+                     old_value TEXT,
+                     new_value TEXT,
+                     edited_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                 )''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_infraction_revisions_infraction
+                 ON infraction_revisions (infraction_id, id)''')
+
+
+# Every stored infraction column, shared by the archive table, the archive move and infractions_all.
+INFRACTION_COLUMNS = ("id", "user_id", "issued_by", "infraction_type", "reason", "severity", "appealable", "note",
+                      "timestamp", "voided", "voided_by", "voided_reason", "void_timestamp", "guild_id",
+                      "log_channel_id", "log_message_id", "dm_status", "cleared_at", "cleared_by", "cleared_reason")
+
+
+def _migrate_add_infraction_archive(c: sqlite3.Cursor) -> None:
+    """Schema v10: soft-deleted infractions and a cold infractions_archive tier.
+
+    The per-member lookup indexes become partial indexes over rows that are
+    not cleared. They carry cleared_at as a trailing column only so that the
+    hot queries' "cleared_at IS NULL" term stays index-only.
+    infractions_all is the union of both tiers for lookups by id; paged reads
+    query each tier on its own index instead.
+    """
+    ensure_column_exists(c, "infractions", "cleared_at", "DATETIME")
+    ensure_column_exists(c, "infractions", "cleared_by", "INTEGER")
+    ensure_column_exists(c, "infractions", "cleared_reason", "TEXT")
+    # noinspection SqlNoDataSourceInspection
+    c.execute('DROP INDEX IF EXISTS idx_infractions_guild_user_ts')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('DROP INDEX IF EXISTS idx_infractions_guild_user_voided')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE INDEX idx_infractions_guild_user_ts
+                 ON infractions (guild_id, user_id, timestamp, id, cleared_at) WHERE cleared_at IS NULL''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE INDEX idx_infractions_guild_user_voided
+                 ON infractions (guild_id, user_id, voided, cleared_at) WHERE cleared_at IS NULL''')
+    # Cleared rows still waiting for the archiver, for explicit archived lookups.
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_infractions_cleared_guild_user_ts
+                 ON infractions (guild_id, user_id, timestamp, id, voided, cleared_at) WHERE cleared_at IS NOT NULL''')
+    # Let the archiver find its candidates without scanning the table.
+    # noinspection SqlNoDataSourceInspection
+    c.execute('CREATE INDEX IF NOT EXISTS idx_infractions_cleared ON infractions (id) WHERE cleared_at IS NOT NULL')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('CREATE INDEX IF NOT EXISTS idx_infractions_voided_ts ON infractions (timestamp) WHERE voided = 1')
+
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TABLE IF NOT EXISTS infractions_archive
+                 (
+                     id INTEGER PRIMARY KEY,
+                     user_id INTEGER NOT NULL,
+                     issued_by INTEGER NOT NULL,
+                     infraction_type TEXT NOT NULL,
+                     reason TEXT,
+                     severity TEXT,
+                     appealable INTEGER,
+                     note TEXT,
+                     timestamp DATETIME,
+                     voided INTEGER,
+                     voided_by INTEGER,
+                     voided_reason TEXT,
+                     void_timestamp DATETIME,
+                     guild_id INTEGER NOT NULL,
+                     log_channel_id INTEGER,
+                     log_message_id INTEGER,
+                     dm_status TEXT,
+                     cleared_at DATETIME,
+                     cleared_by INTEGER,
+                     cleared_reason TEXT,
+                     archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                     archive_reason TEXT NOT NULL
+                 )''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_infractions_archive_guild_user_ts
+                 ON infractions_archive (guild_id, user_id, timestamp, id, voided)''')
+
+    # Archived rows are never updated, so insert and delete triggers are enough.
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS infractions_archive_fts USING fts5
+                 (
+                     reason, note, voided_reason, infraction_type,
+                     content = 'infractions_archive', content_rowid = 'id',
+                     tokenize = 'porter unicode61'
+                 )''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TRIGGER IF NOT EXISTS infractions_archive_fts_insert AFTER INSERT ON infractions_archive
+                 BEGIN
+                     INSERT INTO infractions_archive_fts (rowid, reason, note, voided_reason, infraction_type)
+                     VALUES (new.id, new.reason, new.note, new.voided_reason, new.infraction_type);
+                 END''')
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''CREATE TRIGGER IF NOT EXISTS infractions_archive_fts_delete AFTER DELETE ON infractions_archive
+                 BEGIN
+                     INSERT INTO infractions_archive_fts
+                         (infractions_archive_fts, rowid, reason, note, voided_reason, infraction_type)
+                     VALUES ('delete', old.id, old.reason, old.note, old.voided_reason, old.infraction_type);
+                 END''')
+
+    columns = ", ".join(INFRACTION_COLUMNS)
+    # noinspection SqlNoDataSourceInspection
+    c.execute(f'''CREATE VIEW IF NOT EXISTS infractions_all AS
+                  SELECT {columns}, CASE WHEN cleared_at IS NOT NULL THEN 'cleared' END AS archive_state
+                  FROM infractions
+                  UNION ALL
+                  SELECT {columns}, archive_reason AS archive_state
+                  FROM infractions_archive''')
+    c.execute("ANALYZE")
+
+
+def _migrate_add_attendance_sequence(c: sqlite3.Cursor) -> None:
+    """Schema v11: per-event join sequence, breaking ties between joins in the same second."""
+    ensure_column_exists(c, "event_attendance", "join_seq", "INTEGER")
+    # Number existing attendees in their current (joined_at, user_id) order.
+    # noinspection SqlNoDataSourceInspection
+    c.execute('''UPDATE event_attendance
+                 SET join_seq = (SELECT COUNT(*)
+                                 FROM event_attendance b
+                                 WHERE b.event_type = event_attendance.event_type
+                                   AND b.event_id = event_attendance.event_id
+                                   AND (b.joined_at, b.user_id) <= (event_attendance.joined_at,
+                                                                    event_attendance.user_id))''')
+
+
+# Ordered schema migrations: (version, description, step). Each step runs once,
+# inside its own transaction, and is recorded in the schema_version table.
+MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "Create core tables", _migrate_create_core_tables),
+    (2, "Add note, appealable and infraction log columns", _migrate_add_late_columns),
+    (3, "Add guild/user/timestamp lookup indexes", _migrate_add_lookup_indexes),
+    (4, "Add message_cache spill table", _migrate_add_message_cache),
+    (5, "Add event_attendance table and event status indexes", _migrate_add_event_attendance),
+    (6, "Add bot_state key/value table", _migrate_add_bot_state),
+    (7, "Add dm_status to promotions and infractions", _migrate_add_dm_status),
+    (8, "Add infractions_fts full-text index", _migrate_add_infraction_search),
+    (9, "Add infraction_revisions edit history", _migrate_add_infraction_revisions),
+    (10, "Add cleared columns and infractions_archive tier", _migrate_add_infraction_archive),
+    (11, "Add join_seq to event_attendance", _migrate_add_attendance_sequence),
+]
+
+# Keyset pagination over (timestamp, id), newest first. Pass INFRACTION_PAGE_START
+# as the key for the first page and the last row's (timestamp, id) afterwards.
+# Hot queries repeat "cleared_at IS NULL" so SQLite can use the partial lookup indexes.
+# noinspection SqlNoDataSourceInspection
+INFRACTION_PAGE_SQL = '''SELECT id, infraction_type, reason, severity, timestamp, voided, voided_reason, appealable,
+                                note
+                         FROM infractions
+                         WHERE guild_id = ? AND user_id = ? AND cleared_at IS NULL AND (timestamp, id) < (?, ?)
+                         ORDER BY timestamp DESC, id DESC
+                         LIMIT ?'''
+# Same walk as INFRACTION_PAGE_SQL but index-only, used to find the start key of a far page.
+# noinspection SqlNoDataSourceInspection
+INFRACTION_PAGE_KEYS_SQL = '''SELECT timestamp, id
+                              FROM infractions
+                              WHERE guild_id = ? AND user_id = ? AND cleared_at IS NULL AND (timestamp, id) < (?, ?)
+                              ORDER BY timestamp DESC, id DESC
+                              LIMIT ?'''
+INFRACTION_PAGE_START = ("9999-12-31 23:59:59", 2 ** 63 - 1)
+INFRACTION_PAGE_SIZE = 5
+INFRACTION_PAGE_CACHE_SIZE = 8
+INFRACTION_CACHE_SIZE = 256
+INFRACTION_CACHE_MAX_ROWS = 100
+# noinspection SqlNoDataSourceInspection
+INFRACTION_SUMMARY_SQL = '''SELECT COUNT(*) AS total, COALESCE(SUM(voided), 0) AS voided
+                            FROM infractions
+                            WHERE guild_id = ? AND user_id = ? AND cleared_at IS NULL'''
+# noinspection SqlNoDataSourceInspection
+INFRACTION_COUNT_SQL = 'SELECT COUNT(*) FROM infractions WHERE guild_id = ? AND user_id = ? AND cleared_at IS NULL'
+# Soft delete: cleared rows drop out of the hot indexes and are moved to the archive later.
+# Parameters are cleared_by, cleared_reason, guild_id and user_id.
+# noinspection SqlNoDataSourceInspection
+INFRACTION_CLEAR_SQL = '''UPDATE infractions
+                          SET cleared_at = CURRENT_TIMESTAMP,
+                              cleared_by = ?,
+                              cleared_reason = ?
+                          WHERE guild_id = ? AND user_id = ? AND cleared_at IS NULL'''
+
+# The list over every tier, for explicit archived lookups: active rows, cleared rows
+# still in the hot table, then the archive. Each statement walks its own index with
+# the shared (timestamp, id) keyset, and fetch_tiered_rows merges the results.
+# archive_state is 'cleared' or 'aged' for rows that are no longer active.
+# noinspection SqlNoDataSourceInspection
+INFRACTION_TIER_PAGE_SQL = (
+    INFRACTION_PAGE_SQL,
+    '''SELECT id, infraction_type, reason, severity, timestamp, voided, voided_reason, appealable, note,
+              'cleared' AS archive_state
+       FROM infractions
+       WHERE guild_id = ? AND user_id = ? AND cleared_at IS NOT NULL AND (timestamp, id) < (?, ?)
+       ORDER BY timestamp DESC, id DESC
+       LIMIT ?''',
+    '''SELECT id, infraction_type, reason, severity, timestamp, voided, voided_reason, appealable, note,
+              archive_reason AS archive_state
+       FROM infractions_archive
+       WHERE guild_id = ? AND user_id = ? AND (timestamp, id) < (?, ?)
+       ORDER BY timestamp DESC, id DESC
+       LIMIT ?''',
+)
+# noinspection SqlNoDataSourceInspection
+INFRACTION_TIER_PAGE_KEYS_SQL = (
+    INFRACTION_PAGE_KEYS_SQL,
+    '''SELECT timestamp, id
+       FROM infractions
+       WHERE guild_id = ? AND user_id = ? AND cleared_at IS NOT NULL AND (timestamp, id) < (?, ?)
+       ORDER BY timestamp DESC, id DESC
+       LIMIT ?''',
+    '''SELECT timestamp, id
+       FROM infractions_archive
+       WHERE guild_id = ? AND user_id = ? AND (timestamp, id) < (?, ?)
+       ORDER BY timestamp DESC, id DESC
+       LIMIT ?''',
+)
+# Totals over every tier; pass the guild and user once per tier.
+# noinspection SqlNoDataSourceInspection
+INFRACTION_ARCHIVE_SUMMARY_SQL = '''SELECT SUM(total) AS total, SUM(voided) AS voided
+                                    FROM (SELECT COUNT(*) AS total, COALESCE(SUM(voided), 0) AS voided
+                                          FROM infractions
+                                          WHERE guild_id = ? AND user_id = ? AND cleared_at IS NULL
+                                          UNION ALL
+                                          SELECT COUNT(*), COALESCE(SUM(voided), 0)
+                                          FROM infractions
+                                          WHERE guild_id = ? AND user_id = ? AND cleared_at IS NOT NULL
+                                          UNION ALL
+                                          SELECT COUNT(*), COALESCE(SUM(voided), 0)
+                                          FROM infractions_archive
+                                          WHERE guild_id = ? AND user_id = ?)'''
+
+
+def fetch_tiered_rows(conn: sqlite3.Connection, statements: Iterable[str], guild_id: int, user_id: int,
+                      start_key: tuple[str, int], limit: int) -> list[sqlite3.Row]:
+    """Run one keyset query per tier and merge them newest first, keeping the first limit rows."""
+    tiers = [conn.execute(sql, (guild_id, user_id, *start_key, limit)).fetchall() for sql in statements]
+    merged = heapq.merge(*tiers, key=lambda row: (row["timestamp"], row["id"]), reverse=True)
+    return list(islice(merged, limit))
+
+
+INFRACTION_SEARCH_PAGE_SIZE = 5
+# Ranked full-text search within a guild. bm25 weights follow the column order
+# (reason, note, voided_reason, infraction_type). Optional filters are passed
+# twice, as NULL to disable them. Fetch one row more than a page to detect a next page.
+# noinspection SqlNoDataSourceInspection
+INFRACTION_SEARCH_SQL = '''SELECT i.id, i.user_id, i.infraction_type, i.reason, i.severity, i.timestamp, i.voided,
+                                i.voided_reason, i.appealable, i.note
+                         FROM infractions_fts
+                                  JOIN infractions i ON i.id = infractions_fts.rowid
+                         WHERE infractions_fts MATCH ?
+                           AND i.guild_id = ?
+                           AND i.cleared_at IS NULL
+                           AND (? IS NULL OR i.severity = ?)
+                           AND (? IS NULL OR i.voided = ?)
+                           AND (? IS NULL OR i.timestamp >= ?)
+                           AND (? IS NULL OR i.timestamp < ?)
+                         ORDER BY bm25(infractions_fts, 4.0, 2.0, 2.0, 1.0), i.id DESC
+                         LIMIT ? OFFSET ?'''
+# Search over both tiers: the match, guild and filters are passed once per tier, then limit and offset.
+# noinspection SqlNoDataSourceInspection
+INFRACTION_ARCHIVE_SEARCH_SQL = '''SELECT *
+                                   FROM (SELECT i.id, i.user_id, i.infraction_type, i.reason, i.severity,
+                                                i.timestamp, i.voided, i.voided_reason, i.appealable, i.note,
+                                                CASE WHEN i.cleared_at IS NOT NULL THEN 'cleared' END AS archive_state,
+                                                bm25(infractions_fts, 4.0, 2.0, 2.0, 1.0) AS rank
+                                         FROM infractions_fts
+                                                  JOIN infractions i ON i.id = infractions_fts.rowid
+                                         WHERE infractions_fts MATCH ?
+                                           AND i.guild_id = ?
+                                           AND (? IS NULL OR i.severity = ?)
+                                           AND (? IS NULL OR i.voided = ?)
+                                           AND (? IS NULL OR i.timestamp >= ?)
+                                           AND (? IS NULL OR i.timestamp < ?)
+                                         UNION ALL
+                                         SELECT a.id, a.user_id, a.infraction_type, a.reason, a.severity,
+                                                a.timestamp, a.voided, a.voided_reason, a.appealable, a.note,
+                                                a.archive_reason AS archive_state,
+                                                bm25(infractions_archive_fts, 4.0, 2.0, 2.0, 1.0) AS rank
+                                         FROM infractions_archive_fts
+                                                  JOIN infractions_archive a ON a.id = infractions_archive_fts.rowid
+                                         WHERE infractions_archive_fts MATCH ?
+                                           AND a.guild_id = ?
+                                           AND (? IS NULL OR a.severity = ?)
+                                           AND (? IS NULL OR a.voided = ?)
+                                           AND (? IS NULL OR a.timestamp >= ?)
+                                           AND (? IS NULL OR a.timestamp < ?))
+                                   ORDER BY rank, id DESC
+                                   LIMIT ? OFFSET ?'''
+
+
+def build_fts_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 query that matches every word, quoting away FTS syntax.
+
+    A trailing * on a word is kept as a prefix search.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms) or None
+
+# Queries on the moderation hot path, keyed by name, for query-plan checks.
+HOT_QUERIES = {
+    "infraction page": INFRACTION_PAGE_SQL,
+    "infraction page keys": INFRACTION_PAGE_KEYS_SQL,
+    "infraction summary": INFRACTION_SUMMARY_SQL,
+    "infraction count": INFRACTION_COUNT_SQL,
+    "infraction clear": INFRACTION_CLEAR_SQL,
+}
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params: Iterable[Any] = ()) -> list[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params)).fetchall()]
+
+
+def check_hot_query_plans(conn: sqlite3.Connection) -> dict[str, list[str]]:
+    """Return query plans for HOT_QUERIES, logging any that fall back to a full scan."""
+    plans = {}
+    for name, sql in HOT_QUERIES.items():
+        plan = explain_query_plan(conn, sql, (0,) * sql.count("?"))
+        if any(line.startswith("SCAN") for line in plan):
+            logging.warning(f"Query '{name}' performs a full table scan: {plan}")
+        plans[name] = plan
+    return plans
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the highest applied migration version."""
+    # noinspection SqlNoDataSourceInspection
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version
+                    (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT,
+                        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )''')
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn: sqlite3.Connection, target: Optional[int] = None) -> int:
+    """Apply pending migrations in order, up to target if given, and return the resulting version."""
+    current = get_schema_version(conn)
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        if target is not None and version > target:
+            break
+        c = conn.cursor()
+        # IMMEDIATE takes the write lock up front, so when several shard processes
+        # start together only one applies each step and the rest see it as done.
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            # noinspection SqlNoDataSourceInspection
+            if (c.execute('SELECT MAX(version) FROM schema_version').fetchone()[0] or 0) >= version:
+                c.execute("COMMIT")
+                current = version
+                continue
+            step(c)
+            # noinspection SqlNoDataSourceInspection
+            c.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)', (version, description))
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        logging.info(f"Applied schema migration {version}: {description}")
+        current = version
+    return current
+
+
+def init_db():
+    """Enable WAL and bring the database schema up to date"""
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        configure_connection(conn)
+        version = run_migrations(conn)
+        logging.info(f"Database schema at version {version}")
+    finally:
+        conn.close()
+
+
+class InfractionSummary:
+    """Parsed infraction rows and active/voided counts for one member.
+
+    rows holds every infraction newest first, or None when the member has more
+    than INFRACTION_CACHE_MAX_ROWS and pages are read from the database instead.
+    """
+
+    __slots__ = ("total", "voided", "rows")
+
+    def __init__(self, total: int, voided: int, rows: Optional[list[dict[str, Any]]]):
+        self.total = total
+        self.voided = voided
+        self.rows = rows
+
+    @property
+    def active(self) -> int:
+        """Number of infractions that are not voided."""
+        return self.total - self.voided
+
+
+class InfractionSummaryCache:
+    """LRU of InfractionSummary keyed by (guild_id, user_id).
+
+    The infraction commands keep entries current: void and edit patch the cached
+    row in place, while issue and admin clear drop the entry.
+    """
+
+    def __init__(self, capacity: int = INFRACTION_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[int, int], InfractionSummary] = OrderedDict()
+        # Bumped on every write so a load that raced a write is not cached.
+        self._version = 0
+
+    async def get(self, guild_id: int, user_id: int) -> InfractionSummary:
+        """Return the member's summary, loading it from the database on a miss."""
+        key = (guild_id, user_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        version = self._version
+        entry = await self._load(guild_id, user_id)
+        if version == self._version:
+            self._entries[key] = entry
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    async def _load(guild_id: int, user_id: int) -> InfractionSummary:
+        """Read a member's infractions, keeping the rows only for short histories."""
+        rows = await db.fetchall(INFRACTION_PAGE_SQL,
+                                 (guild_id, user_id, *INFRACTION_PAGE_START, INFRACTION_CACHE_MAX_ROWS + 1))
+        if len(rows) <= INFRACTION_CACHE_MAX_ROWS:
+            parsed = [dict(row) for row in rows]
+            return InfractionSummary(len(parsed), sum(1 for row in parsed if row["voided"]), parsed)
+
+        summary = await db.fetchone(INFRACTION_SUMMARY_SQL, (guild_id, user_id))
+        return InfractionSummary(summary["total"], summary["voided"], None)
+
+    def invalidate(self, guild_id: int, user_id: int) -> None:
+        """Drop a member's entry."""
+        self._version += 1
+        self._entries.pop((guild_id, user_id), None)
+
+    def mark_voided(self, guild_id: int, user_id: int, infraction_id: int, reason: str) -> None:
+        """Record that a previously active infraction was voided."""
+        self._version += 1
+        entry = self._entries.get((guild_id, user_id))
+        if entry is None:
+            return
+        entry.voided += 1
+        if entry.rows is not None and not self._patch_row(entry, infraction_id,
+                                                          {"voided": 1, "voided_reason": reason}):
+            self.invalidate(guild_id, user_id)
+
+    def update_row(self, guild_id: int, user_id: int, infraction_id: int, fields: dict[str, Any]) -> None:
+        """Apply edited column values to a cached row."""
+        self._version += 1
+        entry = self._entries.get((guild_id, user_id))
+        if entry is None or entry.rows is None:
+            return
+        if not self._patch_row(entry, infraction_id, fields):
+            self.invalidate(guild_id, user_id)
+
+    @staticmethod
+    def _patch_row(entry: InfractionSummary, infraction_id: int, fields: dict[str, Any]) -> bool:
+        """Update the row with infraction_id in place; return False if it is not cached."""
+        for row in entry.rows or []:
+            if row["id"] == infraction_id:
+                row.update(fields)
+                return True
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters for diagnostics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+infraction_cache = InfractionSummaryCache()
+
+
+ARCHIVE_INTERVAL = 3600.0
+ARCHIVE_VOIDED_AFTER_DAYS = 365
+# archive_infraction_batch binds the archive reason alongside the ids.
+ARCHIVE_BATCH_SIZE = SQLITE_MAX_PARAMS - 1
+# Pause between batches so interactive writes can take the database lock.
+ARCHIVE_BATCH_PAUSE = 0.5
+# Candidate ids for each archive reason, oldest first, served by the partial indexes from schema v10.
+# The aged query takes a timestamp cutoff before its limit.
+# noinspection SqlNoDataSourceInspection
+ARCHIVE_CANDIDATE_SQL = {
+    "cleared": '''SELECT id FROM infractions
+                  WHERE cleared_at IS NOT NULL
+                  ORDER BY id
+                  LIMIT ?''',
+    "aged": '''SELECT id FROM infractions
+               WHERE voided = 1 AND timestamp < ? AND cleared_at IS NULL
+               ORDER BY timestamp
+               LIMIT ?''',
+}
+
+
+def archive_infraction_batch(conn: sqlite3.Connection, reason: str, cutoff: Optional[str],
+                             limit: int) -> tuple[int, list[tuple[int, int]]]:
+    """Move up to limit infractions matching reason into infractions_archive.
+
+    Returns the number of rows moved and the (guild_id, user_id) pairs they belonged to.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    params = (limit,) if cutoff is None else (cutoff, limit)
+    ids = [row[0] for row in conn.execute(ARCHIVE_CANDIDATE_SQL[reason], params)]
+    if not ids:
+        return 0, []
+    placeholders = ", ".join("?" * len(ids))
+    columns = ", ".join(INFRACTION_COLUMNS)
+    # noinspection SqlNoDataSourceInspection
+    conn.execute(f'''INSERT INTO infractions_archive ({columns}, archive_reason)
+                     SELECT {columns}, ? FROM infractions WHERE id IN ({placeholders})''', (reason, *ids))
+    # noinspection SqlNoDataSourceInspection
+    members = [tuple(row) for row in conn.execute(f'''SELECT DISTINCT guild_id, user_id FROM infractions
+                                                      WHERE id IN ({placeholders})''', ids)]
+    # noinspection SqlNoDataSourceInspection
+    conn.execute(f'DELETE FROM infractions WHERE id IN ({placeholders})', ids)
+    return len(ids), members
+
+
+class InfractionArchiver:
+    """Background job that moves cleared and long-voided infractions to the archive tier.
+
+    Rows move in small transactions so the hot table stays small without holding
+    the write lock for long. Only one process should run it.
+    """
+
+    def __init__(self, interval: float = ARCHIVE_INTERVAL, voided_after_days: int = ARCHIVE_VOIDED_AFTER_DAYS,
+                 batch_size: int = ARCHIVE_BATCH_SIZE):
+        self.interval = interval
+        self.voided_after_days = voided_after_days
+        self.batch_size = batch_size
+        self.archived: dict[str, int] = defaultdict(int)
+        self.last_run: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the periodic archive loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the loop, abandoning any batch that has not started."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Archive once per interval."""
+        while True:
+            try:
+                moved = await self.run_once()
+                if moved:
+                    logging.info(f"Archived {moved} infractions")
+            except Exception as err:
+                logging.error(f"Infraction archive failed: {err}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        """Move every current candidate in batches and return how many rows moved."""
+        cutoff = (datetime.utcnow() - timedelta(days=self.voided_after_days)).strftime("%Y-%m-%d %H:%M:%S")
+        total = 0
+        for reason, reason_cutoff in (("cleared", None), ("aged", cutoff)):
+            while True:
+                moved, members = await db.transaction(archive_infraction_batch, reason, reason_cutoff,
+                                                       self.batch_size)
+                for guild_id, user_id in members:
+                    infraction_cache.invalidate(guild_id, user_id)
+                self.archived[reason] += moved
+                total += moved
+                if moved < self.batch_size:
+                    break
+                await asyncio.sleep(ARCHIVE_BATCH_PAUSE)
+        self.last_run = time.time()
+        return total
+
+    def stats(self) -> dict[str, Any]:
+        """Return archive counters for diagnostics."""
+        return {"cleared": self.archived["cleared"], "aged": self.archived["aged"], "last_run": self.last_run}
+
+
+infraction_archiver = InfractionArchiver()
+
+
+EVENT_TABLES = {"tryout": "tryouts", "training": "trainings"}
+# Events in these states keep working attendance buttons across restarts.
+LIVE_EVENT_STATUSES = ("open", "started")
+
+
+async def record_attendance(event_type: str, event_id: int, user_id: int, attending: bool) -> None:
+    """Persist a single attendance toggle."""
+    if attending:
+        # noinspection SqlNoDataSourceInspection
+        await db.execute('''INSERT OR IGNORE INTO event_attendance (event_type, event_id, user_id, join_seq)
+                            VALUES (?, ?, ?, (SELECT COALESCE(MAX(join_seq), 0) + 1
+                                              FROM event_attendance
+                                              WHERE event_type = ? AND event_id = ?))''',
+                         (event_type, event_id, user_id, event_type, event_id))
+    else:
+        # noinspection SqlNoDataSourceInspection
+        await db.execute('DELETE FROM event_attendance WHERE event_type = ? AND event_id = ? AND user_id = ?',
+                         (event_type, event_id, user_id))
+
+
+async def set_event_status(event_type: str, event_id: int, status: str) -> None:
+    """Update the status of a tryout or training."""
+    # noinspection SqlNoDataSourceInspection
+    await db.execute(f'UPDATE {EVENT_TABLES[event_type]} SET status = ? WHERE id = ?', (status, event_id))
+
+
+async def load_live_events(event_type: str) -> list[tuple[sqlite3.Row, list[int]]]:
+    """Return every live event of a type with its attendee ids in join order."""
+    def _load(conn: sqlite3.Connection) -> list[tuple[sqlite3.Row, list[int]]]:
+        placeholders = ", ".join("?" * len(LIVE_EVENT_STATUSES))
+        # noinspection SqlNoDataSourceInspection
+        events = conn.execute(f'''SELECT id, message_id, host_id, guild_id, channel_id
+                                  FROM {EVENT_TABLES[event_type]}
+                                  WHERE status IN ({placeholders}) AND message_id IS NOT NULL''',
+                              LIVE_EVENT_STATUSES).fetchall()
+        attendees: dict[int, list[int]] = {event["id"]: [] for event in events}
+        # noinspection SqlNoDataSourceInspection
+        rows = conn.execute(f'''SELECT a.event_id, a.user_id
+                                FROM event_attendance a
+                                JOIN {EVENT_TABLES[event_type]} e ON e.id = a.event_id
+                                WHERE a.event_type = ? AND e.status IN ({placeholders})
+                                ORDER BY a.joined_at, a.join_seq''',
+                            (event_type, *LIVE_EVENT_STATUSES)).fetchall()
+        for row in rows:
+            attendees.setdefault(row["event_id"], []).append(row["user_id"])
+        return [(event, attendees[event["id"]]) for event in events]
+
+    return await db.run(_load)
+
+
+async def restore_event_views(bot_instance: commands.Bot) -> int:
+    """Re-register attendance views for live events so their buttons survive a restart."""
+    restored = 0
+    for event_type, view_cls in (("tryout", TryoutView), ("training", TrainingView)):
+        for event, attendees in await load_live_events(event_type):
+            if not owns_guild(event["guild_id"]):
+                continue
+            view = view_cls(bot_instance, event["id"], event["host_id"], event["guild_id"])
+            view.attendees = AttendeeRoster(attendees)
+            bot_instance.add_view(view, message_id=event["message_id"])
+            restored += 1
+    logging.info(f"Restored {restored} tryout/training views")
+    return restored
+
+
+async def load_event_attendees(event_type: str, event_id: int, guild_id: int) -> list[int]:
+    """Return the attendee ids of one event in join order, or an empty list if it belongs to another guild."""
+    # noinspection SqlNoDataSourceInspection
+    rows = await db.fetchall(f'''SELECT a.user_id
+                                 FROM event_attendance a
+                                 JOIN {EVENT_TABLES[event_type]} e ON e.id = a.event_id
+                                 WHERE a.event_type = ? AND a.event_id = ? AND e.guild_id = ?
+                                 ORDER BY a.joined_at, a.join_seq''', (event_type, event_id, guild_id))
+    return [row["user_id"] for row in rows]
+
+
+INFRACTION_BULK_MAX = 100
+MEMBER_ID_PATTERN = re.compile(r"<@!?(\d{15,21})>|\b(\d{15,21})\b")
+
+
+def parse_member_ids(text: Optional[str]) -> list[int]:
+    """Extract user ids from mentions and raw ids, keeping first-seen order."""
+    if not text:
+        return []
+    return list(dict.fromkeys(int(mention or raw) for mention, raw in MEMBER_ID_PATTERN.findall(text)))
+
+
+def insert_infraction_batch(conn: sqlite3.Connection, rows: list[tuple]) -> list[tuple[int, int]]:
+    """Insert many infractions with one executemany and return their (id, user_id) pairs.
+
+    BEGIN IMMEDIATE takes the write lock before reading MAX(id), so every id
+    above it afterwards belongs to this batch.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    # noinspection SqlNoDataSourceInspection
+    start_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM infractions').fetchone()[0]
+    # noinspection SqlNoDataSourceInspection
+    conn.executemany('''INSERT INTO infractions
+                        (user_id, issued_by, infraction_type, reason, severity, appealable, note, guild_id,
+                         dm_status)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')''', rows)
+    # noinspection SqlNoDataSourceInspection
+    return [tuple(row) for row in conn.execute('SELECT id, user_id FROM infractions WHERE id > ? ORDER BY id',
+                                               (start_id,))]
+
+
+def set_infraction_log_message(conn: sqlite3.Connection, infraction_ids: list[int], channel_id: int,
+                               message_id: int) -> None:
+    """Point every infraction of a batch at the shared log message."""
+    # noinspection SqlNoDataSourceInspection
+    conn.executemany('''UPDATE infractions
+                        SET log_channel_id = ?,
+                            log_message_id = ?
+                        WHERE id = ?''',
+                     [(channel_id, message_id, infraction_id) for infraction_id in infraction_ids])
+
+
+# Editable infraction columns and their display names, in the order edits are shown.
+INFRACTION_EDIT_FIELDS = {
+    "infraction_type": "Type",
+    "reason": "Reason",
+    "severity": "Severity",
+    "appealable": "Appealable",
+    "note": "Note",
+}
+INFRACTION_REVISION_LIMIT = 15
+
+
+def apply_infraction_edit(conn: sqlite3.Connection, infraction_id: int, edited_by: int,
+                          updates: dict[str, Any]) -> dict[str, Any]:
+    """Apply updates as one UPDATE and record each changed field in infraction_revisions.
+
+    The previous values are read under the write lock, so concurrent edits
+    cannot interleave. Returns the previous value of every column that changed.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    columns = [column for column in INFRACTION_EDIT_FIELDS if column in updates]
+    # noinspection SqlNoDataSourceInspection
+    current = conn.execute(f'SELECT {", ".join(columns)} FROM infractions WHERE id = ?',
+                           (infraction_id,)).fetchone()
+    if current is None:
+        return {}
+    previous = {column: current[column] for column in columns if current[column] != updates[column]}
+    if not previous:
+        return {}
+    # noinspection SqlNoDataSourceInspection
+    conn.execute(f'UPDATE infractions SET {", ".join(f"{column} = ?" for column in previous)} WHERE id = ?',
+                 (*(updates[column] for column in previous), infraction_id))
+    # noinspection SqlNoDataSourceInspection
+    conn.executemany('''INSERT INTO infraction_revisions (infraction_id, edited_by, field, old_value, new_value)
+                        VALUES (?, ?, ?, ?, ?)''',
+                     [(infraction_id, edited_by, column, old_value, updates[column])
+                      for column, old_value in previous.items()])
+    return previous
+
+
+def format_revision_value(column: str, value: Any) -> str:
+    """Render a stored infraction column value for display."""
+    if value is None or value == "":
+        return "None"
+    if column == "appealable":
+        return "Yes" if int(value) else "No"
+    if column == "severity":
+        return str(value).capitalize()
+    return str(value)
+
+
+INFRACTION_SEVERITY_COLORS = {
+    "minor": discord.Color.from_rgb(255, 255, 0),
+    "medium": discord.Color.from_rgb(255, 165, 0),
+    "major": discord.Color.from_rgb(255, 0, 0),
+}
+
+
+def build_infraction_dm_embed(guild: discord.Guild, infraction_id: int, severity: str, infraction_type: str,
+                              reason: str, note: Optional[str], appealable: bool) -> discord.Embed:
+    """Build the DM sent to a member who received an infraction."""
+    color = INFRACTION_SEVERITY_COLORS.get(severity, discord.Color.orange())
+    dm_embed = discord.Embed(title="⚠️ You've Received an Infraction",
+                             description=f"Infraction in **{guild.name}**", color=color,
+                             timestamp=datetime.now())
+    dm_embed.set_thumbnail(url=guild.icon.url if guild.icon else None)
+    dm_embed.add_field(name="🆔 ID", value=f"#{infraction_id}", inline=True)
+    dm_embed.add_field(name="🔴 Severity", value=f"**{severity.capitalize()}**", inline=True)
+    dm_embed.add_field(name="📋 Type", value=f"**{infraction_type}**", inline=False)
+    dm_embed.add_field(name="💬 Reason", value=reason, inline=False)
+    if note:
+        dm_embed.add_field(name="📝 Note", value=note, inline=False)
+    dm_embed.add_field(name="🔖 Appealable", value=f"**{'Yes' if appealable else 'No'}**", inline=False)
+    dm_embed.set_footer(text="Review server rules.", icon_url=guild.icon.url if guild.icon else None)
+    return dm_embed
 
 
 def has_promote_role(interaction: discord.Interaction) -> bool:
@@ -494,14 +3102,12 @@ class PromotionsCog(commands.Cog):
         try:
             await user.add_roles(new_role)
 
-            conn = sqlite3.connect('bot_data.db')
-            c = conn.cursor()
             # noinspection SqlNoDataSourceInspection
-            c.execute('''INSERT INTO promotions (user_id, promoted_by, new_role, reason, note, guild_id)
-                         VALUES (?, ?, ?, ?, ?, ?)''',
-                      (user.id, interaction.user.id, new_role.name, reason, note, interaction.guild_id))
-            conn.commit()
-            conn.close()
+            promotion_id = await db.execute('''INSERT INTO promotions
+                                               (user_id, promoted_by, new_role, reason, note, guild_id, dm_status)
+                                               VALUES (?, ?, ?, ?, ?, ?, 'pending')''',
+                                            (user.id, interaction.user.id, new_role.name, reason, note,
+                                             interaction.guild_id))
 
             embed = discord.Embed(
                 title="🎉 Promotion Successful",
@@ -523,30 +3129,27 @@ class PromotionsCog(commands.Cog):
             await interaction_response(interaction).send_message(embed=embed, ephemeral=True)
 
             try:
-                promo_channel = await self.bot.fetch_channel(PROMOTIONS_CHANNEL_ID)
+                promo_channel = await fetch_text_channel(self.bot, PROMOTIONS_CHANNEL_ID)
                 if promo_channel:
                     await promo_channel.send(f"{user.mention} {new_role.mention}", embed=embed)
             except Exception as err:
                 logging.error(f"Error sending to promotion channel: {err}")
 
-            try:
-                dm_embed = discord.Embed(
-                    title="🎉 You've Been Promoted!",
-                    description=f"Congratulations on your promotion in **{interaction.guild.name}**!",
-                    color=discord.Color.from_rgb(255, 215, 0),
-                    timestamp=datetime.now()
-                )
-                dm_embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else None)
-                dm_embed.add_field(name="🎯 New Rank", value=f"**{new_role.name}**", inline=False)
-                dm_embed.add_field(name="💬 Reason", value=reason, inline=False)
-                if note:
-                    dm_embed.add_field(name="📝 Note", value=note, inline=False)
-                dm_embed.add_field(name="📍 Server", value=f"**{interaction.guild.name}**", inline=False)
-                dm_embed.set_footer(text="Keep up the great work!",
-                                    icon_url=interaction.guild.icon.url if interaction.guild.icon else None)
-                await user.send(embed=dm_embed)
-            except discord.Forbidden:
-                logging.warning(f"Could not DM {user.name}")
+            dm_embed = discord.Embed(
+                title="🎉 You've Been Promoted!",
+                description=f"Congratulations on your promotion in **{interaction.guild.name}**!",
+                color=discord.Color.from_rgb(255, 215, 0),
+                timestamp=datetime.now()
+            )
+            dm_embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else None)
+            dm_embed.add_field(name="🎯 New Rank", value=f"**{new_role.name}**", inline=False)
+            dm_embed.add_field(name="💬 Reason", value=reason, inline=False)
+            if note:
+                dm_embed.add_field(name="📝 Note", value=note, inline=False)
+            dm_embed.add_field(name="📍 Server", value=f"**{interaction.guild.name}**", inline=False)
+            dm_embed.set_footer(text="Keep up the great work!",
+                                icon_url=interaction.guild.icon.url if interaction.guild.icon else None)
+            dm_dispatcher.submit(user, dm_embed, "promotions", promotion_id)
 
             extra = f"Member: {user.mention} | New Role: {new_role.mention}"
             await log_command_usage(self.bot, interaction, "promote", params, extra_info=extra)
@@ -619,22 +3222,17 @@ class InfractionsCog(commands.Cog):
 
         appealable_bool = 1 if appealable.lower() == "yes" else 0
 
-        conn = sqlite3.connect('bot_data.db')
-        c = conn.cursor()
         try:
             # noinspection SqlNoDataSourceInspection
-            c.execute('''INSERT INTO infractions
-                         (user_id, issued_by, infraction_type, reason, severity, appealable, note, guild_id)
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                      (user.id, interaction.user.id, infraction_type, reason, severity.lower(), appealable_bool,
-                       note, interaction.guild_id))
-
-            infraction_id = c.lastrowid
-            conn.commit()
+            infraction_id = await db.execute('''INSERT INTO infractions
+                                                (user_id, issued_by, infraction_type, reason, severity, appealable,
+                                                 note, guild_id, dm_status)
+                                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')''',
+                                             (user.id, interaction.user.id, infraction_type, reason,
+                                              severity.lower(), appealable_bool, note, interaction.guild_id))
+            infraction_cache.invalidate(interaction.guild_id, user.id)
 
-            color_map = {"minor": discord.Color.from_rgb(255, 255, 0), "medium": discord.Color.from_rgb(255, 165, 0),
-                         "major": discord.Color.from_rgb(255, 0, 0)}
-            color = color_map.get(severity.lower(), discord.Color.orange())
+            color = INFRACTION_SEVERITY_COLORS.get(severity.lower(), discord.Color.orange())
 
             embed = discord.Embed(title="⚠️ Infraction Issued", description=f"Infraction issued to {user.mention}",
                                   color=color, timestamp=datetime.now())
@@ -655,7 +3253,7 @@ class InfractionsCog(commands.Cog):
 
             log_message: Optional[discord.Message] = None
             try:
-                infraction_channel = await self.bot.fetch_channel(INFRACTIONS_CHANNEL_ID)
+                infraction_channel = await fetch_text_channel(self.bot, INFRACTIONS_CHANNEL_ID)
                 if isinstance(infraction_channel, discord.TextChannel):
                     log_message = await infraction_channel.send(f"{user.mention}", embed=embed)
             except Exception as err:
@@ -663,41 +3261,152 @@ class InfractionsCog(commands.Cog):
 
             if log_message:
                 # noinspection SqlNoDataSourceInspection
-                c.execute('''UPDATE infractions
-                             SET log_channel_id = ?,
-                                 log_message_id = ?
-                             WHERE id = ?''',
-                          (log_message.channel.id, log_message.id, infraction_id))
-                conn.commit()
+                await db.execute('''UPDATE infractions
+                                    SET log_channel_id = ?,
+                                        log_message_id = ?
+                                    WHERE id = ?''',
+                                 (log_message.channel.id, log_message.id, infraction_id))
+
+            dm_embed = build_infraction_dm_embed(interaction.guild, infraction_id, severity.lower(), infraction_type,
+                                                 reason, note, bool(appealable_bool))
+            dm_dispatcher.submit(user, dm_embed, "infractions", infraction_id)
+
+            extra = f"Infraction #{infraction_id} for {user.mention}"
+            await log_command_usage(self.bot, interaction, "infraction issue", params, extra_info=extra)
+
+        except Exception as err:
+            await interaction_response(interaction).send_message(f"❌ Error: {str(err)}", ephemeral=True)
+            logging.error(f"Infraction error: {err}")
+            await log_command_usage(self.bot, interaction, "infraction issue", params,
+                                    status=f"Failed: {err}")
+
+    @infraction_group.command(name="bulk", description="Issue the same infraction to many members at once")
+    @app_commands.describe(infraction_type="Type (Warning, Spam, etc)", reason="Reason",
+                           role="Everyone with this role", members="Mentions or user IDs",
+                           tryout="Attendees of this tryout ID", severity="minor/medium/major",
+                           appealable="yes/no", note="Optional internal note")
+    async def bulk_issue_infractions(self, interaction: discord.Interaction, infraction_type: str, reason: str,
+                                     role: Optional[discord.Role] = None, members: Optional[str] = None,
+                                     tryout: Optional[int] = None, severity: str = "medium",
+                                     appealable: str = "no", note: Optional[str] = None):
+        """Issue one infraction per target member in a single transaction"""
+        params = format_option_details([
+            ("type", infraction_type),
+            ("reason", reason),
+            ("role", role),
+            ("members", members),
+            ("tryout", tryout),
+            ("severity", severity),
+            ("appealable", appealable),
+            ("note", note)
+        ])
+        if not has_infraction_role(interaction):
+            await interaction_response(interaction).send_message("❌ No permission.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction bulk", params,
+                                    status="Denied: Missing infraction role")
+            return
+
+        if severity.lower() not in ["minor", "medium", "major"]:
+            await interaction_response(interaction).send_message("❌ Invalid severity.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction bulk", params,
+                                    status="Failed: Invalid severity")
+            return
+
+        if appealable.lower() not in ["yes", "no"]:
+            await interaction_response(interaction).send_message("❌ Invalid appealable value.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction bulk", params,
+                                    status="Failed: Invalid appealable value")
+            return
+
+        if role is None and not members and tryout is None:
+            await interaction_response(interaction).send_message("❌ Choose a role, members or a tryout.",
+                                                                 ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction bulk", params,
+                                    status="Failed: No targets")
+            return
+
+        await interaction_response(interaction).defer(ephemeral=True, thinking=True)
+        severity = severity.lower()
+        appealable_bool = 1 if appealable.lower() == "yes" else 0
+
+        try:
+            targets: dict[int, discord.Member] = {member.id: member for member in (role.members if role else [])
+                                                  if not member.bot}
+            target_ids = parse_member_ids(members)
+            if tryout is not None:
+                target_ids += await load_event_attendees("tryout", tryout, interaction.guild.id)
+            # Role members are already cached; check the limit before any REST lookups for the rest.
+            unresolved = [user_id for user_id in dict.fromkeys(target_ids) if user_id not in targets]
+            if len(targets) + len(unresolved) > INFRACTION_BULK_MAX:
+                await interaction.followup.send(
+                    f"❌ {len(targets) + len(unresolved)} members matched; the limit is {INFRACTION_BULK_MAX} "
+                    f"per command.", ephemeral=True)
+                await log_command_usage(self.bot, interaction, "infraction bulk", params,
+                                        status="Failed: Too many members")
+                return
+
+            resolved = await asyncio.gather(*(resolver.member(interaction.guild, user_id) for user_id in unresolved))
+            for member in resolved:
+                if member is not None and not member.bot:
+                    targets[member.id] = member
+
+            if not targets:
+                await interaction.followup.send("❌ No matching members found.", ephemeral=True)
+                await log_command_usage(self.bot, interaction, "infraction bulk", params,
+                                        status="Failed: No matching members")
+                return
+
+            rows = [(member_id, interaction.user.id, infraction_type, reason, severity, appealable_bool, note,
+                     interaction.guild_id) for member_id in targets]
+            issued = await db.transaction(insert_infraction_batch, rows)
+            for _, member_id in issued:
+                infraction_cache.invalidate(interaction.guild_id, member_id)
+
+            color = INFRACTION_SEVERITY_COLORS.get(severity, discord.Color.orange())
+            roster = "\n".join(f"`#{infraction_id}` {targets[member_id].mention}"
+                               for infraction_id, member_id in issued)
+            embed = discord.Embed(title=f"⚠️ {len(issued)} Infractions Issued",
+                                  description=truncate_text(roster, DISCORD_EMBED_DESCRIPTION_LIMIT),
+                                  color=color, timestamp=datetime.now())
+            embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else None)
+            embed.add_field(name="🆔 IDs", value=f"#{issued[0][0]} – #{issued[-1][0]}", inline=True)
+            embed.add_field(name="🔴 Severity", value=f"**{severity.capitalize()}**", inline=True)
+            embed.add_field(name="📋 Type", value=f"**{infraction_type}**", inline=False)
+            embed.add_field(name="💬 Reason", value=reason, inline=False)
+            if note:
+                embed.add_field(name="📝 Note", value=note, inline=False)
+            embed.add_field(name="🔖 Appealable", value=f"**{'Yes' if appealable_bool else 'No'}**", inline=True)
+            embed.add_field(name="👮 By", value=f"{interaction.user.mention}", inline=True)
+            embed.set_footer(text=f"{interaction.guild.name} • {datetime.now().strftime('%m/%d/%Y %I:%M %p')}",
+                             icon_url=interaction.guild.icon.url if interaction.guild.icon else None)
+
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+            log_message: Optional[discord.Message] = None
+            try:
+                infraction_channel = await fetch_text_channel(self.bot, INFRACTIONS_CHANNEL_ID)
+                if isinstance(infraction_channel, discord.TextChannel):
+                    log_message = await infraction_channel.send(embed=embed)
+            except Exception as err:
+                logging.error(f"Error sending to infraction channel: {err}")
+
+            if log_message:
+                await db.transaction(set_infraction_log_message, [infraction_id for infraction_id, _ in issued],
+                                     log_message.channel.id, log_message.id)
 
-            try:
-                dm_embed = discord.Embed(title="⚠️ You've Received an Infraction",
-                                         description=f"Infraction in **{interaction.guild.name}**", color=color,
-                                         timestamp=datetime.now())
-                dm_embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else None)
-                dm_embed.add_field(name="🆔 ID", value=f"#{infraction_id}", inline=True)
-                dm_embed.add_field(name="🔴 Severity", value=f"**{severity.capitalize()}**", inline=True)
-                dm_embed.add_field(name="📋 Type", value=f"**{infraction_type}**", inline=False)
-                dm_embed.add_field(name="💬 Reason", value=reason, inline=False)
-                if note:
-                    dm_embed.add_field(name="📝 Note", value=note, inline=False)
-                dm_embed.add_field(name="🔖 Appealable", value=f"**{'Yes' if appealable_bool else 'No'}**", inline=False)
-                dm_embed.set_footer(text="Review server rules.",
-                                    icon_url=interaction.guild.icon.url if interaction.guild.icon else None)
-                await user.send(embed=dm_embed)
-            except discord.Forbidden:
-                logging.warning(f"Could not DM {user.name}")
+            for infraction_id, member_id in issued:
+                dm_embed = build_infraction_dm_embed(interaction.guild, infraction_id, severity, infraction_type,
+                                                     reason, note, bool(appealable_bool))
+                dm_dispatcher.submit(targets[member_id], dm_embed, "infractions", infraction_id)
 
-            extra = f"Infraction #{infraction_id} for {user.mention}"
-            await log_command_usage(self.bot, interaction, "infraction issue", params, extra_info=extra)
+            extra = f"Infractions #{issued[0][0]}-#{issued[-1][0]} for {len(issued)} members"
+            await log_command_usage(self.bot, interaction, "infraction bulk", params, extra_info=extra)
 
         except Exception as err:
-            await interaction_response(interaction).send_message(f"❌ Error: {str(err)}", ephemeral=True)
-            logging.error(f"Infraction error: {err}")
-            await log_command_usage(self.bot, interaction, "infraction issue", params,
+            await interaction.followup.send(f"❌ Error: {str(err)}", ephemeral=True)
+            logging.error(f"Bulk infraction error: {err}")
+            await log_command_usage(self.bot, interaction, "infraction bulk", params,
                                     status=f"Failed: {err}")
-        finally:
-            conn.close()
 
     @infraction_group.command(name="void", description="Void an infraction")
     @app_commands.describe(infraction_id="Infraction ID", reason="Reason")
@@ -714,13 +3423,11 @@ class InfractionsCog(commands.Cog):
                                     status="Denied: Missing infraction role")
             return
 
-        conn = sqlite3.connect('bot_data.db')
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
         try:
             # noinspection SqlNoDataSourceInspection
-            c.execute('SELECT * FROM infractions WHERE id = ? AND guild_id = ?', (infraction_id, interaction.guild_id))
-            infraction = c.fetchone()
+            infraction = await db.fetchone('''SELECT * FROM infractions
+                                              WHERE id = ? AND guild_id = ? AND cleared_at IS NULL''',
+                                           (infraction_id, interaction.guild_id))
 
             if not infraction:
                 await interaction_response(interaction).send_message("❌ Not found.", ephemeral=True)
@@ -735,22 +3442,23 @@ class InfractionsCog(commands.Cog):
                 return
 
             # noinspection SqlNoDataSourceInspection
-            c.execute('''UPDATE infractions
-                         SET voided         = 1,
-                             voided_by      = ?,
-                             voided_reason  = ?,
-                             void_timestamp = CURRENT_TIMESTAMP
-                         WHERE id = ?''',
-                      (interaction.user.id, reason, infraction_id))
-            conn.commit()
-
-            user = await self.bot.fetch_user(infraction["user_id"])
+            await db.execute('''UPDATE infractions
+                                SET voided         = 1,
+                                    voided_by      = ?,
+                                    voided_reason  = ?,
+                                    void_timestamp = CURRENT_TIMESTAMP
+                                WHERE id = ?''',
+                             (interaction.user.id, reason, infraction_id))
+            infraction_cache.mark_voided(interaction.guild_id, infraction["user_id"], infraction_id, reason)
+
+            user = await resolver.user(self.bot, infraction["user_id"])
+            user_mention = user.mention if user else f"<@{infraction['user_id']}>"
 
             embed = discord.Embed(title="✅ Infraction Voided", description=f"#{infraction_id} voided",
                                   color=discord.Color.from_rgb(0, 255, 0), timestamp=datetime.now())
             embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else None)
             embed.add_field(name="🆔 ID", value=f"#{infraction_id}", inline=False)
-            embed.add_field(name="👤 Member", value=f"{user.mention}", inline=False)
+            embed.add_field(name="👤 Member", value=user_mention, inline=False)
             embed.add_field(name="💬 Reason", value=reason, inline=False)
             embed.add_field(name="👮 By", value=f"{interaction.user.mention}", inline=True)
             embed.set_footer(text=f"{interaction.guild.name} • {datetime.now().strftime('%m/%d/%Y %I:%M %p')}",
@@ -774,8 +3482,6 @@ class InfractionsCog(commands.Cog):
             logging.error(f"Void error: {err}")
             await log_command_usage(self.bot, interaction, "infraction void", params,
                                     status=f"Failed: {err}")
-        finally:
-            conn.close()
 
     @infraction_group.command(name="edit", description="Edit an infraction")
     @app_commands.describe(infraction_id="ID", new_type="New type", new_reason="Reason", new_severity="Severity",
@@ -816,13 +3522,11 @@ class InfractionsCog(commands.Cog):
                                     status="Failed: No fields provided")
             return
 
-        conn = sqlite3.connect('bot_data.db')
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
         try:
             # noinspection SqlNoDataSourceInspection
-            c.execute('SELECT * FROM infractions WHERE id = ? AND guild_id = ?', (infraction_id, interaction.guild_id))
-            infraction = c.fetchone()
+            infraction = await db.fetchone('''SELECT * FROM infractions
+                                              WHERE id = ? AND guild_id = ? AND cleared_at IS NULL''',
+                                           (infraction_id, interaction.guild_id))
 
             if not infraction:
                 await interaction_response(interaction).send_message("❌ Not found.", ephemeral=True)
@@ -830,48 +3534,39 @@ class InfractionsCog(commands.Cog):
                                         status="Failed: Infraction not found")
                 return
 
-            changes: list[tuple[str, Any, Any]] = []
-
+            updates: dict[str, Any] = {}
             if new_type:
-                # noinspection SqlNoDataSourceInspection
-                c.execute('UPDATE infractions SET infraction_type = ? WHERE id = ?', (new_type, infraction_id))
-                changes.append(("Type", infraction["infraction_type"], new_type))
+                updates["infraction_type"] = new_type
             if new_reason:
-                # noinspection SqlNoDataSourceInspection
-                c.execute('UPDATE infractions SET reason = ? WHERE id = ?', (new_reason, infraction_id))
-                changes.append(("Reason", infraction["reason"], new_reason))
+                updates["reason"] = new_reason
             if new_severity:
-                normalized = new_severity.lower()
-                # noinspection SqlNoDataSourceInspection
-                c.execute('UPDATE infractions SET severity = ? WHERE id = ?', (normalized, infraction_id))
-                changes.append(("Severity", infraction["severity"], new_severity.capitalize()))
+                updates["severity"] = new_severity.lower()
             if new_appealable:
-                appealable_bool = 1 if new_appealable.lower() == "yes" else 0
-                # noinspection SqlNoDataSourceInspection
-                c.execute('UPDATE infractions SET appealable = ? WHERE id = ?', (appealable_bool, infraction_id))
-                changes.append(("Appealable",
-                                "Yes" if infraction["appealable"] else "No",
-                                "Yes" if appealable_bool else "No"))
+                updates["appealable"] = 1 if new_appealable.lower() == "yes" else 0
             if new_note is not None:
-                # noinspection SqlNoDataSourceInspection
-                c.execute('UPDATE infractions SET note = ? WHERE id = ?', (new_note, infraction_id))
-                changes.append(("Note", infraction["note"] or "None", new_note or "None"))
-
-            conn.commit()
-            user = await self.bot.fetch_user(infraction["user_id"])
+                updates["note"] = new_note
 
+            previous = await db.transaction(apply_infraction_edit, infraction_id, interaction.user.id, updates)
+            updates = {column: updates[column] for column in previous}
+            changes = [(INFRACTION_EDIT_FIELDS[column], format_revision_value(column, old_value),
+                        format_revision_value(column, updates[column]))
+                       for column, old_value in previous.items()]
             if not changes:
                 await interaction_response(interaction).send_message("⚠️ No changes were applied.", ephemeral=True)
                 await log_command_usage(self.bot, interaction, "infraction edit", params,
                                         status="Failed: No changes applied")
                 return
 
+            infraction_cache.update_row(interaction.guild_id, infraction["user_id"], infraction_id, updates)
+            user = await resolver.user(self.bot, infraction["user_id"])
+            user_mention = user.mention if user else f"<@{infraction['user_id']}>"
+
             embed = discord.Embed(title=f"✏️ Infraction #{infraction_id} Updated",
                                   description=f"Updated by {interaction.user.mention}",
                                   color=discord.Color.from_rgb(100, 149, 237),
                                   timestamp=datetime.utcnow())
             embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else None)
-            embed.add_field(name="Member", value=user.mention, inline=False)
+            embed.add_field(name="Member", value=user_mention, inline=False)
             for field_name, old_value, new_value in changes:
                 embed.add_field(
                     name=field_name,
@@ -902,15 +3597,91 @@ class InfractionsCog(commands.Cog):
             logging.error(f"Edit error: {err}")
             await log_command_usage(self.bot, interaction, "infraction edit", params,
                                     status=f"Failed: {err}")
-        finally:
-            conn.close()
+
+    @infraction_group.command(name="history", description="Show the edit history of an infraction")
+    @app_commands.describe(infraction_id="ID")
+    async def infraction_history(self, interaction: discord.Interaction, infraction_id: int):
+        """Show the recorded field changes of an infraction"""
+        params = format_option_details([("infraction_id", infraction_id)])
+        if not has_infraction_role(interaction):
+            await interaction_response(interaction).send_message("❌ No permission.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction history", params,
+                                    status="Denied: Missing infraction role")
+            return
+
+        try:
+            def _load(conn: sqlite3.Connection) -> tuple[Optional[sqlite3.Row], list[sqlite3.Row], int]:
+                # noinspection SqlNoDataSourceInspection
+                row = conn.execute('''SELECT user_id, issued_by, timestamp, voided, voided_by, voided_reason,
+                                             void_timestamp
+                                      FROM infractions_all
+                                      WHERE id = ? AND guild_id = ?''',
+                                   (infraction_id, interaction.guild_id)).fetchone()
+                if row is None:
+                    return None, [], 0
+                # noinspection SqlNoDataSourceInspection
+                revisions = conn.execute('''SELECT edited_by, field, old_value, new_value, edited_at
+                                            FROM infraction_revisions
+                                            WHERE infraction_id = ?
+                                            ORDER BY id DESC
+                                            LIMIT ?''', (infraction_id, INFRACTION_REVISION_LIMIT)).fetchall()
+                # noinspection SqlNoDataSourceInspection
+                total = conn.execute('SELECT COUNT(*) FROM infraction_revisions WHERE infraction_id = ?',
+                                     (infraction_id,)).fetchone()[0]
+                return row, revisions, total
+
+            infraction, revisions, total = await db.run(_load, label="infraction history")
+            if infraction is None:
+                await interaction_response(interaction).send_message("❌ Not found.", ephemeral=True)
+                await log_command_usage(self.bot, interaction, "infraction history", params,
+                                        status="Failed: Infraction not found")
+                return
+
+            issued_at = int(datetime.fromisoformat(infraction["timestamp"]).timestamp())
+            embed = discord.Embed(title=f"🕘 Infraction #{infraction_id} History",
+                                  description=(f"**Member:** <@{infraction['user_id']}>\n"
+                                               f"**Issued by:** <@{infraction['issued_by']}> on <t:{issued_at}:f>"),
+                                  color=discord.Color.blurple(), timestamp=datetime.now())
+            if infraction["voided"]:
+                embed.add_field(name="❌ Voided",
+                                value=truncate_text(f"By <@{infraction['voided_by']}>: "
+                                                    f"{infraction['voided_reason'] or 'No reason'}", 300),
+                                inline=False)
+            for revision in revisions:
+                edited_at = int(datetime.fromisoformat(revision["edited_at"]).timestamp())
+                column = revision["field"]
+                embed.add_field(
+                    name=INFRACTION_EDIT_FIELDS.get(column, column),
+                    value=truncate_text(f"**Before:** {format_revision_value(column, revision['old_value'])}\n"
+                                        f"**After:** {format_revision_value(column, revision['new_value'])}\n"
+                                        f"By <@{revision['edited_by']}> <t:{edited_at}:R>", 300),
+                    inline=False
+                )
+            if not revisions:
+                embed.add_field(name="No edits", value="This infraction has not been edited.", inline=False)
+            if total > len(revisions):
+                embed.set_footer(text=f"Showing the latest {len(revisions)} of {total} changes")
+            else:
+                embed.set_footer(text=f"{total} change(s)")
+
+            await interaction_response(interaction).send_message(embed=embed, ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction history", params,
+                                    extra_info=f"Viewed {total} revisions of #{infraction_id}")
+
+        except Exception as err:
+            await interaction_response(interaction).send_message(f"❌ Error: {str(err)}", ephemeral=True)
+            logging.error(f"History error: {err}")
+            await log_command_usage(self.bot, interaction, "infraction history", params,
+                                    status=f"Failed: {err}")
 
     @infraction_group.command(name="list", description="View infractions for a user")
-    @app_commands.describe(user="User")
-    async def list_infractions(self, interaction: discord.Interaction, user: discord.Member):
+    @app_commands.describe(user="User", archived="Also show cleared and archived infractions")
+    async def list_infractions(self, interaction: discord.Interaction, user: discord.Member,
+                               archived: bool = False):
         """List all infractions for a user"""
         params = format_option_details([
-            ("user", user)
+            ("user", user),
+            ("archived", archived)
         ])
         if not has_infraction_role(interaction):
             await interaction_response(interaction).send_message("❌ No permission.", ephemeral=True)
@@ -919,17 +3690,13 @@ class InfractionsCog(commands.Cog):
             return
 
         try:
-            conn = sqlite3.connect('bot_data.db')
-            c = conn.cursor()
-            # noinspection SqlNoDataSourceInspection
-            c.execute('''SELECT id, infraction_type, reason, severity, timestamp, voided, voided_reason, appealable, note
-                         FROM infractions
-                         WHERE user_id = ? AND guild_id = ?
-                         ORDER BY timestamp DESC''', (user.id, interaction.guild_id))
-            infractions = c.fetchall()
-            conn.close()
+            if archived:
+                row = await db.fetchone(INFRACTION_ARCHIVE_SUMMARY_SQL, (interaction.guild_id, user.id) * 3)
+                summary = InfractionSummary(row["total"], row["voided"], None)
+            else:
+                summary = await infraction_cache.get(interaction.guild_id, user.id)
 
-            if not infractions:
+            if not summary.total:
                 embed = discord.Embed(title=f"📋 {user.name}", description="✅ No infractions",
                                       color=discord.Color.from_rgb(0, 255, 0), timestamp=datetime.now())
                 embed.set_thumbnail(url=user.avatar.url if user.avatar else None)
@@ -940,52 +3707,13 @@ class InfractionsCog(commands.Cog):
                                         extra_info=f"No infractions for {user.mention}")
                 return
 
-            embed = discord.Embed(title=f"📋 {user.name}", color=discord.Color.from_rgb(100, 149, 237),
-                                  timestamp=datetime.now())
-            embed.set_thumbnail(url=user.avatar.url if user.avatar else None)
-
-            active_count = 0
-            voided_count = 0
-
-            for inf in infractions:
-                inf_id, inf_type, reason, severity, timestamp, is_voided, void_reason, appealable, note = inf
-                sev_emoji = {"minor": "🟡", "medium": "🟠", "major": "🔴"}.get(severity, "⚪")
-
-                if is_voided:
-                    voided_count += 1
-                    status = "❌ VOIDED"
-                    value = (
-                        f"**Type:** {inf_type}\n"
-                        f"**Reason:** {reason}\n"
-                        f"{sev_emoji} **Severity:** {severity.capitalize()}\n"
-                        f"**Appealable:** {'Yes' if appealable else 'No'}\n"
-                        f"**Note:** {note or 'None'}\n"
-                        f"**Void Reason:** {void_reason}\n"
-                        f"**Date:** <t:{int(datetime.fromisoformat(timestamp).timestamp())}:f>"
-                    )
-                else:
-                    active_count += 1
-                    status = "⚠️ ACTIVE"
-                    value = (
-                        f"**Type:** {inf_type}\n"
-                        f"**Reason:** {reason}\n"
-                        f"{sev_emoji} **Severity:** {severity.capitalize()}\n"
-                        f"**Appealable:** {'Yes' if appealable else 'No'}\n"
-                        f"**Note:** {note or 'None'}\n"
-                        f"**Date:** <t:{int(datetime.fromisoformat(timestamp).timestamp())}:f>"
-                    )
-
-                embed.add_field(name=f"{status} #{inf_id}", value=value, inline=False)
-
-            embed.add_field(name="📊 Summary",
-                            value=f"**Active:** {active_count} | **Voided:** {voided_count} | **Total:** {len(infractions)}",
-                            inline=False)
-            embed.set_footer(text=f"{interaction.guild.name}",
-                             icon_url=interaction.guild.icon.url if interaction.guild.icon else None)
+            view = InfractionHistoryView(interaction.guild, user, interaction.user.id, summary, archived)
+            embed = await view.render_page()
 
-            await interaction_response(interaction).send_message(embed=embed, ephemeral=False)
+            await interaction_response(interaction).send_message(embed=embed, view=view, ephemeral=False)
+            view.message = await interaction.original_response()
             await log_command_usage(self.bot, interaction, "infraction list", params,
-                                    extra_info=f"Listed infractions for {user.mention}: {len(infractions)} entries")
+                                    extra_info=f"Listed infractions for {user.mention}: {summary.total} entries")
 
         except Exception as err:
             await interaction_response(interaction).send_message(f"❌ Error: {str(err)}", ephemeral=True)
@@ -993,6 +3721,80 @@ class InfractionsCog(commands.Cog):
             await log_command_usage(self.bot, interaction, "infraction list", params,
                                     status=f"Failed: {err}")
 
+    @infraction_group.command(name="search", description="Search infraction reasons and notes across the server")
+    @app_commands.describe(query="Words to find (end a word with * to match prefixes)",
+                           severity="minor/medium/major", voided="True for voided only, False for active only",
+                           since="Earliest date (YYYY-MM-DD)", until="Latest date, inclusive (YYYY-MM-DD)",
+                           archived="Also search cleared and archived infractions")
+    async def search_infractions(self, interaction: discord.Interaction, query: str, severity: Optional[str] = None,
+                                 voided: Optional[bool] = None, since: Optional[str] = None,
+                                 until: Optional[str] = None, archived: bool = False):
+        """Full-text search over infraction reasons, notes, void reasons and types"""
+        params = format_option_details([
+            ("query", query),
+            ("severity", severity),
+            ("voided", voided),
+            ("since", since),
+            ("until", until),
+            ("archived", archived)
+        ])
+        if not has_infraction_role(interaction):
+            await interaction_response(interaction).send_message("❌ No permission.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction search", params,
+                                    status="Denied: Missing infraction role")
+            return
+
+        match = build_fts_query(query)
+        if match is None:
+            await interaction_response(interaction).send_message("❌ Enter at least one search word.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction search", params,
+                                    status="Failed: Empty query")
+            return
+
+        if severity is not None and severity.lower() not in ["minor", "medium", "major"]:
+            await interaction_response(interaction).send_message("❌ Invalid severity.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction search", params,
+                                    status="Failed: Invalid severity")
+            return
+
+        try:
+            since_date = parse_search_date(since)
+            until_date = parse_search_date(until)
+        except ValueError:
+            await interaction_response(interaction).send_message("❌ Dates must be YYYY-MM-DD.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "infraction search", params,
+                                    status="Failed: Invalid date")
+            return
+
+        severity_value = severity.lower() if severity else None
+        voided_value = None if voided is None else int(voided)
+        since_value = since_date.strftime("%Y-%m-%d") if since_date else None
+        until_value = (until_date + timedelta(days=1)).strftime("%Y-%m-%d") if until_date else None
+        filters = (severity_value, severity_value, voided_value, voided_value, since_value, since_value,
+                   until_value, until_value)
+        filter_summary = " • ".join(part for part in (
+            severity_value and severity_value.capitalize(),
+            voided is not None and ("Voided" if voided else "Active"),
+            since_value and f"From {since_value}",
+            until_date and f"Until {until_date.strftime('%Y-%m-%d')}",
+            archived and "Including archived",
+        ) if part)
+
+        try:
+            view = InfractionSearchView(interaction.guild, interaction.user.id, query, match, filters,
+                                        filter_summary, archived)
+            embed = await view.render_page()
+
+            await interaction_response(interaction).send_message(embed=embed, view=view, ephemeral=True)
+            view.message = await interaction.original_response()
+            await log_command_usage(self.bot, interaction, "infraction search", params)
+
+        except Exception as err:
+            await interaction_response(interaction).send_message(f"❌ Error: {str(err)}", ephemeral=True)
+            logging.error(f"Search error: {err}")
+            await log_command_usage(self.bot, interaction, "infraction search", params,
+                                    status=f"Failed: {err}")
+
     @infraction_group.command(name="admin", description="Administrative infraction tools")
     @app_commands.describe(user="User whose infractions to clear",
                            reason="Reason for clearing the infractions")
@@ -1009,13 +3811,9 @@ class InfractionsCog(commands.Cog):
                                     status="Denied: Missing infraction role")
             return
 
-        conn = sqlite3.connect('bot_data.db')
-        c = conn.cursor()
         try:
-            # noinspection SqlNoDataSourceInspection
-            c.execute('SELECT COUNT(*) FROM infractions WHERE user_id = ? AND guild_id = ?',
-                      (user.id, interaction.guild_id))
-            count = c.fetchone()[0]
+            row = await db.fetchone(INFRACTION_COUNT_SQL, (interaction.guild_id, user.id))
+            count = row[0]
 
             if count == 0:
                 await interaction_response(interaction).send_message("ℹ️ No infractions found to clear.",
@@ -1024,14 +3822,13 @@ class InfractionsCog(commands.Cog):
                                         status="Failed: Nothing to clear")
                 return
 
-            # noinspection SqlNoDataSourceInspection
-            c.execute('DELETE FROM infractions WHERE user_id = ? AND guild_id = ?',
-                      (user.id, interaction.guild_id))
-            conn.commit()
+            await db.execute(INFRACTION_CLEAR_SQL, (interaction.user.id, reason, interaction.guild_id, user.id))
+            infraction_cache.invalidate(interaction.guild_id, user.id)
 
             embed = discord.Embed(
                 title="🧹 Infractions Cleared",
-                description=f"All infractions for {user.mention} have been cleared.",
+                description=(f"All infractions for {user.mention} have been cleared. They are kept in the "
+                             f"archive and shown by `/infraction list` with `archived` set."),
                 color=discord.Color.dark_teal(),
                 timestamp=datetime.utcnow()
             )
@@ -1048,8 +3845,280 @@ class InfractionsCog(commands.Cog):
             logging.error(f"Admin clear error: {err}")
             await log_command_usage(self.bot, interaction, "infraction admin", params,
                                     status=f"Failed: {err}")
-        finally:
-            conn.close()
+
+
+def format_infraction_field(row: sqlite3.Row | dict[str, Any]) -> tuple[str, str]:
+    """Return the embed field name and value for one infraction row."""
+    severity = row["severity"]
+    sev_emoji = {"minor": "🟡", "medium": "🟠", "major": "🔴"}.get(severity, "⚪")
+    status = "❌ VOIDED" if row["voided"] else "⚠️ ACTIVE"
+    if "archive_state" in row.keys() and row["archive_state"]:
+        status = f"🗄️ ARCHIVED ({row['archive_state']})"
+    lines = [
+        f"**Type:** {row['infraction_type']}",
+        f"**Reason:** {row['reason']}",
+        f"{sev_emoji} **Severity:** {severity.capitalize()}",
+        f"**Appealable:** {'Yes' if row['appealable'] else 'No'}",
+        f"**Note:** {row['note'] or 'None'}",
+    ]
+    if row["voided"]:
+        lines.append(f"**Void Reason:** {row['voided_reason']}")
+    lines.append(f"**Date:** <t:{int(datetime.fromisoformat(row['timestamp']).timestamp())}:f>")
+    return f"{status} #{row['id']}", truncate_text("\n".join(lines))
+
+
+class InfractionHistoryView(discord.ui.View):
+    """Paginated infraction history that fetches and formats one page at a time"""
+
+    def __init__(self, guild: discord.Guild, user: discord.abc.User, invoker_id: int, summary: InfractionSummary,
+                 archived: bool = False):
+        super().__init__(timeout=300)
+        self.guild = guild
+        self.user = user
+        self.invoker_id = invoker_id
+        self.summary = summary
+        self.archived = archived
+        self.page = 0
+        self.page_count = max(1, math.ceil(summary.total / INFRACTION_PAGE_SIZE))
+        self.message: Optional[discord.Message] = None
+        # _page_keys[n] is the (timestamp, id) of the last row on page n.
+        self._page_keys: list[tuple[str, int]] = []
+        self._pages: OrderedDict[int, list[sqlite3.Row]] = OrderedDict()
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only the moderator who ran the command may page through it."""
+        if interaction.user.id != self.invoker_id:
+            await interaction_response(interaction).send_message("❌ Only the command user can do this.",
+                                                                 ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self) -> None:
+        """Disable the buttons once the view expires."""
+        for item in self.children:
+            if isinstance(item, discord.ui.Button):
+                item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    def _start_key(self, page: int) -> tuple[str, int]:
+        """Return the keyset cursor that a page starts after."""
+        return self._page_keys[page - 1] if page else INFRACTION_PAGE_START
+
+    async def _fetch_after(self, keys_only: bool, start_key: tuple[str, int], limit: int) -> list[sqlite3.Row]:
+        """Read up to limit rows after start_key from the hot table, or from every tier when archived."""
+        if self.archived:
+            statements = INFRACTION_TIER_PAGE_KEYS_SQL if keys_only else INFRACTION_TIER_PAGE_SQL
+            return await db.run(fetch_tiered_rows, statements, self.guild.id, self.user.id, start_key, limit,
+                                label="infraction archive page")
+        sql = INFRACTION_PAGE_KEYS_SQL if keys_only else INFRACTION_PAGE_SQL
+        return await db.fetchall(sql, (self.guild.id, self.user.id, *start_key, limit))
+
+    async def _walk_keys(self, page: int) -> None:
+        """Learn the start key of page by scanning only the index, not row bodies."""
+        missing = page - len(self._page_keys)
+        if missing <= 0:
+            return
+        rows = await self._fetch_after(True, self._start_key(len(self._page_keys)), missing * INFRACTION_PAGE_SIZE)
+        for end in range(INFRACTION_PAGE_SIZE - 1, len(rows), INFRACTION_PAGE_SIZE):
+            self._page_keys.append((rows[end]["timestamp"], rows[end]["id"]))
+
+    async def fetch_page(self, page: int) -> list[sqlite3.Row | dict[str, Any]]:
+        """Return the rows of a page, from the cached summary or page cache when possible."""
+        if self.summary.rows is not None:
+            start = page * INFRACTION_PAGE_SIZE
+            return self.summary.rows[start:start + INFRACTION_PAGE_SIZE]
+
+        cached = self._pages.get(page)
+        if cached is not None:
+            self._pages.move_to_end(page)
+            return cached
+
+        await self._walk_keys(page)
+        rows = await self._fetch_after(False, self._start_key(page), INFRACTION_PAGE_SIZE)
+        if rows and len(self._page_keys) == page:
+            self._page_keys.append((rows[-1]["timestamp"], rows[-1]["id"]))
+
+        self._pages[page] = rows
+        if len(self._pages) > INFRACTION_PAGE_CACHE_SIZE:
+            self._pages.popitem(last=False)
+        return rows
+
+    async def render_page(self) -> discord.Embed:
+        """Build the embed for the current page and refresh button state."""
+        rows = await self.fetch_page(self.page)
+
+        with bot_metrics.time("embed.infraction_page"):
+            embed = discord.Embed(title=f"📋 {self.user.name}", color=discord.Color.from_rgb(100, 149, 237),
+                                  timestamp=datetime.now())
+            embed.set_thumbnail(url=self.user.avatar.url if self.user.avatar else None)
+            for row in rows:
+                name, value = format_infraction_field(row)
+                embed.add_field(name=name, value=value, inline=False)
+
+            embed.add_field(name="📊 Summary",
+                            value=f"**Active:** {self.summary.active} | **Voided:** {self.summary.voided} | "
+                                  f"**Total:** {self.summary.total}",
+                            inline=False)
+            footer = f"{self.guild.name} • Page {self.page + 1}/{self.page_count}"
+            if self.archived:
+                footer = f"{footer} • Including archived"
+            embed.set_footer(text=footer, icon_url=self.guild.icon.url if self.guild.icon else None)
+
+        self.prev_button.disabled = self.page == 0
+        self.next_button.disabled = self.page >= self.page_count - 1
+        self.jump_button.disabled = self.page_count == 1
+        return embed
+
+    async def show_page(self, interaction: discord.Interaction, page: int) -> None:
+        """Move to page and edit the message in place."""
+        self.page = max(0, min(page, self.page_count - 1))
+        embed = await self.render_page()
+        await interaction_response(interaction).edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary, emoji="◀️")
+    @timed
+    async def prev_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Show the previous page"""
+        await self.show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="Jump", style=discord.ButtonStyle.primary, emoji="🔢")
+    @timed
+    async def jump_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Ask for a page number"""
+        await interaction_response(interaction).send_modal(JumpToPageModal(self))
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    @timed
+    async def next_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Show the next page"""
+        await self.show_page(interaction, self.page + 1)
+
+
+class JumpToPageModal(discord.ui.Modal):
+    """Modal asking which page of a paginated view to show"""
+
+    def __init__(self, view: InfractionHistoryView):
+        super().__init__(title="Jump to Page")
+        self.history_view = view
+
+        self.page_input = discord.ui.TextInput(label=f"Page (1-{view.page_count})", placeholder="Number",
+                                               required=True, max_length=6)
+        self.add_item(self.page_input)
+
+    @timed
+    async def on_submit(self, interaction: discord.Interaction) -> None:
+        """Handle page selection"""
+        try:
+            page = int(self.page_input.value)
+        except ValueError:
+            await interaction_response(interaction).send_message("❌ Must be a number.", ephemeral=True)
+            return
+
+        if not 1 <= page <= self.history_view.page_count:
+            await interaction_response(interaction).send_message(
+                f"❌ Page must be between 1 and {self.history_view.page_count}.", ephemeral=True)
+            return
+
+        await self.history_view.show_page(interaction, page - 1)
+
+
+class InfractionSearchView(discord.ui.View):
+    """Ranked infraction search results, fetched one page at a time"""
+
+    def __init__(self, guild: discord.Guild, invoker_id: int, query_text: str, match: str,
+                 filters: tuple[Any, ...], filter_summary: str, archived: bool = False):
+        super().__init__(timeout=300)
+        self.guild = guild
+        self.invoker_id = invoker_id
+        self.query_text = query_text
+        self.match = match
+        # (severity, voided, since, until), each repeated for the "? IS NULL OR ..." pairs.
+        self.filters = filters
+        self.filter_summary = filter_summary
+        self.archived = archived
+        self.page = 0
+        self.has_next = False
+        self.message: Optional[discord.Message] = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only the moderator who ran the search may page through it."""
+        if interaction.user.id != self.invoker_id:
+            await interaction_response(interaction).send_message("❌ Only the command user can do this.",
+                                                                 ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self) -> None:
+        """Disable the buttons once the view expires."""
+        for item in self.children:
+            if isinstance(item, discord.ui.Button):
+                item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    async def fetch_page(self) -> list[sqlite3.Row]:
+        """Return the current page of matches, noting whether another page follows."""
+        tier = (self.match, self.guild.id, *self.filters)
+        if self.archived:
+            sql, params = INFRACTION_ARCHIVE_SEARCH_SQL, (*tier, *tier)
+        else:
+            sql, params = INFRACTION_SEARCH_SQL, tier
+        rows = await db.fetchall(sql, (*params, INFRACTION_SEARCH_PAGE_SIZE + 1,
+                                       self.page * INFRACTION_SEARCH_PAGE_SIZE))
+        self.has_next = len(rows) > INFRACTION_SEARCH_PAGE_SIZE
+        return rows[:INFRACTION_SEARCH_PAGE_SIZE]
+
+    async def render_page(self) -> discord.Embed:
+        """Build the embed for the current page and refresh button state."""
+        rows = await self.fetch_page()
+
+        with bot_metrics.time("embed.infraction_search"):
+            embed = discord.Embed(title=f"🔎 {truncate_text(self.query_text, 200)}",
+                                  color=discord.Color.from_rgb(100, 149, 237), timestamp=datetime.now())
+            if not rows:
+                embed.description = "No matching infractions."
+            for row in rows:
+                name, value = format_infraction_field(row)
+                embed.add_field(name=name, value=truncate_text(f"**Member:** <@{row['user_id']}>\n{value}"),
+                                inline=False)
+            footer = f"{self.guild.name} • Page {self.page + 1}"
+            if self.filter_summary:
+                footer = f"{footer} • {self.filter_summary}"
+            embed.set_footer(text=footer, icon_url=self.guild.icon.url if self.guild.icon else None)
+
+        self.prev_button.disabled = self.page == 0
+        self.next_button.disabled = not self.has_next
+        return embed
+
+    async def show_page(self, interaction: discord.Interaction, page: int) -> None:
+        """Move to page and edit the message in place."""
+        self.page = max(0, page)
+        embed = await self.render_page()
+        await interaction_response(interaction).edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary, emoji="◀️")
+    @timed
+    async def prev_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Show the previous page"""
+        await self.show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    @timed
+    async def next_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Show the next page"""
+        await self.show_page(interaction, self.page + 1)
+
+
+def parse_search_date(text: Optional[str]) -> Optional[datetime]:
+    """Parse a YYYY-MM-DD filter date; raises ValueError on other formats."""
+    return datetime.strptime(text.strip(), "%Y-%m-%d") if text else None
 
 
 class TryoutView(discord.ui.View):
@@ -1060,17 +4129,30 @@ class TryoutView(discord.ui.View):
         super().__init__(timeout=None)
         self.bot = bot_instance
         self.tryout_id = tryout_id
+        self.event_type = "tryout"
+        self.event_id = tryout_id
         self.host_id = host_id
         self.guild_id = guild_id
-        self.attendees = set()
+        self.attendees = AttendeeRoster()
         self.message_reference = message_reference
+        self.attend_button.custom_id = f"tryout:{tryout_id}:attend"
+        self.host_button.custom_id = f"tryout:{tryout_id}:host"
+        self.roster_button.custom_id = f"tryout:{tryout_id}:roster"
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Pick up the event message after a restart, when only the message id was known"""
+        if self.message_reference is None and interaction.message is not None:
+            self.message_reference = interaction.message
+        return True
 
     @discord.ui.button(label="Attending", style=discord.ButtonStyle.success, emoji="✅")
+    @timed
     async def attend_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Toggle attendance"""
         await toggle_attendance_state(self, interaction)
 
     @discord.ui.button(label="Host Panel", style=discord.ButtonStyle.primary, emoji="🎯")
+    @timed
     async def host_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Open host control panel"""
         if interaction.user.id != self.host_id:
@@ -1082,17 +4164,23 @@ class TryoutView(discord.ui.View):
         embed.add_field(name="Options", value="• Start\n• Conclude\n• Cancel", inline=False)
         await interaction_response(interaction).send_message(embed=embed, view=view, ephemeral=True)
 
+    @discord.ui.button(label="View All", style=discord.ButtonStyle.secondary, emoji="📋")
+    @timed
+    async def roster_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Show the full attendee roster"""
+        view = RosterView(self.attendees, "Tryout Attendees")
+        await interaction_response(interaction).send_message(embed=view.render_page(), view=view, ephemeral=True)
+
     async def update_embed(self, message: discord.Message) -> None:
         """Update the tryout embed with current attendees"""
-        attendee_mentions = "\n".join([f"<@{uid}>" for uid in sorted(self.attendees)])
-        if not attendee_mentions:
-            attendee_mentions = "No attendees yet"
-
-        embed = message.embeds[0]
-        for i, field in enumerate(embed.fields):
-            if field.name == "**Current Attendees:**":
-                embed.set_field_at(i, name="**Current Attendees:**", value=attendee_mentions, inline=False)
-                break
+        with bot_metrics.time("embed.attendance"):
+            attendee_mentions = self.attendees.render()
+
+            embed = message.embeds[0]
+            for i, field in enumerate(embed.fields):
+                if field.name == "**Current Attendees:**":
+                    embed.set_field_at(i, name="**Current Attendees:**", value=attendee_mentions, inline=False)
+                    break
 
         await message.edit(embed=embed)
 
@@ -1106,17 +4194,30 @@ class TrainingView(discord.ui.View):
         super().__init__(timeout=None)
         self.bot = bot_instance
         self.training_id = training_id
+        self.event_type = "training"
+        self.event_id = training_id
         self.host_id = host_id
         self.guild_id = guild_id
-        self.attendees = set()
+        self.attendees = AttendeeRoster()
         self.message_reference = message_reference
+        self.attend_button.custom_id = f"training:{training_id}:attend"
+        self.host_button.custom_id = f"training:{training_id}:host"
+        self.roster_button.custom_id = f"training:{training_id}:roster"
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Pick up the event message after a restart, when only the message id was known"""
+        if self.message_reference is None and interaction.message is not None:
+            self.message_reference = interaction.message
+        return True
 
     @discord.ui.button(label="Attending", style=discord.ButtonStyle.success, emoji="✅")
+    @timed
     async def attend_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Toggle attendance"""
         await toggle_attendance_state(self, interaction)
 
     @discord.ui.button(label="Host Panel", style=discord.ButtonStyle.primary, emoji="📚")
+    @timed
     async def host_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Open host control panel"""
         if interaction.user.id != self.host_id:
@@ -1129,26 +4230,73 @@ class TrainingView(discord.ui.View):
         embed.add_field(name="Options", value="• Start\n• Conclude\n• Cancel", inline=False)
         await interaction_response(interaction).send_message(embed=embed, view=view, ephemeral=True)
 
+    @discord.ui.button(label="View All", style=discord.ButtonStyle.secondary, emoji="📋")
+    @timed
+    async def roster_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Show the full attendee roster"""
+        view = RosterView(self.attendees, "Training Attendees")
+        await interaction_response(interaction).send_message(embed=view.render_page(), view=view, ephemeral=True)
+
     async def update_embed(self, message: discord.Message) -> None:
         """Update the training embed with current attendees"""
-        attendee_mentions = "\n".join([f"<@{uid}>" for uid in sorted(self.attendees)])
-        if not attendee_mentions:
-            attendee_mentions = "No attendees yet"
-
-        embed = message.embeds[0]
-        for i, field in enumerate(embed.fields):
-            if field.name == "**Current Attendees:**":
-                embed.set_field_at(i, name="**Current Attendees:**", value=attendee_mentions, inline=False)
-                break
+        with bot_metrics.time("embed.attendance"):
+            attendee_mentions = self.attendees.render()
+
+            embed = message.embeds[0]
+            for i, field in enumerate(embed.fields):
+                if field.name == "**Current Attendees:**":
+                    embed.set_field_at(i, name="**Current Attendees:**", value=attendee_mentions, inline=False)
+                    break
 
         await message.edit(embed=embed)
 
 
+class RosterView(discord.ui.View):
+    """Ephemeral, paginated list of every attendee of an event"""
+
+    def __init__(self, roster: AttendeeRoster, title: str):
+        super().__init__(timeout=180)
+        self.roster = roster
+        self.title = title
+        self.page = 0
+
+    @property
+    def page_count(self) -> int:
+        """Number of roster pages for the current attendee count."""
+        return max(1, math.ceil(len(self.roster) / ROSTER_PAGE_SIZE))
+
+    def render_page(self) -> discord.Embed:
+        """Build the embed for the current page and refresh button state."""
+        self.page = max(0, min(self.page, self.page_count - 1))
+        start = self.page * ROSTER_PAGE_SIZE
+        lines = [f"{start + i + 1}. <@{uid}>" for i, uid in enumerate(self.roster.page(self.page))]
+        embed = discord.Embed(title=f"📋 {self.title}", description="\n".join(lines) or "No attendees yet",
+                              color=discord.Color.blurple())
+        embed.set_footer(text=f"{len(self.roster)} attending • Page {self.page + 1}/{self.page_count}")
+        self.prev_button.disabled = self.page == 0
+        self.next_button.disabled = self.page >= self.page_count - 1
+        return embed
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary, emoji="◀️")
+    @timed
+    async def prev_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Show the previous page"""
+        self.page -= 1
+        await interaction_response(interaction).edit_message(embed=self.render_page(), view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    @timed
+    async def next_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
+        """Show the next page"""
+        self.page += 1
+        await interaction_response(interaction).edit_message(embed=self.render_page(), view=self)
+
+
 class HostPanelView(discord.ui.View):
     """View for host control panel"""
 
     def __init__(self, bot_instance: commands.Bot, event_id: int, guild_id: int,
-                 message_reference: Optional[discord.Message], attendees: set, event_type: str):
+                 message_reference: Optional[discord.Message], attendees: AttendeeRoster, event_type: str):
         super().__init__()
         self.bot = bot_instance
         self.event_id = event_id
@@ -1158,9 +4306,11 @@ class HostPanelView(discord.ui.View):
         self.event_type = event_type
 
     @discord.ui.button(label="Start", style=discord.ButtonStyle.success)
+    @timed
     async def start_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Start the event"""
         await interaction_response(interaction).defer(ephemeral=True)
+        await set_event_status(self.event_type, self.event_id, "started")
 
         if self.message_reference and self.event_type == "tryout":
             embed = self.message_reference.embeds[0]
@@ -1183,9 +4333,11 @@ class HostPanelView(discord.ui.View):
         await interaction.followup.send(f"✅ {self.event_type.capitalize()} started!", ephemeral=True)
 
     @discord.ui.button(label="Conclude", style=discord.ButtonStyle.primary)
+    @timed
     async def conclude_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Conclude the event"""
         await interaction_response(interaction).defer(ephemeral=True)
+        await set_event_status(self.event_type, self.event_id, "concluded")
 
         if self.message_reference:
             embed = discord.Embed(
@@ -1200,20 +4352,23 @@ class HostPanelView(discord.ui.View):
         await interaction.followup.send(f"✅ {self.event_type.capitalize()} concluded!", ephemeral=True)
 
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger)
+    @timed
     async def cancel_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Cancel the event"""
-        modal = CancelReasonModal(self.bot, self.event_type, self.message_reference)
+        modal = CancelReasonModal(self.bot, self.event_type, self.message_reference, self.event_id)
         await interaction_response(interaction).send_modal(modal)
 
 
 class CancelReasonModal(discord.ui.Modal):
     """Modal for cancellation reason"""
 
-    def __init__(self, bot_instance: commands.Bot, event_type: str, message_reference: Optional[discord.Message]):
+    def __init__(self, bot_instance: commands.Bot, event_type: str, message_reference: Optional[discord.Message],
+                 event_id: int):
         super().__init__(title=f"Cancel {event_type.capitalize()}")
         self.bot = bot_instance
         self.event_type = event_type
         self.message_reference = message_reference
+        self.event_id = event_id
 
         self.reason_input = discord.ui.TextInput(
             label="Cancellation Reason",
@@ -1222,11 +4377,13 @@ class CancelReasonModal(discord.ui.Modal):
         )
         self.add_item(self.reason_input)
 
+    @timed
     async def on_submit(self, interaction: discord.Interaction) -> None:
         """Handle cancellation"""
         await interaction_response(interaction).defer(ephemeral=True)
 
         reason = self.reason_input.value
+        await set_event_status(self.event_type, self.event_id, "cancelled")
 
         if self.message_reference:
             embed = discord.Embed(
@@ -1253,6 +4410,7 @@ class HostMenuView(discord.ui.View):
         self.channel = channel
 
     @discord.ui.button(label="Tryout", style=discord.ButtonStyle.primary, emoji="🎯")
+    @timed
     async def tryout_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Open tryout modal"""
         if interaction.user.id != self.host_user.id:
@@ -1263,6 +4421,7 @@ class HostMenuView(discord.ui.View):
         await interaction_response(interaction).send_modal(modal)
 
     @discord.ui.button(label="Training", style=discord.ButtonStyle.secondary, emoji="📚")
+    @timed
     async def training_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Open training modal"""
         if interaction.user.id != self.host_user.id:
@@ -1287,6 +4446,7 @@ class TryoutModal(discord.ui.Modal):
         self.required_input = discord.ui.TextInput(label="Required Attendees", placeholder="Number", required=True)
         self.add_item(self.required_input)
 
+    @timed
     async def on_submit(self, interaction: discord.Interaction) -> None:
         """Handle tryout setup"""
         try:
@@ -1318,6 +4478,7 @@ class TrainingModal(discord.ui.Modal):
         self.required_input = discord.ui.TextInput(label="Required Attendees", placeholder="Number", required=True)
         self.add_item(self.required_input)
 
+    @timed
     async def on_submit(self, interaction: discord.Interaction) -> None:
         """Handle training setup"""
         try:
@@ -1347,6 +4508,7 @@ class TryoutConfirmView(discord.ui.View):
         self.required_attendees = required_attendees
 
     @discord.ui.button(label="Confirm", style=discord.ButtonStyle.success, emoji="✅")
+    @timed
     async def confirm_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Confirm tryout creation"""
         if interaction.user.id != self.host_user.id:
@@ -1383,18 +4545,23 @@ Good Luck!
 **Status: Open for Attendees**""", inline=False)
         tryout_embed.set_footer(text=f"{self.guild.name}", icon_url=self.guild.icon.url if self.guild.icon else None)
 
-        view = TryoutView(self.bot, 0, self.host_user.id, self.guild.id)
-        tryout_msg = await self.channel.send(embed=tryout_embed, view=view)
+        # noinspection SqlNoDataSourceInspection
+        tryout_id = await db.execute('''INSERT INTO tryouts (host_id, required_attendees, guild_id, channel_id,
+                                                         status)
+                                     VALUES (?, ?, ?, ?, ?)''',
+                                  (self.host_user.id, self.required_attendees, self.guild.id, self.channel.id,
+                                   'open'))
+
+        view = TryoutView(self.bot, tryout_id, self.host_user.id, self.guild.id)
+        try:
+            tryout_msg = await self.channel.send(embed=tryout_embed, view=view)
+        except discord.HTTPException:
+            await set_event_status("tryout", tryout_id, "failed")
+            raise
         view.message_reference = tryout_msg
 
-        conn = sqlite3.connect('bot_data.db')
-        c = conn.cursor()
         # noinspection SqlNoDataSourceInspection
-        c.execute('''INSERT INTO tryouts (message_id, host_id, required_attendees, guild_id, channel_id, status)
-                     VALUES (?, ?, ?, ?, ?, ?)''',
-                  (tryout_msg.id, self.host_user.id, self.required_attendees, self.guild.id, self.channel.id, 'open'))
-        conn.commit()
-        conn.close()
+        await db.execute('UPDATE tryouts SET message_id = ? WHERE id = ?', (tryout_msg.id, tryout_id))
 
         await interaction.followup.send("✅ Tryout posted!", ephemeral=True)
 
@@ -1413,6 +4580,7 @@ class TrainingConfirmView(discord.ui.View):
         self.required_attendees = required_attendees
 
     @discord.ui.button(label="Confirm", style=discord.ButtonStyle.success, emoji="✅")
+    @timed
     async def confirm_button(self, interaction: discord.Interaction, _button: discord.ui.Button) -> None:
         """Confirm training creation"""
         if interaction.user.id != self.host_user.id:
@@ -1442,18 +4610,23 @@ Those attending should:
 **Status: Open for Attendees**""", inline=False)
         training_embed.set_footer(text=f"{self.guild.name}", icon_url=self.guild.icon.url if self.guild.icon else None)
 
-        view = TrainingView(self.bot, 0, self.host_user.id, self.guild.id)
-        training_msg = await self.channel.send(embed=training_embed, view=view)
+        # noinspection SqlNoDataSourceInspection
+        training_id = await db.execute('''INSERT INTO trainings (host_id, required_attendees, guild_id,
+                                                              channel_id, status)
+                                       VALUES (?, ?, ?, ?, ?)''',
+                                    (self.host_user.id, self.required_attendees, self.guild.id, self.channel.id,
+                                     'open'))
+
+        view = TrainingView(self.bot, training_id, self.host_user.id, self.guild.id)
+        try:
+            training_msg = await self.channel.send(embed=training_embed, view=view)
+        except discord.HTTPException:
+            await set_event_status("training", training_id, "failed")
+            raise
         view.message_reference = training_msg
 
-        conn = sqlite3.connect('bot_data.db')
-        c = conn.cursor()
         # noinspection SqlNoDataSourceInspection
-        c.execute('''INSERT INTO trainings (message_id, host_id, required_attendees, guild_id, channel_id, status)
-                     VALUES (?, ?, ?, ?, ?, ?)''',
-                  (training_msg.id, self.host_user.id, self.required_attendees, self.guild.id, self.channel.id, 'open'))
-        conn.commit()
-        conn.close()
+        await db.execute('UPDATE trainings SET message_id = ? WHERE id = ?', (training_msg.id, training_id))
 
         await interaction.followup.send("✅ Training posted!", ephemeral=True)
 
@@ -1487,9 +4660,436 @@ class TryoutCog(commands.Cog):
                                 extra_info=f"Opened host menu for {interaction.user.mention}")
 
 
+EXPORT_CHUNK_ROWS = 500
+EXPORT_SPOOL_BYTES = 1024 * 1024
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_TABLES = ("infractions", "promotions")
+EXPORT_COLUMNS = {
+    "infractions": ("id", "user_id", "issued_by", "infraction_type", "reason", "severity", "appealable", "note",
+                    "timestamp", "voided", "voided_by", "voided_reason", "void_timestamp", "dm_status"),
+    "promotions": ("id", "user_id", "promoted_by", "new_role", "reason", "note", "timestamp", "dm_status"),
+}
+# Exporting infractions with archived set also reads cleared rows and the archive.
+EXPORT_COLUMNS["infractions_all"] = (*EXPORT_COLUMNS["infractions"], "cleared_at", "cleared_by", "cleared_reason",
+                                     "archive_state")
+
+
+def build_export_sql(table: str, columns: Iterable[str], condition: str = "") -> str:
+    """Build a keyset-paged export statement; user, since and until are each passed twice and skipped when NULL."""
+    # noinspection SqlNoDataSourceInspection
+    return f'''SELECT {", ".join(columns)}
+               FROM {table}
+               WHERE guild_id = ? AND id > ? {condition}
+                 AND (? IS NULL OR user_id = ?)
+                 AND (? IS NULL OR timestamp >= ?)
+                 AND (? IS NULL OR timestamp < ?)
+               ORDER BY id
+               LIMIT ?'''
+
+
+# Statements run in turn for each export source. Archived exports go tier by tier
+# so that every keyset walk stays on a single table's primary key.
+EXPORT_SQL = {
+    "infractions": (build_export_sql("infractions", EXPORT_COLUMNS["infractions"], "AND cleared_at IS NULL"),),
+    "promotions": (build_export_sql("promotions", EXPORT_COLUMNS["promotions"]),),
+    "infractions_all": (
+        build_export_sql("infractions", (*EXPORT_COLUMNS["infractions_all"][:-1],
+                                         "CASE WHEN cleared_at IS NOT NULL THEN 'cleared' END AS archive_state")),
+        build_export_sql("infractions_archive", (*EXPORT_COLUMNS["infractions_all"][:-1],
+                                                 "archive_reason AS archive_state")),
+    ),
+}
+
+
+def iter_export_rows(conn: sqlite3.Connection, source: str, guild_id: int, user_id: Optional[int],
+                     since: Optional[str], until: Optional[str]) -> Iterator[sqlite3.Row]:
+    """Yield matching rows tier by tier in id order, holding at most one chunk in memory."""
+    for sql in EXPORT_SQL[source]:
+        last_id = 0
+        while True:
+            rows = conn.execute(sql, (guild_id, last_id, user_id, user_id, since, since, until, until,
+                                      EXPORT_CHUNK_ROWS)).fetchall()
+            yield from rows
+            if len(rows) < EXPORT_CHUNK_ROWS:
+                break
+            last_id = rows[-1]["id"]
+
+
+def write_export(conn: sqlite3.Connection, table: str, fmt: str, guild_id: int, user_id: Optional[int],
+                 since: Optional[str], until: Optional[str]) -> tuple[tempfile.SpooledTemporaryFile, int]:
+    """Stream an export into a gzip file that spills to disk past EXPORT_SPOOL_BYTES.
+
+    Returns the file rewound to the start and the number of rows written.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    count = 0
+    try:
+        with gzip.GzipFile(fileobj=spool, mode="wb") as compressed:
+            text = io.TextIOWrapper(compressed, encoding="utf-8", newline="")
+            writer = csv.writer(text) if fmt == "csv" else None
+            if writer:
+                writer.writerow(EXPORT_COLUMNS[table])
+            for row in iter_export_rows(conn, table, guild_id, user_id, since, until):
+                if writer:
+                    writer.writerow(tuple(row))
+                else:
+                    text.write(json.dumps(dict(row), ensure_ascii=False) + "\n")
+                count += 1
+            text.flush()
+            text.detach()
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, count
+
+
+class RecordsCog(commands.Cog):
+    """Cog for bulk record exports"""
+
+    def __init__(self, bot_instance: commands.Bot):
+        self.bot = bot_instance
+
+    records_group = app_commands.Group(name="records", description="Export stored records")
+
+    @records_group.command(name="export", description="Download infractions or promotions as a gzip file")
+    @app_commands.describe(table="infractions/promotions", file_format="csv/jsonl",
+                           user="Only rows about this user", since="Earliest date (YYYY-MM-DD)",
+                           until="Latest date, inclusive (YYYY-MM-DD)",
+                           archived="Include cleared and archived infractions")
+    @app_commands.rename(file_format="format")
+    async def export_records(self, interaction: discord.Interaction, table: str, file_format: str = "csv",
+                             user: Optional[discord.User] = None, since: Optional[str] = None,
+                             until: Optional[str] = None, archived: bool = False):
+        """Export matching rows as gzip-compressed CSV or JSONL"""
+        params = format_option_details([
+            ("table", table),
+            ("format", file_format),
+            ("user", user),
+            ("since", since),
+            ("until", until),
+            ("archived", archived)
+        ])
+        table = table.lower()
+        file_format = file_format.lower()
+        if table not in EXPORT_TABLES or file_format not in EXPORT_FORMATS:
+            await interaction_response(interaction).send_message("❌ Invalid table or format.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "records export", params,
+                                    status="Failed: Invalid table or format")
+            return
+
+        if archived and table != "infractions":
+            await interaction_response(interaction).send_message("❌ Only infractions are archived.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "records export", params,
+                                    status="Failed: Nothing archived")
+            return
+
+        allowed = has_infraction_role(interaction) if table == "infractions" else has_promote_role(interaction)
+        if not allowed:
+            await interaction_response(interaction).send_message("❌ No permission.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "records export", params,
+                                    status="Denied: Missing role")
+            return
+
+        try:
+            since_date = parse_search_date(since)
+            until_date = parse_search_date(until)
+        except ValueError:
+            await interaction_response(interaction).send_message("❌ Dates must be YYYY-MM-DD.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "records export", params,
+                                    status="Failed: Invalid date")
+            return
+
+        since_value = since_date.strftime("%Y-%m-%d") if since_date else None
+        until_value = (until_date + timedelta(days=1)).strftime("%Y-%m-%d") if until_date else None
+        await interaction_response(interaction).defer(ephemeral=True, thinking=True)
+
+        spool = None
+        try:
+            source = "infractions_all" if archived else table
+            spool, count = await db.run(write_export, source, file_format, interaction.guild.id,
+                                        user.id if user else None, since_value, until_value,
+                                        label=f"export {table}")
+            size = spool.seek(0, os.SEEK_END)
+            spool.seek(0)
+            if size > interaction.guild.filesize_limit:
+                await interaction.followup.send(
+                    f"❌ Export is {size / (1024 * 1024):.1f} MiB, over this server's upload limit. "
+                    f"Narrow the date range or filter by user.", ephemeral=True)
+                await log_command_usage(self.bot, interaction, "records export", params,
+                                        status="Failed: Over upload limit")
+                return
+
+            filename = f"{source}-{interaction.guild.id}-{datetime.now():%Y%m%d-%H%M%S}.{file_format}.gz"
+            await interaction.followup.send(f"📦 Exported {count} {table} row(s).",
+                                            file=discord.File(spool, filename=filename), ephemeral=True)
+            await log_command_usage(self.bot, interaction, "records export", params,
+                                    extra_info=f"Exported {count} rows ({size} bytes)")
+
+        except Exception as err:
+            await interaction.followup.send(f"❌ Error: {str(err)}", ephemeral=True)
+            logging.error(f"Export error ({table}, {file_format}): {err}")
+            await log_command_usage(self.bot, interaction, "records export", params,
+                                    status=f"Failed: {err}")
+        finally:
+            if spool is not None:
+                spool.close()
+
+
+BOTSTATS_TIMING_ROWS = 15
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as a compact h/m/s string."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m {secs}s" if hours else f"{minutes}m {secs}s"
+
+
+def build_stats_embed(bot_instance: commands.Bot) -> discord.Embed:
+    """Render gateway, queue, cache and timing diagnostics."""
+    embed = discord.Embed(title="📈 Bot Stats", color=discord.Color.blurple(), timestamp=datetime.now())
+
+    shard_lines = []
+    for shard_id, shard in shard_metrics.snapshot(bot_instance).items():
+        latency = f"{shard['latency_ms']:.0f} ms" if shard["latency_ms"] is not None else "n/a"
+        shard_lines.append(f"**Shard {shard_id}:** {latency} | {shard['events_per_sec']:.1f} ev/s | "
+                           f"{shard['disconnects']} disconnects, {shard['resumes']} resumes")
+    embed.add_field(name="Gateway", value=truncate_text("\n".join(shard_lines) or "No shards", 1024),
+                    inline=False)
+
+    relay = audit_relay.stats()
+    dms = dm_dispatcher.stats()
+    archive = infraction_archiver.stats()
+    embed.add_field(name="Queues",
+                    value=f"**Command log:** {command_log_shipper.depth} pending, "
+                          f"{command_log_shipper.dropped} dropped\n"
+                          f"**Audit relay:** {relay['critical']} critical, {relay['routine']} routine, "
+                          f"{relay['dropped']} dropped, {relay['rate_limit_hits']} 429s\n"
+                          f"**Attendance edits:** {attendance_updates.pending} pending\n"
+                          f"**DMs:** {dms['pending']} pending, {dms['retrying']} retrying, {dms['sent']} sent, "
+                          f"{dms['failed']} failed\n"
+                          f"**Archive:** {archive['cleared']} cleared, {archive['aged']} aged rows moved",
+                    inline=False)
+
+    infractions = infraction_cache.stats()
+    messages = message_store.stats()
+    resolved = resolver.stats()
+    message_lookups = messages["hits"] + messages["misses"]
+    message_ratio = messages["hits"] / message_lookups if message_lookups else 0.0
+    embed.add_field(name="Caches",
+                    value=f"**Infractions:** {infractions['size']}/{infractions['capacity']}, "
+                          f"{infractions['hit_ratio']:.0%} hits\n"
+                          f"**Messages:** {messages['entries']} entries, "
+                          f"{messages['bytes_used'] / 1048576:.1f}/{messages['budget'] / 1048576:.0f} MiB, "
+                          f"{message_ratio:.0%} hits\n"
+                          f"**Resolver:** {resolved['size']} entries, {resolved['hit_ratio']:.0%} hits, "
+                          f"{resolved['fetches']} fetches, {resolved['shared']} shared",
+                    inline=False)
+
+    rows = [f"{'name':<28} {'n':>6} {'p50':>7} {'p95':>7} {'p99':>7}"]
+    for name, hist in bot_metrics.summary()[:BOTSTATS_TIMING_ROWS]:
+        rows.append(f"{name[:28]:<28} {hist.count:>6} " +
+                    " ".join(f"{hist.percentile(q) * 1000:>7.1f}" for q in (0.5, 0.95, 0.99)))
+    embed.add_field(name="Timings (ms)", value=truncate_text("```\n" + "\n".join(rows), 1020) + "\n```",
+                    inline=False)
+
+    errors = sum(count for name, count in bot_metrics.counters.items() if name.endswith(".errors"))
+    embed.set_footer(text=f"Uptime {format_duration(time.monotonic() - bot_metrics.started)} • {errors} errors")
+    return embed
+
+
+class DiagnosticsCog(commands.Cog):
+    """Cog for bot diagnostics"""
+
+    def __init__(self, bot_instance: commands.Bot):
+        self.bot = bot_instance
+
+    @app_commands.command(name="botstats", description="Show latency, queue and cache diagnostics")
+    @app_commands.default_permissions(manage_guild=True)
+    async def botstats(self, interaction: discord.Interaction) -> None:
+        """Show bot diagnostics"""
+        if not interaction.user.guild_permissions.manage_guild:
+            await interaction_response(interaction).send_message("❌ No permission.", ephemeral=True)
+            await log_command_usage(self.bot, interaction, "botstats", "",
+                                    status="Denied: Missing Manage Server permission")
+            return
+
+        await interaction_response(interaction).send_message(embed=build_stats_embed(self.bot), ephemeral=True)
+        await log_command_usage(self.bot, interaction, "botstats", "")
+
+
+# The exporter is off unless METRICS_PORT is set; it binds to localhost by default.
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0')) or None
+METRICS_PREFIX = "srrd"
+# bot_metrics histogram name prefix -> (exported metric, label holding the rest of the name).
+METRIC_HISTOGRAMS = {
+    "command.": ("command_duration_seconds", "command"),
+    "view.": ("view_callback_duration_seconds", "callback"),
+    "db.": ("db_query_duration_seconds", "query"),
+    "http.": ("discord_request_duration_seconds", "route"),
+    "embed.": ("embed_build_duration_seconds", "embed"),
+}
+
+
+def metric_label(value: Any) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def process_memory_bytes() -> int:
+    """Return the resident set size of this process, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def render_metrics(bot_instance: commands.Bot) -> str:
+    """Render every bot metric in the Prometheus text exposition format."""
+    lines: list[str] = []
+
+    def family(name: str, kind: str, description: str) -> str:
+        metric = f"{METRICS_PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        return metric
+
+    metric = family("commands_total", "counter", "Slash commands by name and outcome.")
+    for (command_name, status), count in sorted(bot_metrics.commands.items()):
+        lines.append(f'{metric}{{command="{metric_label(command_name)}",status="{metric_label(status)}"}} {count}')
+
+    for prefix, (name, label) in METRIC_HISTOGRAMS.items():
+        metric = family(name, "histogram", f"Duration of {label} calls in seconds.")
+        for full_name, hist in sorted(bot_metrics.histograms.items()):
+            if not full_name.startswith(prefix):
+                continue
+            labels = f'{label}="{metric_label(full_name[len(prefix):])}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, hist.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f"{metric}_sum{{{labels}}} {hist.total}")
+            lines.append(f"{metric}_count{{{labels}}} {hist.count}")
+
+    metric = family("errors_total", "counter", "Timed operations that raised.")
+    for name, count in sorted(bot_metrics.counters.items()):
+        if name.endswith(".errors"):
+            lines.append(f'{metric}{{operation="{metric_label(name[:-len(".errors")])}"}} {count}')
+
+    relay = audit_relay.stats()
+    depths = {"command_log": command_log_shipper.depth, "audit_critical": relay["critical"],
+              "audit_routine": relay["routine"], "attendance_edits": attendance_updates.pending,
+              "dm": dm_dispatcher.depth}
+    metric = family("queue_depth", "gauge", "Items waiting in outbound queues.")
+    lines.extend(f'{metric}{{queue="{queue_name}"}} {depth}' for queue_name, depth in depths.items())
+    metric = family("queue_dropped_total", "counter", "Items dropped from full outbound queues.")
+    lines.append(f'{metric}{{queue="command_log"}} {command_log_shipper.dropped}')
+    lines.append(f'{metric}{{queue="audit"}} {relay["dropped"]}')
+    lines.append(f'{metric}{{queue="dm"}} {dm_dispatcher.dropped}')
+    dms = dm_dispatcher.stats()
+    metric = family("dm_deliveries_total", "counter", "DM delivery outcomes.")
+    lines.extend(f'{metric}{{outcome="{outcome}"}} {dms[outcome]}'
+                 for outcome in ("sent", "failed", "skipped", "retried"))
+    buckets = {"command_log": command_log_shipper.bucket, "audit": audit_relay.bucket}
+    metric = family("rate_limit_hits_total", "counter", "HTTP 429 responses retried by discord.py, per outbound queue.")
+    lines.extend(f'{metric}{{queue="{name}"}} {rate_limit_counter.hits[name]}' for name in (*buckets, "other"))
+    metric = family("rate_limit_waits_total", "counter", "Sends delayed by the client-side rate limiter.")
+    lines.extend(f'{metric}{{queue="{name}"}} {bucket.waits}' for name, bucket in buckets.items())
+
+    shards = shard_metrics.snapshot(bot_instance)
+    metric = family("gateway_latency_seconds", "gauge", "Heartbeat latency per shard.")
+    for shard_id, shard in shards.items():
+        if shard["latency_ms"] is not None:
+            lines.append(f'{metric}{{shard="{shard_id}"}} {shard["latency_ms"] / 1000}')
+    metric = family("gateway_events_total", "counter", "Gateway events handled per shard.")
+    lines.extend(f'{metric}{{shard="{shard_id}"}} {shard["events"]}' for shard_id, shard in shards.items())
+    metric = family("gateway_disconnects_total", "counter", "Shard disconnects.")
+    lines.extend(f'{metric}{{shard="{shard_id}"}} {shard["disconnects"]}' for shard_id, shard in shards.items())
+
+    infractions = infraction_cache.stats()
+    messages = message_store.stats()
+    metric = family("cache_hits_total", "counter", "Cache lookups answered from memory.")
+    lines.append(f'{metric}{{cache="infractions"}} {infractions["hits"]}')
+    lines.append(f'{metric}{{cache="messages"}} {messages["hits"]}')
+    lines.append(f'{metric}{{cache="resolver"}} {resolver.hits}')
+    metric = family("cache_misses_total", "counter", "Cache lookups that missed.")
+    lines.append(f'{metric}{{cache="infractions"}} {infractions["misses"]}')
+    lines.append(f'{metric}{{cache="messages"}} {messages["misses"]}')
+    lines.append(f'{metric}{{cache="resolver"}} {resolver.misses}')
+
+    metric = family("uptime_seconds", "gauge", "Seconds since the process started.")
+    lines.append(f"{metric} {time.monotonic() - bot_metrics.started}")
+    metric = family("process_resident_memory_bytes", "gauge", "Resident memory of the bot process.")
+    lines.append(f"{metric} {process_memory_bytes()}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Serves render_metrics at /metrics from the bot's own event loop.
+
+    Metrics are only rendered when scraped, so an idle exporter costs nothing
+    beyond the listening socket.
+    """
+
+    def __init__(self, host: str = METRICS_HOST, port: Optional[int] = METRICS_PORT):
+        self.host = host
+        self.port = port
+        self._bot: Optional[commands.Bot] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, bot_instance: commands.Bot) -> None:
+        """Start listening if a port is configured."""
+        if self.port is None or self._runner is not None:
+            return
+        self._bot = bot_instance
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as err:
+            logging.error(f"Metrics exporter could not bind {self.host}:{self.port}: {err}")
+            await runner.cleanup()
+            return
+        self._runner = runner
+        logging.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def _handle(self, _request: web.Request) -> web.Response:
+        """Answer a scrape."""
+        return web.Response(body=render_metrics(self._bot).encode(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def close(self) -> None:
+        """Stop the HTTP server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+metrics_exporter = MetricsExporter()
+
+
 @bot.event
 async def on_audit_log_entry_create(entry: discord.AuditLogEntry) -> None:
     """Relay audit log entries to the central log channel as rich text."""
+    record_gateway_event("audit_log_entry_create", entry.guild.id)
+    if entry.action in (AuditLogAction.message_delete, AuditLogAction.message_bulk_delete):
+        # Deletions are reported by the aggregator, which folds this actor into its burst.
+        if entry.action == AuditLogAction.message_bulk_delete:
+            channel = entry.target
+        else:
+            channel = getattr(entry.extra, "channel", None)
+        channel_id = getattr(channel, "id", None)
+        if channel_id:
+            delete_aggregator.note_actor(entry.guild.id, channel_id, entry.user.id if entry.user else None,
+                                         getattr(entry.extra, "count", 1) or 1)
+            return
+
     actor_line = f"{entry.user.mention} (`{entry.user.id}`)" if entry.user else "System"
     title = describe_audit_action(entry.action)
     summary = build_audit_summary(entry, title)
@@ -1518,75 +5118,260 @@ async def on_audit_log_entry_create(entry: discord.AuditLogEntry) -> None:
         footer_parts.append(f"Actor ID: {entry.user.id}")
     footer_parts.append(f"Entry ID: {entry.id}")
     footer = " | ".join(footer_parts)
-    await send_audit_log_entry(title, lines, footer, color=audit_action_color(entry.action))
+    priority = AUDIT_PRIORITY_CRITICAL if entry.action in CRITICAL_AUDIT_ACTIONS else AUDIT_PRIORITY_ROUTINE
+    await send_audit_log_entry(title, lines, footer, color=audit_action_color(entry.action), priority=priority)
+
+
+@bot.listen()
+async def on_message(message: discord.Message) -> None:
+    """Remember message content for edit/delete logging."""
+    record_gateway_event("message", message.guild.id if message.guild else None)
+    if message.author.bot or message.guild is None:
+        return
+    message_store.remember(StoredMessage.from_message(message))
 
 
 @bot.event
-async def on_message_edit(before: discord.Message, after: discord.Message) -> None:
+async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent) -> None:
     """Log message edits to the audit log channel."""
-    if before.author.bot or before.guild is None:
+    record_gateway_event("raw_message_edit", payload.guild_id)
+    # Unfurls, pins and flag changes arrive as updates without edited_timestamp.
+    if payload.guild_id is None or "content" not in payload.data or not payload.data.get("edited_timestamp"):
+        return
+    author = payload.data.get("author") or {}
+    if author.get("bot"):
+        return
+
+    after_content = payload.data["content"]
+    before = await message_store.resolve(payload.message_id)
+    if before is None and payload.cached_message is not None:
+        before = StoredMessage.from_message(payload.cached_message)
+    if before is not None and before.content == after_content:
         return
-    if before.content == after.content:
+
+    author_id = before.author_id if before else int(author["id"]) if "id" in author else None
+    attachments = tuple(attachment["url"] for attachment in payload.data.get("attachments", []))
+    message_store.remember(StoredMessage(payload.message_id, payload.channel_id, author_id, after_content,
+                                         attachments))
+    if before is None:
+        logging.debug(f"Skipping edit of {payload.message_id}: previous content unknown")
         return
 
+    author_text = f"<@{author_id}> (`{author_id}`)" if author_id else "Unknown"
+    before_text = before.content or "[embed/attachment]"
     lines = [
-        f"**User:** {before.author.mention} (`{before.author.id}`)",
-        f"**Channel:** {before.channel.mention}",
+        f"**User:** {author_text}",
+        f"**Channel:** <#{payload.channel_id}>",
         "",
         "**Before:**",
-        truncate_text(before.content or "[embed/attachment]"),
+        truncate_text(before_text),
         "",
         "**After:**",
-        truncate_text(after.content or "[embed/attachment]"),
+        truncate_text(after_content or "[embed/attachment]"),
     ]
-    footer = f"Message ID: {before.id} | Channel ID: {before.channel.id}"
+    footer = f"Message ID: {payload.message_id} | Channel ID: {payload.channel_id}"
     await send_audit_log_entry("Message Edited", lines, footer, color=discord.Color.gold())
 
 
 @bot.event
-async def on_message_delete(message: discord.Message) -> None:
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent) -> None:
     """Log message deletions to the audit log channel."""
-    if message.author.bot or message.guild is None:
+    record_gateway_event("raw_message_delete", payload.guild_id)
+    if payload.guild_id is None:
         return
 
-    attachments_text = ", ".join(attachment.url for attachment in message.attachments) or "None"
-    lines = [
-        f"**User:** {message.author.mention} (`{message.author.id}`)",
-        f"**Channel:** {message.channel.mention}",
-        "",
-        "**Content:**",
-        truncate_text(message.content or "[embed/attachment]"),
-        "",
-        "**Attachments:**",
-        truncate_text(attachments_text, 512),
-    ]
-    footer = f"Message ID: {message.id} | Channel ID: {message.channel.id}"
-    await send_audit_log_entry("Message Deleted", lines, footer, color=discord.Color.red())
+    stored = await message_store.resolve(payload.message_id)
+    message_store.forget(payload.message_id)
+    if stored is None and payload.cached_message is not None and not payload.cached_message.author.bot:
+        stored = StoredMessage.from_message(payload.cached_message)
+    if stored is None:
+        return
+
+    delete_aggregator.add(payload.guild_id, payload.channel_id, [stored])
+
+
+@bot.event
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent) -> None:
+    """Fold purged messages into a single audit summary."""
+    record_gateway_event("raw_bulk_message_delete", payload.guild_id)
+    if payload.guild_id is None:
+        return
+
+    stored = await message_store.resolve_many(payload.message_ids)
+    cached = {message.id: message for message in payload.cached_messages}
+    deleted = []
+    for message_id in payload.message_ids:
+        message_store.forget(message_id)
+        entry = stored.get(message_id)
+        message = cached.get(message_id)
+        if entry is None and message is not None:
+            if message.author.bot:
+                continue
+            entry = StoredMessage.from_message(message)
+        deleted.append(entry or StoredMessage(message_id, payload.channel_id))
+    delete_aggregator.add(payload.guild_id, payload.channel_id, deleted, bulk=True)
+
+
+@bot.listen()
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel) -> None:
+    """Drop the deleted channel from the resolver cache."""
+    record_gateway_event("guild_channel_delete", channel.guild.id)
+    resolver.invalidate("channel", channel.id)
+
+
+@bot.listen()
+async def on_raw_member_remove(payload: discord.RawMemberRemoveEvent) -> None:
+    """Drop the departed member from the resolver cache."""
+    record_gateway_event("raw_member_remove", payload.guild_id)
+    resolver.invalidate("member", payload.user.id, payload.guild_id)
+
+
+@bot.listen()
+async def on_app_command_completion(interaction: discord.Interaction, command: app_commands.Command) -> None:
+    """Record how long a successful command took."""
+    observe_command(interaction, command)
+
+
+@bot.listen()
+async def on_interaction(interaction: discord.Interaction) -> None:
+    """Count interactions per shard."""
+    record_gateway_event("interaction", interaction.guild_id)
+
+
+@bot.event
+async def on_shard_connect(shard_id: int) -> None:
+    """Track shard connections."""
+    shard_metrics.connects[shard_id] += 1
+    logging.info(f"Shard {shard_id} connected")
+
+
+@bot.event
+async def on_shard_disconnect(shard_id: int) -> None:
+    """Track shard disconnections."""
+    shard_metrics.disconnects[shard_id] += 1
+    logging.warning(f"Shard {shard_id} disconnected")
+
+
+@bot.event
+async def on_shard_resumed(shard_id: int) -> None:
+    """Track resumed shard sessions."""
+    shard_metrics.resumes[shard_id] += 1
+    logging.info(f"Shard {shard_id} resumed")
 
 
 @bot.event
 async def on_ready() -> None:
     """Called when bot is ready"""
-    try:
-        synced = await bot.tree.sync()
-        logging.info(f"Synced {len(synced)} commands")
-    except Exception as err:
-        logging.error(f"Failed to sync: {err}")
     print(f"✅ Bot online: {bot.user.name}")
 
 
+def command_tree_fingerprint(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Return a stable hash of the command payloads that a sync to guild (or globally) would upload."""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+                     key=lambda item: (item.get("type", 1), item["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def sync_command_tree(bot_instance: commands.Bot, force: bool = False,
+                            guild_ids: Iterable[int] = ()) -> None:
+    """Sync app commands globally, and to guild_ids, only where their definitions changed."""
+    scopes: list[Optional[discord.Object]] = [None, *(discord.Object(id=guild_id) for guild_id in guild_ids)]
+    for guild in scopes:
+        scope = f"guild {guild.id}" if guild else "global"
+        if guild is not None:
+            # Guild commands update instantly, which is what per-guild sync is for during development.
+            bot_instance.tree.copy_global_to(guild=guild)
+        key = f"command_tree:{bot_instance.application_id}:{guild.id if guild else 'global'}"
+        fingerprint = command_tree_fingerprint(bot_instance.tree, guild)
+        # noinspection SqlNoDataSourceInspection
+        row = await db.fetchone('SELECT value FROM bot_state WHERE key = ?', (key,))
+        if not force and row is not None and row["value"] == fingerprint:
+            logging.info(f"Command tree unchanged ({scope}), skipping sync")
+            continue
+        try:
+            synced = await bot_instance.tree.sync(guild=guild)
+        except discord.HTTPException as err:
+            logging.error(f"Failed to sync commands ({scope}): {err}")
+            continue
+        # noinspection SqlNoDataSourceInspection
+        await db.execute('''INSERT INTO bot_state (key, value)
+                            VALUES (?, ?)
+                            ON CONFLICT(key) DO UPDATE SET value      = excluded.value,
+                                                           updated_at = CURRENT_TIMESTAMP''',
+                         (key, fingerprint))
+        logging.info(f"Synced {len(synced)} commands ({scope})")
+
+
+async def load_cogs(bot_instance: commands.Bot) -> None:
+    """Load all cogs, restore live views and start the background workers"""
+    instrument_http(bot_instance)
+    await bot_instance.add_cog(PromotionsCog(bot_instance))
+    await bot_instance.add_cog(InfractionsCog(bot_instance))
+    await bot_instance.add_cog(TryoutCog(bot_instance))
+    await bot_instance.add_cog(RecordsCog(bot_instance))
+    await bot_instance.add_cog(DiagnosticsCog(bot_instance))
+    await restore_event_views(bot_instance)
+    command_log_shipper.start(bot_instance)
+    audit_relay.start(bot_instance)
+    delete_aggregator.start()
+    message_store.start()
+    dm_dispatcher.start()
+    # The archive lives in the shared database, so only the process running shard 0 moves rows.
+    if SHARD_IDS is None or 0 in SHARD_IDS:
+        infraction_archiver.start()
+    await metrics_exporter.start(bot_instance)
+
+
+async def stop_workers() -> None:
+    """Flush and stop the background workers"""
+    await metrics_exporter.close()
+    await infraction_archiver.close()
+    await dm_dispatcher.close()
+    await command_log_shipper.close()
+    await attendance_updates.close()
+    await delete_aggregator.close()
+    await audit_relay.close()
+    await message_store.close()
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Run the bot")
+    parser.add_argument("--force-sync", action="store_true",
+                        help="sync app commands even if the command tree is unchanged")
+    parser.add_argument("--sync-guild", type=int, action="append", default=[], metavar="GUILD_ID",
+                        help="also sync commands to this guild, where changes apply instantly (repeatable)")
+    return parser.parse_args()
+
+
 def main() -> None:
     """Main function to start the bot"""
+    args = parse_args()
+    log_listener = setup_logging()
     init_db()
 
-    async def load_cogs() -> None:
-        """Load all cogs"""
-        await bot.add_cog(PromotionsCog(bot))
-        await bot.add_cog(InfractionsCog(bot))
-        await bot.add_cog(TryoutCog(bot))
-
-    bot.setup_hook = load_cogs
-    bot.run(token)
+    async def setup() -> None:
+        """Load all cogs and sync the command tree if it changed"""
+        await load_cogs(bot)
+        # Setup runs once per process, unlike on_ready, which fires again after
+        # reconnects. Commands are global, so only the process running shard 0 syncs.
+        if SHARD_IDS is None or 0 in SHARD_IDS:
+            await sync_command_tree(bot, force=args.force_sync, guild_ids=args.sync_guild)
+
+    async def shutdown() -> None:
+        """Flush background queues, then disconnect"""
+        await stop_workers()
+        await close_bot()
+
+    close_bot = bot.close
+    bot.setup_hook = setup
+    bot.close = shutdown
+    try:
+        # Logging is already configured; stop discord.py from adding its own handler.
+        bot.run(token, log_handler=None)
+    finally:
+        db.close()
+        log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+"""Schema migration tests on fresh and pre-migration databases."""
+import sqlite3
+
+import pytest
+
+import main
+
+# Tables as created by init_db before versioned migrations existed.
+LEGACY_SCHEMA = (
+    '''CREATE TABLE promotions
+       (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           user_id INTEGER NOT NULL,
+           promoted_by INTEGER NOT NULL,
+           new_role TEXT,
+           reason TEXT,
+           timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+           guild_id INTEGER NOT NULL
+       )''',
+    '''CREATE TABLE infractions
+       (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           user_id INTEGER NOT NULL,
+           issued_by INTEGER NOT NULL,
+           infraction_type TEXT NOT NULL,
+           reason TEXT,
+           severity TEXT DEFAULT 'medium',
+           timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+           voided INTEGER DEFAULT 0,
+           voided_by INTEGER,
+           voided_reason TEXT,
+           void_timestamp DATETIME,
+           guild_id INTEGER NOT NULL
+       )''',
+)
+
+EXPECTED_COLUMNS = {
+    "promotions": {"note", "dm_status"},
+    "infractions": {"appealable", "note", "log_channel_id", "log_message_id", "dm_status", "cleared_at",
+                    "cleared_by", "cleared_reason"},
+    "event_attendance": {"join_seq"},
+    "infractions_archive": {"archive_reason", "cleared_at"},
+}
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    """Return the column names of a table."""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def assert_fully_migrated(conn: sqlite3.Connection) -> None:
+    """Check the recorded version and the columns added by later migrations."""
+    latest = main.MIGRATIONS[-1][0]
+    assert main.get_schema_version(conn) == latest
+    versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    assert versions == [version for version, _, _ in main.MIGRATIONS]
+    for table, columns in EXPECTED_COLUMNS.items():
+        assert columns <= table_columns(conn, table), table
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    yield connection
+    connection.close()
+
+
+def test_fresh_database(conn):
+    assert main.run_migrations(conn) == main.MIGRATIONS[-1][0]
+    assert_fully_migrated(conn)
+
+
+def test_legacy_database_keeps_rows(conn):
+    for statement in LEGACY_SCHEMA:
+        conn.execute(statement)
+    conn.execute("INSERT INTO infractions (user_id, issued_by, infraction_type, reason, guild_id) "
+                 "VALUES (1, 2, 'Warning', 'legacy', 3)")
+
+    main.run_migrations(conn)
+
+    assert_fully_migrated(conn)
+    row = conn.execute("SELECT reason, appealable, cleared_at FROM infractions").fetchone()
+    assert row == ("legacy", 0, None)
+    assert conn.execute("SELECT rowid FROM infractions_fts WHERE infractions_fts MATCH 'legacy'").fetchall() == [(1,)]
+
+
+def test_rerun_is_a_no_op(conn):
+    main.run_migrations(conn)
+    main.run_migrations(conn)
+    assert_fully_migrated(conn)
+
+
+def test_failed_column_rolls_back_step(conn, monkeypatch):
+    def broken_step(c: sqlite3.Cursor) -> None:
+        main.ensure_column_exists(c, "infractions", "broken", "INTEGER NOT NULL")
+
+    main.run_migrations(conn)
+    # SQLite only rejects a NOT NULL column without a default when rows exist.
+    conn.execute("INSERT INTO infractions (user_id, issued_by, infraction_type, guild_id) VALUES (1, 2, 'Warning', 3)")
+    latest = main.MIGRATIONS[-1][0]
+    monkeypatch.setattr(main, "MIGRATIONS", [*main.MIGRATIONS, (latest + 1, "Broken step", broken_step)])
+
+    with pytest.raises(sqlite3.OperationalError):
+        main.run_migrations(conn)
+    assert main.get_schema_version(conn) == latest
+    assert "broken" not in table_columns(conn, "infractions")